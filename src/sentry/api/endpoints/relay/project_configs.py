@@ -6,6 +6,7 @@ from rest_framework.request import Request
 from rest_framework.response import Response
 from sentry_sdk import Hub, set_tag, start_span, start_transaction
 
+from sentry import features
 from sentry.api.authentication import RelayAuthentication
 from sentry.api.base import Endpoint
 from sentry.api.permissions import RelayPermission
@@ -31,7 +32,7 @@ class RelayProjectConfigsEndpoint(Endpoint):
     def post(self, request: Request) -> Response:
         with start_transaction(
             op="http.server", name="RelayProjectConfigsEndpoint", sampled=_sample_apm()
-        ):
+        ), features.local_cache():
             return self._post(request)
 
     def _post(self, request: Request):
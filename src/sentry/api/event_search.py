@@ -29,6 +29,7 @@ from sentry.search.utils import (
     parse_percentage,
 )
 from sentry.utils.compat import filter, map
+from sentry.utils.lru import LRUCache
 from sentry.utils.snuba import (
     Dataset,
     is_duration_measurement,
@@ -472,17 +473,28 @@ class SearchVisitor(NodeVisitor):
             config = SearchConfig()
         self.config = config
         self.params = params if params is not None else {}
-        if builder is None:
-            # Avoid circular import
-            from sentry.search.events.builder import UnresolvedQuery
-
-            # TODO: read dataset from config
-            self.builder = UnresolvedQuery(
-                dataset=Dataset.Discover, params=self.params, functions_acl=FUNCTIONS.keys()
-            )
-        else:
+        if builder is not None:
             self.builder = builder
 
+        # Whether the result only depends on the query and the config, see
+        # `parse_search_query`.
+        self.is_cacheable = builder is None
+
+    @cached_property
+    def builder(self):
+        # Avoid circular import
+        from sentry.search.events.builder import UnresolvedQuery
+
+        # TODO: read dataset from config
+        return UnresolvedQuery(
+            dataset=Dataset.Discover, params=self.params, functions_acl=FUNCTIONS.keys()
+        )
+
+    def get_function_result_type(self, function):
+        # The result type depends on the builder and thereby on the params.
+        self.is_cacheable = False
+        return self.builder.get_function_result_type(function)
+
     @cached_property
     def key_mappings_lookup(self):
         lookup = {}
@@ -617,6 +629,8 @@ class SearchVisitor(NodeVisitor):
         (search_key, _, value) = children
 
         if self.is_date_key(search_key.name):
+            # Relative dates depend on the current time.
+            self.is_cacheable = False
             try:
                 from_val, to_val = parse_datetime_range(value.text)
             except InvalidQuery as exc:
@@ -718,7 +732,7 @@ class SearchVisitor(NodeVisitor):
         try:
             # Even if the search value matches duration format, only act as
             # duration for certain columns
-            result_type = self.builder.get_function_result_type(search_key.name)
+            result_type = self.get_function_result_type(search_key.name)
 
             if result_type == "duration":
                 aggregate_value = parse_duration(*search_value)
@@ -746,7 +760,7 @@ class SearchVisitor(NodeVisitor):
         try:
             # Even if the search value matches percentage format, only act as
             # percentage for certain columns
-            result_type = self.builder.get_function_result_type(search_key.name)
+            result_type = self.get_function_result_type(search_key.name)
             if result_type == "percentage":
                 aggregate_value = parse_percentage(search_value)
         except ValueError:
@@ -792,6 +806,8 @@ class SearchVisitor(NodeVisitor):
         operator = handle_negation(negation, operator)
         is_date_aggregate = any(key in search_key.name for key in self.config.date_keys)
         if is_date_aggregate:
+            # Relative dates depend on the current time.
+            self.is_cacheable = False
             try:
                 from_val, to_val = parse_datetime_range(search_value.text)
             except InvalidQuery as exc:
@@ -1068,20 +1084,85 @@ default_config = SearchConfig(
 )
 
 
+class _FrozenList(tuple):
+    """
+    A list in a cached parse result. Thawed back into a list when the result
+    is handed out.
+    """
+
+
+def _freeze(value):
+    if isinstance(value, list):
+        return _FrozenList(_freeze(v) for v in value)
+    if isinstance(value, tuple) and hasattr(value, "_fields"):
+        return type(value)(*map(_freeze, value))
+    return value
+
+
+def _thaw(value):
+    if isinstance(value, _FrozenList):
+        return [_thaw(v) for v in value]
+    if isinstance(value, tuple) and hasattr(value, "_fields"):
+        return type(value)(*map(_thaw, value))
+    return value
+
+
+def _hashable(value):
+    if isinstance(value, Mapping):
+        return frozenset((k, _hashable(v)) for k, v in value.items())
+    if isinstance(value, (set, frozenset)):
+        return frozenset(value)
+    if isinstance(value, (list, tuple)):
+        return tuple(_hashable(v) for v in value)
+    return value
+
+
+def _get_config_key(config):
+    return (
+        type(config),
+        config.allow_boolean,
+        config.free_text_key,
+        frozenset((name, _hashable(value)) for name, value in vars(config).items()),
+    )
+
+
+# Parse trees by query, and the results of parsing a query with a config. Only
+# results that depend on nothing but the query and the config are cached
+# (see `SearchVisitor.is_cacheable`). Results are stored frozen, so that
+# callers can not modify them.
+_tree_cache = LRUCache("event_search.tree", max_items=1000)
+_result_cache = LRUCache("event_search.result", max_items=1000)
+
+
 def parse_search_query(query, config=None, params=None, builder=None) -> Sequence[SearchFilter]:
     if config is None:
         config = default_config
 
-    try:
-        tree = event_search_grammar.parse(query)
-    except IncompleteParseError as e:
-        idx = e.column()
-        prefix = query[max(0, idx - 5) : idx]
-        suffix = query[idx : (idx + 5)]
-        raise InvalidSearchQuery(
-            "{} {}".format(
-                f"Parse error at '{prefix}{suffix}' (column {e.column():d}).",
-                "This is commonly caused by unmatched parentheses. Enclose any text in double quotes.",
+    result_key = None
+    if builder is None:
+        result_key = (query, _get_config_key(config))
+        result = _result_cache.get(result_key)
+        if result is not None:
+            return _thaw(result)
+
+    tree = _tree_cache.get(query)
+    if tree is None:
+        try:
+            tree = event_search_grammar.parse(query)
+        except IncompleteParseError as e:
+            idx = e.column()
+            prefix = query[max(0, idx - 5) : idx]
+            suffix = query[idx : (idx + 5)]
+            raise InvalidSearchQuery(
+                "{} {}".format(
+                    f"Parse error at '{prefix}{suffix}' (column {e.column():d}).",
+                    "This is commonly caused by unmatched parentheses. Enclose any text in double quotes.",
+                )
             )
-        )
-    return SearchVisitor(config, params=params, builder=builder).visit(tree)
+        _tree_cache.set(query, tree)
+
+    visitor = SearchVisitor(config, params=params, builder=builder)
+    result = visitor.visit(tree)
+    if result_key is not None and visitor.is_cacheable:
+        _result_cache.set(result_key, _freeze(result))
+    return result
@@ -1,11 +1,37 @@
 import logging
+from collections import defaultdict
 
+from django.db import connections, router
 from django.db.models import F
+from django.db.models.signals import post_save
+from psycopg2.extras import execute_values
 
 from sentry.signals import buffer_incr_complete
 from sentry.tasks.process_buffer import process_incr
+from sentry.utils import metrics
+from sentry.utils.dates import to_timestamp
 from sentry.utils.services import Service
 
+# Upper bound of rows sent in a single ``UPDATE ... FROM (VALUES ...)`` statement.
+BULK_UPDATE_BATCH_SIZE = 500
+
+
+def _get_pk_filter(model, filters):
+    """
+    Returns the primary key value if ``filters`` addresses exactly one row by
+    primary key, otherwise ``None``.
+    """
+    if len(filters) != 1:
+        return None
+    ((name, value),) = filters.items()
+    if name != "pk" and name != model._meta.pk.name:
+        return None
+    return getattr(value, "pk", value)
+
+
+def _is_expression(value):
+    return hasattr(value, "resolve_expression")
+
 
 class BufferMount(type):
     def __new__(cls, name, bases, attrs):
@@ -28,7 +54,7 @@ class Buffer(Service, metaclass=BufferMount):
     keep up with the updates.
     """
 
-    __all__ = ("get", "incr", "process", "process_pending", "validate")
+    __all__ = ("get", "incr", "flush_incrs", "process", "process_pending", "validate")
 
     def get(self, model, columns, filters):
         """
@@ -54,6 +80,12 @@ class Buffer(Service, metaclass=BufferMount):
             }
         )
 
+    def flush_incrs(self):
+        """
+        Writes out any increments the backend is holding back in process.
+        Backends that don't coalesce `incr` calls have nothing to do here.
+        """
+
     def process_pending(self, partition=None):
         return []
 
@@ -102,3 +134,142 @@ class Buffer(Service, metaclass=BufferMount):
             created=created,
             sender=model,
         )
+
+    def process_batch(self, batch):
+        """
+        Processes many buffered increments at once. ``batch`` is a sequence of
+        ``(model, columns, filters, extra, signal_only)`` tuples as they would
+        be passed to ``process``.
+
+        Rows addressed by primary key are grouped by model and column set and
+        written with one ``UPDATE ... FROM (VALUES ...)`` statement per group,
+        everything else is handed to ``process`` one by one.
+
+        Subclasses override ``process`` with a different signature, so the
+        fallbacks below explicitly call this class' implementation.
+        """
+        from sentry.models import Group
+
+        groups = defaultdict(list)
+        for model, columns, filters, extra, signal_only in batch:
+            pk = _get_pk_filter(model, filters)
+            update_extra = dict(extra or {})
+            compute_score = (
+                model is Group and "times_seen" in columns and "last_seen" in update_extra
+            )
+            if compute_score:
+                # `process` replaces the score with one derived from the new
+                # `times_seen` and `last_seen`, the bulk statement does the same.
+                update_extra.pop("score", None)
+            if (
+                signal_only
+                or pk is None
+                or any(_is_expression(v) for v in update_extra.values())
+                or any(_is_expression(v) for v in columns.values())
+            ):
+                Buffer.process(self, model, columns, filters, extra, signal_only)
+                continue
+            group_key = (model, tuple(sorted(columns)), tuple(sorted(update_extra)), compute_score)
+            groups[group_key].append((pk, columns, filters, extra, update_extra))
+
+        for (model, column_names, extra_names, compute_score), rows in groups.items():
+            for i in range(0, len(rows), BULK_UPDATE_BATCH_SIZE):
+                self._bulk_update(
+                    model,
+                    column_names,
+                    extra_names,
+                    compute_score,
+                    rows[i : i + BULK_UPDATE_BATCH_SIZE],
+                )
+
+    def _bulk_update(self, model, column_names, extra_names, compute_score, rows):
+        from sentry.models import Group
+
+        using = router.db_for_write(model)
+        connection = connections[using]
+        qn = connection.ops.quote_name
+        opts = model._meta
+        table = qn(opts.db_table)
+        pk_column = qn(opts.pk.column)
+
+        fields = [opts.get_field(name) for name in column_names + extra_names]
+        value_columns = [opts.pk.column] + [f.column for f in fields]
+        assignments = []
+        for name in column_names:
+            field = opts.get_field(name)
+            column = qn(field.column)
+            assignments.append(
+                f"{column} = {table}.{column} + data.{column}::{field.db_type(connection)}"
+            )
+        for name in extra_names:
+            field = opts.get_field(name)
+            column = qn(field.column)
+            assignments.append(f"{column} = data.{column}::{field.db_type(connection)}")
+        if compute_score:
+            value_columns.append("score_ts")
+            assignments.append(
+                "{score} = log({table}.{times_seen} + data.{times_seen}) * 600 + data.score_ts".format(
+                    score=qn(opts.get_field("score").column),
+                    table=table,
+                    times_seen=qn(opts.get_field("times_seen").column),
+                )
+            )
+
+        values = []
+        for pk, columns, _, _, update_extra in rows:
+            row = [opts.pk.get_db_prep_value(pk, connection)]
+            row.extend(columns[name] for name in column_names)
+            row.extend(
+                opts.get_field(name).get_db_prep_save(update_extra[name], connection)
+                for name in extra_names
+            )
+            if compute_score:
+                row.append(int(to_timestamp(update_extra["last_seen"])))
+            values.append(tuple(row))
+
+        query = """
+            UPDATE {table}
+            SET {assignments}
+            FROM (VALUES %s) AS data ({columns})
+            WHERE {table}.{pk} = data.{pk}
+            RETURNING {table}.{pk}
+        """.format(
+            table=table,
+            assignments=", ".join(assignments),
+            columns=", ".join(qn(c) for c in value_columns),
+            pk=pk_column,
+        )
+
+        with connection.cursor() as cursor:
+            updated = {
+                pk
+                for (pk,) in execute_values(
+                    cursor, query, values, page_size=len(values), fetch=True
+                )
+            }
+
+        metrics.timing(
+            "buffer.flush.rows-per-statement",
+            len(values),
+            tags={"module": model.__module__, "model": model.__name__},
+        )
+
+        if model is Group and updated:
+            # Mirror `process`, which goes through `Group.update` so that the
+            # cached group and other `post_save` receivers see the new counts.
+            for group in Group.objects.filter(id__in=updated):
+                post_save.send(sender=Group, instance=group, created=False)
+
+        for pk, columns, filters, extra, _ in rows:
+            if pk not in updated and model is not Group:
+                # The row may not exist yet, `process` takes care of creating it.
+                Buffer.process(self, model, columns, filters, extra)
+                continue
+            buffer_incr_complete.send_robust(
+                model=model,
+                columns=columns,
+                filters=filters,
+                extra=extra,
+                created=False,
+                sender=model,
+            )
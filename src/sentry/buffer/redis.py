@@ -1,8 +1,11 @@
+import atexit
 import pickle
 import threading
+from collections import defaultdict
 from datetime import datetime
 from time import time
 
+from celery.signals import task_postrun, worker_process_shutdown
 from django.db import models
 from django.utils import timezone
 from django.utils.encoding import force_bytes, force_text
@@ -51,12 +54,45 @@ class RedisBuffer(Buffer):
     key_expire = 60 * 60  # 1 hour
     pending_key = "b:p"
 
-    def __init__(self, pending_partitions=1, incr_batch_size=2, **options):
+    def __init__(
+        self,
+        pending_partitions=1,
+        incr_batch_size=2,
+        bulk_flush=False,
+        flush_chunk_size=1000,
+        max_flush_chunks=100,
+        incr_coalesce_window=None,
+        incr_coalesce_batch_size=100,
+        **options,
+    ):
         self.cluster, options = get_cluster_from_options("SENTRY_BUFFER_OPTIONS", options)
         self.pending_partitions = pending_partitions
         self.incr_batch_size = incr_batch_size
+        # When enabled, `process_pending` drains the pending keys itself and
+        # writes them in bulk instead of fanning out `process_incr` tasks.
+        self.bulk_flush = bulk_flush
+        self.flush_chunk_size = flush_chunk_size
+        self.max_flush_chunks = max_flush_chunks
+        # When set, `incr` calls are merged in process for up to this many
+        # seconds (or `incr_coalesce_batch_size` distinct keys) before being
+        # written to Redis. The window only ends with the next `incr`, so
+        # callers flush explicitly when they are done with a batch of work;
+        # celery workers flush at the end of every task.
+        self.incr_coalesce_window = incr_coalesce_window
+        self.incr_coalesce_batch_size = incr_coalesce_batch_size
         assert self.pending_partitions > 0
         assert self.incr_batch_size > 0
+        assert self.flush_chunk_size > 0
+        assert self.max_flush_chunks > 0
+        assert self.incr_coalesce_batch_size > 0
+
+        self._coalesced_incrs = {}
+        self._coalesced_since = None
+        self._coalesce_lock = threading.Lock()
+        if self.incr_coalesce_window is not None:
+            atexit.register(self.flush_incrs)
+            worker_process_shutdown.connect(self._flush_incrs_on_shutdown, weak=False)
+            task_postrun.connect(self._flush_incrs_after_task, weak=False)
 
     def validate(self):
         try:
@@ -170,15 +206,29 @@ class RedisBuffer(Buffer):
         - Add hashmap key to pending flushes
         """
 
+        key = self._make_key(model, filters)
+
+        if self.incr_coalesce_window is not None:
+            self._coalesce_incr(key, model, columns, filters, extra, signal_only)
+        else:
+            conn = self.cluster.get_local_client_for_key(key)
+            pipe = conn.pipeline()
+            self._pipeline_incr(pipe, key, model, columns, filters, extra, signal_only)
+            pipe.execute()
+
+        metrics.incr(
+            "buffer.incr",
+            skip_internal=True,
+            tags={"module": model.__module__, "model": model.__name__},
+        )
+
+    def _pipeline_incr(self, pipe, key, model, columns, filters, extra, signal_only):
         # TODO(dcramer): longer term we'd rather not have to serialize values
         # here (unless it's to JSON)
-        key = self._make_key(model, filters)
-        pending_key = self._make_pending_key_from_key(key)
         # We can't use conn.map() due to wanting to support multiple pending
         # keys (one per Redis partition)
-        conn = self.cluster.get_local_client_for_key(key)
+        pending_key = self._make_pending_key_from_key(key)
 
-        pipe = conn.pipeline()
         pipe.hsetnx(key, "m", f"{model.__module__}.{model.__name__}")
         # TODO(dcramer): once this goes live in production, we can kill the pickle path
         # (this is to ensure a zero downtime deploy where we can transition event processing)
@@ -202,13 +252,112 @@ class RedisBuffer(Buffer):
 
         pipe.expire(key, self.key_expire)
         pipe.zadd(pending_key, {key: time()})
-        pipe.execute()
 
-        metrics.incr(
-            "buffer.incr",
-            skip_internal=True,
-            tags={"module": model.__module__, "model": model.__name__},
-        )
+    def _coalesce_incr(self, key, model, columns, filters, extra, signal_only):
+        """
+        Merges an increment into the process-local accumulator. Counters are
+        summed, ``extra`` is last write wins and ``signal_only`` sticks once
+        set, which is what Redis ends up with when the calls are sent one by
+        one.
+        """
+        with self._coalesce_lock:
+            pending = self._coalesced_incrs.get(key)
+            if pending is None:
+                pending = self._coalesced_incrs[key] = {
+                    "model": model,
+                    "filters": filters,
+                    "columns": defaultdict(int),
+                    "extra": {},
+                    "signal_only": None,
+                }
+                if self._coalesced_since is None:
+                    self._coalesced_since = time()
+            else:
+                metrics.incr("buffer.incr.coalesced", skip_internal=True)
+
+            for column, amount in columns.items():
+                pending["columns"][column] += amount
+            if extra:
+                pending["extra"].update(extra)
+            if signal_only is True:
+                pending["signal_only"] = True
+
+            should_flush = (
+                len(self._coalesced_incrs) >= self.incr_coalesce_batch_size
+                or time() - self._coalesced_since >= self.incr_coalesce_window
+            )
+
+        if should_flush:
+            self.flush_incrs()
+
+    def flush_incrs(self):
+        """
+        Writes all increments coalesced in this process to Redis, using one
+        pipeline per Redis host. The increments of a host that cannot be
+        written are kept for the next flush.
+        """
+        with self._coalesce_lock:
+            pending, self._coalesced_incrs = self._coalesced_incrs, {}
+            self._coalesced_since = None
+
+        if not pending:
+            return
+
+        router = self.cluster.get_router()
+        by_host = defaultdict(list)
+        for key, item in pending.items():
+            by_host[router.get_host_for_key(key)].append((key, item))
+
+        for host_id, items in by_host.items():
+            try:
+                pipe = self.cluster.get_local_client(host_id).pipeline()
+                for key, item in items:
+                    self._pipeline_incr(
+                        pipe,
+                        key,
+                        item["model"],
+                        item["columns"],
+                        item["filters"],
+                        item["extra"],
+                        item["signal_only"],
+                    )
+                pipe.execute()
+            except Exception:
+                self.logger.exception(
+                    "buffer.incr.flush-failed", extra={"host_id": host_id, "keys": len(items)}
+                )
+                metrics.incr("buffer.incr.flush-failed", skip_internal=True)
+                self._requeue_incrs(items)
+
+        metrics.timing("buffer.incr.coalesced-keys", len(pending))
+
+    def _requeue_incrs(self, items):
+        """
+        Merges increments that could not be written back into the
+        accumulator. They are older than anything coalesced since, so their
+        ``extra`` values lose against newer ones.
+        """
+        with self._coalesce_lock:
+            for key, item in items:
+                pending = self._coalesced_incrs.get(key)
+                if pending is None:
+                    self._coalesced_incrs[key] = item
+                    continue
+
+                for column, amount in item["columns"].items():
+                    pending["columns"][column] += amount
+                pending["extra"] = {**item["extra"], **pending["extra"]}
+                if item["signal_only"] is True:
+                    pending["signal_only"] = True
+
+            if self._coalesced_incrs and self._coalesced_since is None:
+                self._coalesced_since = time()
+
+    def _flush_incrs_on_shutdown(self, **kwargs):
+        self.flush_incrs()
+
+    def _flush_incrs_after_task(self, **kwargs):
+        self.flush_incrs()
 
     def process_pending(self, partition=None):
         if partition is None and self.pending_partitions > 1:
@@ -227,32 +376,77 @@ class RedisBuffer(Buffer):
         if not client.set(lock_key, "1", nx=True, ex=60):
             return
 
-        pending_buffer = PendingBuffer(self.incr_batch_size)
-
         try:
-            keycount = 0
-            with self.cluster.all() as conn:
-                results = conn.zrange(pending_key, 0, -1)
-
-            with self.cluster.all() as conn:
-                for host_id, keys in results.value.items():
-                    if not keys:
-                        continue
-                    keycount += len(keys)
-                    for key in keys:
-                        pending_buffer.append(key.decode("utf-8"))
-                        if pending_buffer.full():
-                            process_incr.apply_async(kwargs={"batch_keys": pending_buffer.flush()})
-                    conn.target([host_id]).zrem(pending_key, *keys)
-
-            # queue up remainder of pending keys
-            if not pending_buffer.empty():
-                process_incr.apply_async(kwargs={"batch_keys": pending_buffer.flush()})
-
-            metrics.timing("buffer.pending-size", keycount)
+            if self.bulk_flush:
+                self._process_pending_bulk(pending_key)
+            else:
+                self._process_pending_tasks(pending_key)
         finally:
             client.delete(lock_key)
 
+    def _process_pending_tasks(self, pending_key):
+        pending_buffer = PendingBuffer(self.incr_batch_size)
+
+        keycount = 0
+        with self.cluster.all() as conn:
+            results = conn.zrange(pending_key, 0, -1)
+
+        with self.cluster.all() as conn:
+            for host_id, keys in results.value.items():
+                if not keys:
+                    continue
+                keycount += len(keys)
+                for key in keys:
+                    pending_buffer.append(key.decode("utf-8"))
+                    if pending_buffer.full():
+                        process_incr.apply_async(kwargs={"batch_keys": pending_buffer.flush()})
+                conn.target([host_id]).zrem(pending_key, *keys)
+
+        # queue up remainder of pending keys
+        if not pending_buffer.empty():
+            process_incr.apply_async(kwargs={"batch_keys": pending_buffer.flush()})
+
+        metrics.timing("buffer.pending-size", keycount)
+
+    def _process_pending_bulk(self, pending_key):
+        """
+        Drains the pending set of every host in chunks of ``flush_chunk_size``
+        keys and writes each chunk with ``Buffer.process_batch``.
+
+        Popping a key off the pending set claims it, and the hash is read and
+        deleted in a single transaction, so no per-key lock is required.
+        Anything left after ``max_flush_chunks`` chunks is picked up by the
+        next run.
+        """
+        keycount = 0
+        for host_id in self.cluster.hosts:
+            conn = self.cluster.get_local_client(host_id)
+            for _ in range(self.max_flush_chunks):
+                popped = conn.zpopmin(pending_key, self.flush_chunk_size)
+                if not popped:
+                    break
+                keycount += len(popped)
+                metrics.timing("buffer.flush.lag", time() - min(score for _, score in popped))
+
+                pipe = conn.pipeline()
+                for key, _ in popped:
+                    pipe.hgetall(key)
+                    pipe.delete(key)
+                results = pipe.execute()[::2]
+
+                batch = []
+                for (key, _), values in zip(popped, results):
+                    item = self._load_buffered_values(force_text(key), values)
+                    if item is not None:
+                        batch.append(item)
+                with metrics.timer("buffer.flush.process-batch"):
+                    self.process_batch(batch)
+
+                if len(popped) < self.flush_chunk_size:
+                    break
+
+        metrics.timing("buffer.pending-size", keycount)
+
     def process(self, key=None, batch_keys=None):
         assert not (key is None and batch_keys is None)
         assert not (key is not None and batch_keys is not None)
@@ -283,42 +477,52 @@ class RedisBuffer(Buffer):
             pipe.delete(key)
             values = pipe.execute()[0]
 
-            # XXX(python3): In python2 this isn't as important since redis will
-            # return string tyes (be it, byte strings), but in py3 we get bytes
-            # back, and really we just want to deal with keys as strings.
-            values = {force_text(k): v for k, v in values.items()}
-
-            if not values:
-                metrics.incr("buffer.revoked", tags={"reason": "empty"}, skip_internal=False)
-                self.logger.debug("buffer.revoked.empty", extra={"redis_key": key})
-                return
-
-            # XXX(py3): Note that ``import_string`` explicitly wants a str in
-            # python2, so we'll decode (for python3) and then translate back to
-            # a byte string (in python2) for import_string.
-            model = import_string(str(values.pop("m").decode("utf-8")))
-
-            if values["f"].startswith(b"{"):
-                filters = self._load_values(json.loads(values.pop("f").decode("utf-8")))
-            else:
-                # TODO(dcramer): legacy pickle support - remove in Sentry 9.1
-                filters = pickle.loads(values.pop("f"))
-
-            incr_values = {}
-            extra_values = {}
-            signal_only = None
-            for k, v in values.items():
-                if k.startswith("i+"):
-                    incr_values[k[2:]] = int(v)
-                elif k.startswith("e+"):
-                    if v.startswith(b"["):
-                        extra_values[k[2:]] = self._load_value(json.loads(v.decode("utf-8")))
-                    else:
-                        # TODO(dcramer): legacy pickle support - remove in Sentry 9.1
-                        extra_values[k[2:]] = pickle.loads(v)
-                elif k == "s":
-                    signal_only = bool(int(v))  # Should be 1 if set
-
-            super().process(model, incr_values, filters, extra_values, signal_only)
+            item = self._load_buffered_values(key, values)
+            if item is not None:
+                super().process(*item)
         finally:
             client.delete(lock_key)
+
+    def _load_buffered_values(self, key, values):
+        """
+        Turns the raw contents of a buffer hash into the
+        ``(model, columns, filters, extra, signal_only)`` arguments of
+        ``Buffer.process``. Returns ``None`` if the hash was empty.
+        """
+        # XXX(python3): In python2 this isn't as important since redis will
+        # return string tyes (be it, byte strings), but in py3 we get bytes
+        # back, and really we just want to deal with keys as strings.
+        values = {force_text(k): v for k, v in values.items()}
+
+        if not values:
+            metrics.incr("buffer.revoked", tags={"reason": "empty"}, skip_internal=False)
+            self.logger.debug("buffer.revoked.empty", extra={"redis_key": key})
+            return None
+
+        # XXX(py3): Note that ``import_string`` explicitly wants a str in
+        # python2, so we'll decode (for python3) and then translate back to
+        # a byte string (in python2) for import_string.
+        model = import_string(str(values.pop("m").decode("utf-8")))
+
+        if values["f"].startswith(b"{"):
+            filters = self._load_values(json.loads(values.pop("f").decode("utf-8")))
+        else:
+            # TODO(dcramer): legacy pickle support - remove in Sentry 9.1
+            filters = pickle.loads(values.pop("f"))
+
+        incr_values = {}
+        extra_values = {}
+        signal_only = None
+        for k, v in values.items():
+            if k.startswith("i+"):
+                incr_values[k[2:]] = int(v)
+            elif k.startswith("e+"):
+                if v.startswith(b"["):
+                    extra_values[k[2:]] = self._load_value(json.loads(v.decode("utf-8")))
+                else:
+                    # TODO(dcramer): legacy pickle support - remove in Sentry 9.1
+                    extra_values[k[2:]] = pickle.loads(v)
+            elif k == "s":
+                signal_only = bool(int(v))  # Should be 1 if set
+
+        return model, incr_values, filters, extra_values, signal_only
@@ -1158,6 +1158,11 @@ SENTRY_FEATURES = {
     # group sorted alphabetically.
 }
 
+# Number of seconds feature checks are cached in a process-local cache. Checks
+# are always cached within `features.local_cache()` scopes. Set to 0 to
+# disable the process-local cache.
+SENTRY_FEATURES_LOCAL_CACHE_TTL = 0
+
 # Default time zone for localization in the UI.
 # http://en.wikipedia.org/wiki/List_of_tz_zones_by_name
 SENTRY_DEFAULT_TIME_ZONE = "UTC"
@@ -1328,6 +1333,11 @@ SENTRY_BUFFER_OPTIONS = {}
 SENTRY_CACHE = None
 SENTRY_CACHE_OPTIONS = {}
 
+# Number of seconds between checks for changed options. When set, options are
+# loaded into memory at startup and kept there until they change, instead of
+# being refetched from the cache whenever their TTL expires.
+SENTRY_OPTIONS_POLL_INTERVAL = 0
+
 # Attachment blob cache backend
 SENTRY_ATTACHMENTS = "sentry.attachments.default.DefaultAttachmentCache"
 SENTRY_ATTACHMENTS_OPTIONS = {}
@@ -1405,6 +1415,11 @@ SENTRY_SEARCH_OPTIONS = {}
 SENTRY_TSDB = "sentry.tsdb.dummy.DummyTSDB"
 SENTRY_TSDB_OPTIONS = {}
 
+# Store of recent per-group event and user counts queried by event frequency
+# alert conditions before falling back to the time-series storage backend
+SENTRY_EVENT_FREQUENCY_COUNTER = "sentry.eventfrequency.base.FrequencyCounter"
+SENTRY_EVENT_FREQUENCY_COUNTER_OPTIONS = {}
+
 SENTRY_NEWSLETTER = "sentry.newsletter.base.Newsletter"
 SENTRY_NEWSLETTER_OPTIONS = {}
 
@@ -1430,6 +1445,9 @@ SENTRY_METRICS_SKIP_INTERNAL_PREFIXES = []  # Order this by most frequent prefix
 SENTRY_METRICS_INDEXER = "sentry.sentry_metrics.indexer.postgres_v2.StaticStringsIndexerDecorator"
 SENTRY_METRICS_INDEXER_OPTIONS = {}
 SENTRY_METRICS_INDEXER_CACHE_TTL = 3600 * 2
+# Number of indexer ids kept in a process-local cache in front of the shared
+# cache. Set to 0 to disable.
+SENTRY_METRICS_INDEXER_LOCAL_CACHE_SIZE = 10000
 
 # Release Health
 SENTRY_RELEASE_HEALTH = "sentry.release_health.sessions.SessionsReleaseHealthBackend"
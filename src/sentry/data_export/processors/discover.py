@@ -89,6 +89,7 @@ class DiscoverProcessor:
                 auto_fields=True,
                 auto_aggregations=True,
                 use_aggregate_conditions=True,
+                stream=True,
             )
 
         return data_fn
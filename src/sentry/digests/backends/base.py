@@ -1,5 +1,17 @@
 import logging
-from typing import TYPE_CHECKING, Any, Iterable, Mapping, Optional
+from contextlib import ExitStack, contextmanager
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Iterable,
+    Iterator,
+    Mapping,
+    MutableSet,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 
 from sentry.utils.imports import import_string
 from sentry.utils.services import Service
@@ -25,6 +37,23 @@ class InvalidState(Exception):
     """
 
 
+class DigestBatch:
+    """
+    The target of the ``as`` clause of ``Backend.digest_many``.
+
+    Iterating it yields ``(key, records)`` pairs. Once the context manager has
+    successfully exited, ``closed`` contains the keys of the timelines whose
+    digests were closed, only those should be delivered.
+    """
+
+    def __init__(self, timelines: Iterator[Tuple[str, Sequence["Record"]]]) -> None:
+        self.__timelines = timelines
+        self.closed: MutableSet[str] = set()
+
+    def __iter__(self) -> Iterator[Tuple[str, Sequence["Record"]]]:
+        return self.__timelines
+
+
 class Backend(Service):
     """
     A digest backend coordinates the addition of records to timelines, as well
@@ -58,7 +87,16 @@ class Backend(Service):
     be transitioned to "waiting" instead.)
     """
 
-    __all__ = ("add", "delete", "digest", "enabled", "maintenance", "schedule", "validate")
+    __all__ = (
+        "add",
+        "delete",
+        "digest",
+        "digest_many",
+        "enabled",
+        "maintenance",
+        "schedule",
+        "validate",
+    )
 
     def __init__(self, **options: Any) -> None:
         # The ``minimum_delay`` option defines the default minimum amount of
@@ -168,6 +206,56 @@ class Backend(Service):
         """
         raise NotImplementedError
 
+    @contextmanager
+    def digest_many(
+        self,
+        keys: Sequence[str],
+        minimum_delay: Optional[Union[int, Mapping[str, Optional[int]]]] = None,
+    ) -> Iterator[DigestBatch]:
+        """
+        Extract records from many timelines for processing.
+
+        This works like ``digest``, except that the target of the ``as``
+        clause is a ``DigestBatch`` of ``(key, records)`` pairs, one for each
+        of `keys` that is in the ready state. Timelines that cannot be
+        digested are skipped. The `minimum_delay` may be a mapping of key to
+        the minimum delay of that timeline.
+
+        The iterated timelines are closed when the context manager
+        successfully exits, and their keys are added to ``closed`` of the
+        batch. If an exception is raised, all timelines are preserved.
+        Irrevocable actions should therefore happen after the context manager
+        has exited, and only for the ``closed`` timelines.
+
+        Backends may override this to digest timelines in bulk, this
+        implementation digests them one by one.
+        """
+
+        def get_minimum_delay(key: str) -> Optional[int]:
+            if isinstance(minimum_delay, Mapping):
+                return minimum_delay.get(key)
+            return minimum_delay
+
+        iterated = []
+        with ExitStack() as stack:
+
+            def iterate() -> Iterator[Tuple[str, Sequence["Record"]]]:
+                for key in keys:
+                    try:
+                        records = stack.enter_context(
+                            self.digest(key, minimum_delay=get_minimum_delay(key))
+                        )
+                    except InvalidState as error:
+                        logger.info(f"Skipped digest of {key}: {error}")
+                        continue
+                    iterated.append(key)
+                    yield key, records
+
+            batch = DigestBatch(iterate())
+            yield batch
+
+        batch.closed.update(iterated)
+
     def schedule(
         self, deadline: float, timestamp: Optional[float] = None
     ) -> Optional[Iterable["ScheduleEntry"]]:
@@ -1,14 +1,30 @@
 import logging
+import math
 import time
+from collections import defaultdict
 from contextlib import contextmanager
-from typing import Any, Iterable, Optional, Tuple
+from typing import (
+    Any,
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    MutableMapping,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
 
 from rb.clients import LocalClient
 from redis.exceptions import ResponseError
 
 from sentry.digests import Record, ScheduleEntry
-from sentry.digests.backends.base import Backend, InvalidState
+from sentry.digests.backends.base import Backend, DigestBatch, InvalidState
 from sentry.utils.compat import map
+from sentry.utils.iterators import chunked
 from sentry.utils.locking.backends.redis import RedisLockBackend
 from sentry.utils.locking.lock import Lock
 from sentry.utils.locking.manager import LockManager
@@ -85,6 +101,17 @@ class RedisBackend(Backend):
         # too early.
         self.ttl = options.pop("ttl", 60 * 60)
 
+        # Sets the number of timelines whose records are read together by
+        # ``digest_many``, which bounds the number of records held in memory.
+        self.digest_batch_size = options.pop("digest_batch_size", 20)
+
+        # Sets the time (in seconds) the claims taken by ``digest_many`` are
+        # held for per timeline in the batch, as all of them are held until
+        # the whole batch has been processed. Timelines whose claim expired
+        # before the batch was processed are not closed, and are left for the
+        # next delivery.
+        self.claim_duration = options.pop("claim_duration", 5)
+
         super().__init__(**options)
 
     def validate(self) -> None:
@@ -249,6 +276,174 @@ class RedisBackend(Backend):
                 + [record.key for record in records],
             )
 
+    @contextmanager
+    def digest_many(
+        self,
+        keys: Sequence[str],
+        minimum_delay: Optional[Union[int, Mapping[str, Optional[int]]]] = None,
+        timestamp: Optional[float] = None,
+    ) -> Any:
+        """
+        Claims all timelines of `keys` that are in the ready state, with one
+        script call per host rather than a lock and script call per timeline.
+        Records are read in batches of ``digest_batch_size`` timelines while
+        iterating. All digests that were iterated and are still claimed are
+        closed, and all claims released, with one script call per host on
+        exit.
+        """
+        if timestamp is None:
+            timestamp = time.time()
+
+        lock_duration = max(30, math.ceil(len(keys) * self.claim_duration))
+
+        def get_minimum_delay(key: str) -> int:
+            if isinstance(minimum_delay, Mapping):
+                delay = minimum_delay.get(key)
+            else:
+                delay = minimum_delay
+            return self.minimum_delay if delay is None else delay
+
+        router = self.cluster.get_router()
+        keys_by_host: MutableMapping[int, List[str]] = defaultdict(list)
+        for key in keys:
+            keys_by_host[router.get_host_for_key(f"{self.namespace}:t:{key}")].append(key)
+
+        # The claimed timelines on each host, mapped to the keys of all
+        # records of their digest once they have been iterated.
+        claims: MutableMapping[int, MutableMapping[str, Optional[List[str]]]] = {}
+        try:
+            for host, host_keys in keys_by_host.items():
+                claims[host] = {
+                    key.decode("utf-8"): None
+                    for key, _ in self.__claim_partition(host, host_keys, timestamp, lock_duration)
+                }
+            batch = DigestBatch(self.__iterate_claims(claims))
+            yield batch
+        except BaseException:
+            self.__release_claims(claims, timestamp)
+            raise
+        else:
+            batch.closed.update(self.__release_claims(claims, timestamp, get_minimum_delay))
+
+    def __claim_partition(
+        self, host: int, keys: Sequence[str], timestamp: float, lock_duration: int
+    ) -> Iterable[Tuple[bytes, int]]:
+        # Explicitly typing to satisfy mypy.
+        claimed: Iterable[Tuple[bytes, int]] = script(
+            self.cluster.get_local_client(host),
+            ["-"],
+            [
+                "DIGEST_CLAIM",
+                self.namespace,
+                self.ttl,
+                timestamp,
+                self.locks.backend.prefix,
+                self.locks.backend.uuid,
+                lock_duration,
+                self.capacity if self.capacity else -1,
+                *keys,
+            ],
+        )
+        return claimed
+
+    def __iterate_claims(
+        self, claims: MutableMapping[int, MutableMapping[str, Optional[List[str]]]]
+    ) -> Iterator[Tuple[str, Sequence[Record]]]:
+        for host, timelines in claims.items():
+            client = self.cluster.get_local_client(host)
+            for keys in chunked(list(timelines), self.digest_batch_size):
+                with client.pipeline(transaction=False) as pipeline:
+                    for key in keys:
+                        pipeline.zrevrange(f"{self.namespace}:t:{key}:d", 0, -1, withscores=True)
+                    digests = dict(zip(keys, pipeline.execute()))
+
+                with client.pipeline(transaction=False) as pipeline:
+                    for key in keys:
+                        if digests[key]:
+                            pipeline.mget(
+                                [
+                                    f"{self.namespace}:t:{key}:r:{record_key.decode('utf-8')}"
+                                    for record_key, _ in digests[key]
+                                ]
+                            )
+                    values = iter(pipeline.execute())
+
+                for key in keys:
+                    entries = digests.pop(key)
+                    record_values = next(values) if entries else []
+                    records = [
+                        Record(
+                            record_key.decode("utf-8"),
+                            self.codec.decode(value) if value is not None else None,
+                            float(score),
+                        )
+                        for (record_key, score), value in zip(entries, record_values)
+                    ]
+                    timelines[key] = [record.key for record in records]
+
+                    # See ``digest`` for why records without a value are dropped.
+                    filtered_records = [record for record in records if record.value is not None]
+                    if len(records) != len(filtered_records):
+                        logger.warning(
+                            "Filtered out missing records when fetching digest",
+                            extra={
+                                "key": key,
+                                "record_count": len(records),
+                                "filtered_record_count": len(filtered_records),
+                            },
+                        )
+                    yield key, filtered_records
+
+    def __release_claims(
+        self,
+        claims: MutableMapping[int, MutableMapping[str, Optional[List[str]]]],
+        timestamp: float,
+        get_minimum_delay: Optional[Callable[[str], int]] = None,
+    ) -> Set[str]:
+        closed: Set[str] = set()
+        failure: Optional[Exception] = None
+        for host, timelines in claims.items():
+            if not timelines:
+                continue
+
+            arguments: List[Any] = []
+            for key, record_keys in timelines.items():
+                # Timelines are only closed if they have been iterated.
+                if get_minimum_delay is not None and record_keys is not None:
+                    arguments.extend([key, "1", get_minimum_delay(key), len(record_keys)])
+                    arguments.extend(record_keys)
+                else:
+                    arguments.extend([key, "0", 0, 0])
+
+            try:
+                closed_keys = script(
+                    self.cluster.get_local_client(host),
+                    ["-"],
+                    [
+                        "DIGEST_RELEASE",
+                        self.namespace,
+                        self.ttl,
+                        timestamp,
+                        self.locks.backend.prefix,
+                        self.locks.backend.uuid,
+                        *arguments,
+                    ],
+                )
+                closed.update(key.decode("utf-8") for key in closed_keys)
+            except Exception as error:
+                # Claims expire on their own, so keep releasing the others.
+                logger.error(
+                    f"Failed to release digest claims on partition {host} due to error: {error}",
+                    exc_info=True,
+                )
+                failure = failure or error
+
+        # Closing digests failed, which is reported as a failed digest (unless
+        # the digest already failed for another reason.)
+        if failure is not None and get_minimum_delay is not None:
+            raise failure
+        return closed
+
     def delete(self, key: str, timestamp: Optional[float] = None) -> None:
         if timestamp is None:
             timestamp = time.time()
@@ -16,6 +16,7 @@ from pytz import UTC
 
 from sentry import (
     buffer,
+    eventfrequency,
     eventstore,
     eventstream,
     eventtypes,
@@ -798,6 +799,7 @@ def _tsdb_record_all_metrics(jobs):
 
     # XXX: validate whether anybody actually uses those metrics
 
+    frequency_items = []
     for job in jobs:
         incrs = []
         frequencies = []
@@ -844,6 +846,20 @@ def _tsdb_record_all_metrics(jobs):
         if frequencies:
             tsdb.record_frequency_multi(frequencies, timestamp=event.datetime)
 
+        if group:
+            frequency_items.append(
+                (
+                    group.id,
+                    environment.id,
+                    event.datetime,
+                    user.tag_value if user else None,
+                    job.get("is_new", False),
+                )
+            )
+
+    if frequency_items:
+        eventfrequency.record_multi(frequency_items)
+
 
 @metrics.wraps("save_event.nodestore_save_many")
 def _nodestore_save_many(jobs):
@@ -1774,6 +1790,17 @@ def _calculate_span_grouping(jobs, projects):
 
 @metrics.wraps("event_manager.save_transaction_events")
 def save_transaction_events(jobs, projects):
+    prepare_transaction_events(jobs, projects)
+    commit_transaction_events(jobs)
+    return jobs
+
+
+def prepare_transaction_events(jobs, projects):
+    """
+    Resolves everything transaction events are saved with. This only reads
+    and creates models that are looked up again when saving the same events
+    once more, so it can be retried.
+    """
     with metrics.timer("event_manager.save_transactions.collect_organization_ids"):
         organization_ids = {project.organization_id for project in projects.values()}
 
@@ -1809,8 +1836,17 @@ def save_transaction_events(jobs, projects):
     _materialize_metadata_many(jobs)
     _get_or_create_environment_many(jobs, projects)
     _get_or_create_release_associated_models(jobs, projects)
-    _tsdb_record_all_metrics(jobs)
     _materialize_event_metrics(jobs)
+    return jobs
+
+
+def commit_transaction_events(jobs):
+    """
+    Records and stores transaction events prepared by
+    ``prepare_transaction_events``. Counters and outcomes are not idempotent,
+    so this must not be retried once it started.
+    """
+    _tsdb_record_all_metrics(jobs)
     _nodestore_save_many(jobs)
     _eventstream_insert_many(jobs)
     _track_outcome_accepted_many(jobs)
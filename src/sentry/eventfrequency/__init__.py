@@ -0,0 +1,12 @@
+from django.conf import settings
+
+from sentry.utils.services import LazyServiceWrapper
+
+from .base import FrequencyCounter
+
+backend = LazyServiceWrapper(
+    FrequencyCounter,
+    settings.SENTRY_EVENT_FREQUENCY_COUNTER,
+    settings.SENTRY_EVENT_FREQUENCY_COUNTER_OPTIONS,
+)
+backend.expose(locals())
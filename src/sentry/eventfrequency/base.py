@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Optional, Sequence, Tuple
+
+from sentry.tsdb.base import TSDBModel
+from sentry.utils.services import Service
+
+# (group_id, environment_id, timestamp, user, is_new)
+FrequencyItem = Tuple[int, int, datetime, Optional[str], bool]
+# (model, group_id, start, end, environment_id)
+FrequencyRequest = Tuple[TSDBModel, int, datetime, datetime, Optional[int]]
+
+
+class FrequencyCounter(Service):
+    """
+    A store of recent event and user counts of groups that event frequency
+    alert conditions can query in constant time, instead of querying tsdb for
+    every event.
+
+    The store only answers for windows it has complete data for; everything
+    else has to be queried from tsdb. This base implementation stores nothing.
+    """
+
+    __all__ = ("models", "record_multi", "get_totals", "invalidate", "validate")
+
+    models = frozenset([TSDBModel.group, TSDBModel.users_affected_by_group])
+
+    def record_multi(self, items: Sequence[FrequencyItem]) -> None:
+        """
+        Records events. Each item is a ``(group_id, environment_id, timestamp,
+        user, is_new)`` tuple, where `user` is the tag value of the user of
+        the event (if any) and `is_new` is whether the event created the group.
+        """
+
+    def get_totals(self, requests: Sequence[FrequencyRequest]) -> Sequence[int | None]:
+        """
+        Returns the number of events (for ``TSDBModel.group``) or distinct
+        users (for ``TSDBModel.users_affected_by_group``) of groups in time
+        windows. Each request is a ``(model, group_id, start, end,
+        environment_id)`` tuple. The total is ``None`` where the store does
+        not have complete data for the window.
+        """
+        return [None] * len(requests)
+
+    def invalidate(self, group_ids: Sequence[int]) -> None:
+        """
+        Stops answering for the past windows of groups whose events were
+        changed outside of ``record_multi``, e.g. by merging, unmerging or
+        reprocessing them. Only events recorded afterwards are answered for.
+        """
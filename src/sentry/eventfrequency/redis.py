@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import logging
+from itertools import groupby
+from time import time
+from typing import Any, List, MutableMapping, Sequence, Tuple
+
+from sentry.eventfrequency.base import FrequencyCounter, FrequencyItem, FrequencyRequest
+from sentry.exceptions import InvalidConfiguration
+from sentry.tsdb.base import TSDBModel
+from sentry.utils import metrics, redis
+from sentry.utils.dates import to_timestamp
+
+logger = logging.getLogger(__name__)
+
+
+class RedisFrequencyCounter(FrequencyCounter):
+    """
+    Keeps the event counts of groups in buckets of `rollup` seconds, and
+    their distinct users in HyperLogLogs of `user_rollup` seconds, to answer
+    windows of up to `retention` seconds. Data is kept one rollup longer than
+    that, so a window of `retention` seconds can still be answered a little
+    after its end was taken, as it is by alert rules. Totals are summed over all buckets overlapping
+    a window, so they may include events up to one bucket before its start,
+    just like tsdb rollups do.
+
+    The store only has complete data for a group since its first recorded
+    event, unless that event created the group. That point in time is kept
+    per group for as long as the group receives events, and is reset when
+    the group is invalidated; windows starting before it are left to tsdb.
+
+    All keys of a group contain its id as a hash tag so that they live on the
+    same node.
+    """
+
+    def __init__(
+        self,
+        cluster: str = "default",
+        rollup: int = 10,
+        user_rollup: int = 60,
+        retention: int = 3600,
+        **options: Any,
+    ) -> None:
+        self.client = redis.redis_clusters.get(cluster)
+        self.rollup = rollup
+        self.user_rollup = user_rollup
+        self.retention = retention
+        self.max_age = retention + max(rollup, user_rollup)
+        # Every counter hash holds the buckets of one retention period.
+        self.buckets_per_key = retention // rollup
+
+    def validate(self) -> None:
+        try:
+            self.client.ping()
+        except Exception as e:
+            raise InvalidConfiguration(str(e))
+
+    def _get_covered_since_key(self, group_id: int) -> str:
+        return f"rfc:s:{{{group_id}}}"
+
+    def _get_counter_key(self, group_id: int, environment_id: int | None, bucket: int) -> str:
+        return f"rfc:c:{{{group_id}}}:{environment_id or ''}:{bucket // self.buckets_per_key}"
+
+    def _get_users_key(self, group_id: int, environment_id: int | None, bucket: int) -> str:
+        return f"rfc:u:{{{group_id}}}:{environment_id or ''}:{bucket}"
+
+    def record_multi(self, items: Sequence[FrequencyItem]) -> None:
+        now = time()
+        try:
+            with self.client.pipeline(transaction=False) as pipe:
+                for group_id, environment_id, timestamp, user, is_new in items:
+                    covered_since_key = self._get_covered_since_key(group_id)
+                    pipe.set(covered_since_key, 0 if is_new else now, nx=True, ex=self.max_age)
+                    pipe.expire(covered_since_key, self.max_age)
+
+                    ts = min(to_timestamp(timestamp), now)
+                    if ts < now - self.max_age:
+                        continue
+
+                    bucket = int(ts // self.rollup)
+                    user_bucket = int(ts // self.user_rollup)
+                    for env_id in {None, environment_id}:
+                        counter_key = self._get_counter_key(group_id, env_id, bucket)
+                        pipe.hincrby(counter_key, bucket, 1)
+                        pipe.expire(counter_key, 2 * self.retention)
+
+                        if user:
+                            users_key = self._get_users_key(group_id, env_id, user_bucket)
+                            pipe.pfadd(users_key, user)
+                            pipe.expire(users_key, self.max_age + self.user_rollup)
+                pipe.execute()
+        except Exception:
+            logger.exception("Failed to record event frequencies")
+
+    def invalidate(self, group_ids: Sequence[int]) -> None:
+        with self.client.pipeline(transaction=False) as pipe:
+            for group_id in group_ids:
+                pipe.delete(self._get_covered_since_key(group_id))
+            pipe.execute()
+
+    def get_totals(self, requests: Sequence[FrequencyRequest]) -> Sequence[int | None]:
+        totals: List[int | None] = [None] * len(requests)
+        now = time()
+        group_ids = sorted({group_id for _, group_id, _, _, _ in requests})
+        queried: List[Tuple[int, TSDBModel, int, float, int]] = []
+
+        try:
+            with self.client.pipeline(transaction=False) as pipe:
+                for group_id in group_ids:
+                    pipe.get(self._get_covered_since_key(group_id))
+
+                for index, (model, group_id, start, end, environment_id) in enumerate(requests):
+                    start_ts, end_ts = to_timestamp(start), to_timestamp(end)
+                    if model not in self.models or start_ts < now - self.max_age:
+                        continue
+
+                    if model == TSDBModel.group:
+                        buckets = range(
+                            int(start_ts // self.rollup), int(end_ts // self.rollup) + 1
+                        )
+                        commands = 0
+                        for _, key_buckets in groupby(buckets, lambda b: b // self.buckets_per_key):
+                            key_buckets = list(key_buckets)
+                            pipe.hmget(
+                                self._get_counter_key(group_id, environment_id, key_buckets[0]),
+                                key_buckets,
+                            )
+                            commands += 1
+                    else:
+                        pipe.pfcount(
+                            *(
+                                self._get_users_key(group_id, environment_id, bucket)
+                                for bucket in range(
+                                    int(start_ts // self.user_rollup),
+                                    int(end_ts // self.user_rollup) + 1,
+                                )
+                            )
+                        )
+                        commands = 1
+                    queried.append((index, model, group_id, start_ts, commands))
+
+                replies = pipe.execute()
+        except Exception:
+            logger.exception("Failed to fetch event frequencies")
+            return totals
+
+        covered_since: MutableMapping[int, float | None] = {
+            group_id: float(value) if value is not None else None
+            for group_id, value in zip(group_ids, replies)
+        }
+        position = len(group_ids)
+        for index, model, group_id, start_ts, commands in queried:
+            values = replies[position : position + commands]
+            position += commands
+
+            since = covered_since[group_id]
+            if since is None or since > start_ts:
+                continue
+
+            if model == TSDBModel.group:
+                totals[index] = sum(int(count) for value in values for count in value if count)
+            else:
+                totals[index] = values[0]
+
+        metrics.incr("eventfrequency.hits", amount=sum(total is not None for total in totals))
+        metrics.incr("eventfrequency.misses", amount=sum(total is None for total in totals))
+        return totals
@@ -3,7 +3,7 @@ import random
 from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from contextlib import contextmanager
 from enum import Enum
-from typing import Any, Generator, Mapping, Optional, Sequence
+from typing import Any, Generator, List, Mapping, MutableMapping, Optional, Sequence
 
 from sentry import options
 from sentry.eventstream.kafka.protocol import (
@@ -11,7 +11,7 @@ from sentry.eventstream.kafka.protocol import (
     get_task_kwargs_for_message,
     get_task_kwargs_for_message_from_headers,
 )
-from sentry.tasks.post_process import post_process_group
+from sentry.tasks.post_process import post_process_group, post_process_group_batch
 from sentry.utils import metrics
 from sentry.utils.batching_kafka_consumer import AbstractBatchWorker
 from sentry.utils.cache import cache_key_for_event
@@ -23,6 +23,8 @@ _DURATION_METRIC = "eventstream.duration"
 _CONCURRENCY_METRIC = "eventstream.concurrency"
 _MESSAGES_METRIC = "eventstream.messages"
 _CONCURRENCY_OPTION = "post-process-forwarder:concurrency"
+_BATCH_BY_GROUP_OPTION = "post-process-forwarder:batch-by-group"
+_MAX_GROUP_BATCH_SIZE_OPTION = "post-process-forwarder:max-group-batch-size"
 _TRANSACTION_FORWARDER_HEADER = "transaction_forwarder"
 
 
@@ -91,12 +93,55 @@ def dispatch_post_process_group_task(
         )
 
 
-def _get_task_kwargs_and_dispatch(message: Message):
+def dispatch_post_process_group_batches(task_kwargs_list: Sequence[Mapping[str, Any]]) -> None:
+    """
+    Dispatches the post processing of several events, with one task per
+    group for all of the group's events.
+    """
+    task_kwargs_by_group: MutableMapping[int, List[Mapping[str, Any]]] = {}
+    for task_kwargs in task_kwargs_list:
+        if task_kwargs["group_id"] is None or task_kwargs.get("skip_consume"):
+            dispatch_post_process_group_task(**task_kwargs)
+        else:
+            task_kwargs_by_group.setdefault(task_kwargs["group_id"], []).append(task_kwargs)
+
+    max_batch_size = max(1, options.get(_MAX_GROUP_BATCH_SIZE_OPTION))
+    for group_id, group_task_kwargs in task_kwargs_by_group.items():
+        if len(group_task_kwargs) == 1:
+            dispatch_post_process_group_task(**group_task_kwargs[0])
+            continue
+
+        for i in range(0, len(group_task_kwargs), max_batch_size):
+            events = [
+                {
+                    "is_new": task_kwargs["is_new"],
+                    "is_regression": task_kwargs["is_regression"],
+                    "is_new_group_environment": task_kwargs["is_new_group_environment"],
+                    "primary_hash": task_kwargs["primary_hash"],
+                    "cache_key": cache_key_for_event(
+                        {"project": task_kwargs["project_id"], "event_id": task_kwargs["event_id"]}
+                    ),
+                }
+                for task_kwargs in group_task_kwargs[i : i + max_batch_size]
+            ]
+            metrics.incr("eventstream.post_process_group_batch.events", amount=len(events))
+            post_process_group_batch.delay(group_id=group_id, events=events)
+
+
+def _get_task_kwargs_and_record(message: Message) -> Optional[Mapping[str, Any]]:
     task_kwargs = _get_task_kwargs(message)
     if not task_kwargs:
         return None
 
     _record_metrics(message.partition(), task_kwargs)
+    return task_kwargs
+
+
+def _get_task_kwargs_and_dispatch(message: Message):
+    task_kwargs = _get_task_kwargs_and_record(message)
+    if not task_kwargs:
+        return None
+
     dispatch_post_process_group_task(**task_kwargs)
 
 
@@ -120,7 +165,12 @@ class PostProcessForwarderWorker(AbstractBatchWorker):
         Process the message received by the consumer and return the Future associated with the message. The future
         is stored in the batch of batching_kafka_consumer and provided as an argument to flush_batch. If None is
         returned, the batching_kafka_consumer will not add the return value to the batch.
+
+        When batching by group, tasks are only dispatched once the whole batch has been processed, see
+        flush_batch.
         """
+        if options.get(_BATCH_BY_GROUP_OPTION):
+            return self.__executor.submit(_get_task_kwargs_and_record, message)
         return self.__executor.submit(_get_task_kwargs_and_dispatch, message)
 
     def flush_batch(self, batch: Optional[Sequence[Future]]) -> None:
@@ -135,6 +185,11 @@ class PostProcessForwarderWorker(AbstractBatchWorker):
                 if exc is not None:
                     raise exc
 
+            # Messages processed while batching by group have not been dispatched yet.
+            undispatched = [future.result() for future in batch if future.result() is not None]
+            if undispatched:
+                dispatch_post_process_group_batches(undispatched)
+
         # Check if the concurrency settings have changed. If yes, then shutdown the existing executor
         # and create a new one with the new settings
         new_concurrency = options.get(_CONCURRENCY_OPTION)
@@ -216,3 +216,5 @@ all = default_manager.all
 add_handler = default_manager.add_handler
 add_entity_handler = default_manager.add_entity_handler
 has_for_batch = default_manager.has_for_batch
+has_for_batch_handlers = default_manager.has_for_batch_handlers
+local_cache = default_manager.local_cache
@@ -0,0 +1,134 @@
+"""
+Memoization of feature checks.
+
+Hot paths such as relay config generation and post processing check the same
+flags for the same organization or project many times. Checks of
+organization and project features are memoized in two tiers:
+
+1. Within a ``local_cache()`` scope, i.e. for the duration of a single request
+   or task on the current thread.
+2. Optionally in a process-local cache for
+   ``SENTRY_FEATURES_LOCAL_CACHE_TTL`` seconds.
+
+Both tiers are invalidated whenever features or handlers are registered, and
+when options or feature settings change.
+"""
+
+__all__ = ["FeatureCheckCache"]
+
+import threading
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, Generator, Hashable, MutableMapping, Optional
+
+from django.conf import settings
+from django.core.signals import setting_changed
+
+from sentry.signals import option_changed
+from sentry.utils import metrics
+from sentry.utils.lru import LRUCache
+
+from .base import Feature, OrganizationFeature, ProjectFeature
+
+if TYPE_CHECKING:
+    from sentry.models import User
+
+
+class _Scope:
+    def __init__(self, generation: int) -> None:
+        self.generation = generation
+        self.values: MutableMapping[Hashable, bool] = {}
+        self.saved = 0
+
+
+class FeatureCheckCache:
+    def __init__(self) -> None:
+        self.generation = 0
+        self._local = threading.local()
+        self._process: LRUCache[Hashable, bool] = LRUCache("features", max_items=10000)
+
+        option_changed.connect(self.clear)
+        setting_changed.connect(self._on_setting_changed)
+
+    def _get_scope(self) -> Optional[_Scope]:
+        scope: Optional[_Scope] = getattr(self._local, "scope", None)
+        if scope is not None and scope.generation != self.generation:
+            scope.generation = self.generation
+            scope.values.clear()
+        return scope
+
+    def get_key(
+        self, feature: Feature, actor: Optional["User"], skip_entity: Optional[bool]
+    ) -> Optional[Hashable]:
+        """
+        Returns the cache key for a feature check, or ``None`` if the check
+        cannot be cached.
+        """
+        if getattr(self._local, "scope", None) is None:
+            if not settings.SENTRY_FEATURES_LOCAL_CACHE_TTL:
+                return None
+
+        # Subclasses may carry additional context (such as a plugin) that the
+        # handlers take into account.
+        if type(feature) is OrganizationFeature:
+            entity_type, entity_id = "organization", feature.organization.id
+        elif type(feature) is ProjectFeature:
+            entity_type, entity_id = "project", feature.project.id
+        else:
+            return None
+
+        actor_id = getattr(actor, "id", None)
+        if entity_id is None or (actor is not None and actor_id is None):
+            return None
+
+        return (feature.name, entity_type, entity_id, actor_id, bool(skip_entity))
+
+    def get(self, key: Hashable) -> Optional[bool]:
+        scope = self._get_scope()
+        if scope is not None:
+            rv = scope.values.get(key)
+            if rv is not None:
+                scope.saved += 1
+                return rv
+
+        if not settings.SENTRY_FEATURES_LOCAL_CACHE_TTL:
+            return None
+
+        rv = self._process.get(key)
+        if rv is not None and scope is not None:
+            scope.values[key] = rv
+            scope.saved += 1
+        return rv
+
+    def set(self, key: Hashable, value: bool) -> None:
+        scope = self._get_scope()
+        if scope is not None:
+            scope.values[key] = value
+
+        ttl = settings.SENTRY_FEATURES_LOCAL_CACHE_TTL
+        if ttl:
+            self._process.set(key, value, ttl=ttl)
+
+    def clear(self, **kwargs: Any) -> None:
+        self.generation += 1
+        self._process.clear()
+
+    def _on_setting_changed(self, setting: str, **kwargs: Any) -> None:
+        if setting.startswith("SENTRY_FEATURES"):
+            self.clear()
+
+    @contextmanager
+    def local_cache(self) -> Generator[None, None, None]:
+        """
+        Memoizes feature checks on the current thread until the scope is
+        exited. Nested scopes share the outermost one.
+        """
+        if getattr(self._local, "scope", None) is not None:
+            yield
+            return
+
+        scope = self._local.scope = _Scope(self.generation)
+        try:
+            yield
+        finally:
+            self._local.scope = None
+            metrics.timing("features.local_cache.saved_checks", scope.saved)
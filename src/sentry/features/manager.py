@@ -5,6 +5,7 @@ from collections import defaultdict
 from typing import (
     TYPE_CHECKING,
     Any,
+    ContextManager,
     Iterable,
     List,
     Mapping,
@@ -19,6 +20,7 @@ import sentry_sdk
 from django.conf import settings
 
 from .base import Feature
+from .cache import FeatureCheckCache
 from .exceptions import FeatureNotRegistered
 
 if TYPE_CHECKING:
@@ -37,6 +39,7 @@ class RegisteredFeatureManager:
 
     def __init__(self) -> None:
         self._handler_registry: MutableMapping[str, List["FeatureHandler"]] = defaultdict(list)
+        self._check_cache = FeatureCheckCache()
 
     def add_handler(self, handler: "FeatureHandler") -> None:
         """
@@ -47,6 +50,7 @@ class RegisteredFeatureManager:
         """
         for feature_name in handler.features:
             self._handler_registry[feature_name].append(handler)
+        self._check_cache.clear()
 
     def _get_handler(self, feature: Feature, actor: "User") -> Optional[bool]:
         for handler in self._handler_registry[feature.name]:
@@ -93,6 +97,30 @@ class RegisteredFeatureManager:
         >>> FeatureManager.has_for_batch('projects:feature', organization, [project1, project2], actor=request.user)
         """
 
+        result = dict(self.has_for_batch_handlers(name, organization, objects, actor))
+
+        default_flag = settings.SENTRY_FEATURES.get(name, False)
+        for obj in objects:
+            result.setdefault(obj, default_flag)
+
+        return result
+
+    def has_for_batch_handlers(
+        self,
+        name: str,
+        organization: "Organization",
+        objects: Sequence["Project"],
+        actor: Optional["User"] = None,
+    ) -> Mapping["Project", bool]:
+        """
+        Determine in a batch if a feature is enabled by the registered feature
+        handlers only.
+
+        Objects for which no handler returned a flag are left out of the
+        result, so callers can apply the remaining steps of
+        ``FeatureManager.has`` themselves.
+        """
+
         result = dict()
         remaining = set(objects)
 
@@ -118,10 +146,6 @@ class RegisteredFeatureManager:
                         result[obj] = flag
                 span.set_data("Flags Found", batch_size - len(remaining))
 
-        default_flag = settings.SENTRY_FEATURES.get(name, False)
-        for obj in remaining:
-            result[obj] = default_flag
-
         return result
 
 
@@ -152,6 +176,7 @@ class FeatureManager(RegisteredFeatureManager):
         if entity_feature:
             self.entity_features.add(name)
         self._feature_registry[name] = cls
+        self._check_cache.clear()
 
     def _get_feature_class(self, name: str) -> Type[Feature]:
         try:
@@ -173,6 +198,17 @@ class FeatureManager(RegisteredFeatureManager):
         Registers a handler that doesn't require a feature name match
         """
         self._entity_handler = handler
+        self._check_cache.clear()
+
+    def local_cache(self) -> ContextManager[None]:
+        """
+        Memoizes organization and project feature checks on the current thread
+        for the duration of the scope, e.g. a request or a task.
+
+        >>> with features.local_cache():
+        >>>     features.has('organizations:feature', organization)
+        """
+        return self._check_cache.local_cache()
 
     def has(
         self, name: str, *args: Any, skip_entity: Optional[bool] = False, **kwargs: Any
@@ -204,12 +240,27 @@ class FeatureManager(RegisteredFeatureManager):
         Depending on the Feature class, additional arguments may need to be
         provided to assign organization or project context to the feature.
 
+        Results of organization and project features are memoized within
+        ``local_cache`` scopes, see ``sentry.features.cache``.
+
         >>> FeatureManager.has('organizations:feature', organization, actor=request.user)
 
         """
         actor = kwargs.pop("actor", None)
         feature = self.get(name, *args, **kwargs)
 
+        cache_key = self._check_cache.get_key(feature, actor, skip_entity)
+        if cache_key is not None:
+            rv = self._check_cache.get(cache_key)
+            if rv is not None:
+                return rv
+
+        rv = self._has(feature, actor, skip_entity)
+        if cache_key is not None:
+            self._check_cache.set(cache_key, rv)
+        return rv
+
+    def _has(self, feature: Feature, actor: Optional["User"], skip_entity: Optional[bool]) -> bool:
         # Check registered feature handlers
         rv = self._get_handler(feature, actor)
         if rv is not None:
@@ -1,6 +1,8 @@
 import base64
 import os
 import zlib
+from collections import defaultdict
+from itertools import chain
 
 import msgpack
 from parsimonious.exceptions import ParseError
@@ -16,7 +18,9 @@ from .matchers import (
     CalleeMatch,
     CallerMatch,
     ExceptionFieldMatch,
+    FamilyMatch,
     FrameMatch,
+    IndexableMatch,
     Match,
     create_match_frame,
 )
@@ -113,8 +117,8 @@ class Enhancements:
             bases = []
         self.bases = bases
 
-        self._modifier_rules = [rule for rule in self.iter_rules() if rule.is_modifier]
-        self._updater_rules = [rule for rule in self.iter_rules() if rule.is_updater]
+        self._modifier_rules = RuleIndex([rule for rule in self.iter_rules() if rule.is_modifier])
+        self._updater_rules = RuleIndex([rule for rule in self.iter_rules() if rule.is_updater])
 
     def apply_modifications_to_frame(self, frames, platform, exception_data):
         """This applies the frame modifications to the frames itself.  This
@@ -125,11 +129,10 @@ class Enhancements:
 
         match_frames = [create_match_frame(frame, platform) for frame in frames]
 
-        for rule in self._modifier_rules:
-            for idx, action in rule.get_matching_frame_actions(
-                match_frames, platform, exception_data, cache
-            ):
-                action.apply_modifications_to_frame(frames, match_frames, idx, rule=rule)
+        for rule, idx, action in self._modifier_rules.iter_matching_frame_actions(
+            match_frames, platform, exception_data, cache
+        ):
+            action.apply_modifications_to_frame(frames, match_frames, idx, rule=rule)
 
     def update_frame_components_contributions(self, components, frames, platform, exception_data):
 
@@ -139,13 +142,11 @@ class Enhancements:
 
         stacktrace_state = StacktraceState()
         # Apply direct frame actions and update the stack state alongside
-        for rule in self._updater_rules:
-
-            for idx, action in rule.get_matching_frame_actions(
-                match_frames, platform, exception_data, cache
-            ):
-                action.update_frame_components_contributions(components, frames, idx, rule=rule)
-                action.modify_stacktrace_state(stacktrace_state, rule)
+        for rule, idx, action in self._updater_rules.iter_matching_frame_actions(
+            match_frames, platform, exception_data, cache
+        ):
+            action.update_frame_components_contributions(components, frames, idx, rule=rule)
+            action.modify_stacktrace_state(stacktrace_state, rule)
 
         # Use the stack state to update frame contributions again to trim
         # down to max-frames.  min-frames is handled on the other hand for
@@ -289,6 +290,24 @@ class Rule:
         self._is_updater = any(action.is_updater for action in actions)
         self._is_modifier = any(action.is_modifier for action in actions)
 
+        # Used by ``RuleIndex`` to skip frames the rule cannot match.
+        self._families = None
+        self._index_key = None
+        for matcher in matchers:
+            if isinstance(matcher, FamilyMatch) and matcher.families is not None:
+                if self._families is None:
+                    self._families = matcher.families
+                else:
+                    self._families &= matcher.families
+            elif isinstance(matcher, IndexableMatch) and matcher.literal_prefix is not None:
+                prefix, exact = matcher.literal_prefix
+                # Prefer exact matches, then the longest prefix.
+                if self._index_key is None or (exact, len(prefix)) > (
+                    self._index_key[2],
+                    len(self._index_key[1]),
+                ):
+                    self._index_key = (matcher.field, prefix, exact)
+
     @property
     def matcher_description(self):
         rv = " ".join(x.description for x in self.matchers)
@@ -312,9 +331,14 @@ class Rule:
             matchers[matcher.key] = matcher.pattern
         return {"match": matchers, "actions": [str(x) for x in self.actions]}
 
-    def get_matching_frame_actions(self, frames, platform, exception_data=None, cache=None):
+    def get_matching_frame_actions(
+        self, frames, platform, exception_data=None, cache=None, frame_indices=None
+    ):
         """Given a frame returns all the matching actions based on this rule.
         If the rule does not match `None` is returned.
+
+        If `frame_indices` is given, only the frames at these indices are
+        considered.
         """
         if not self.matchers:
             return []
@@ -326,8 +350,11 @@ class Rule:
 
         rv = []
 
+        if frame_indices is None:
+            frame_indices = range(len(frames))
+
         # 2 - Check if frame matchers match
-        for idx, frame in enumerate(frames):
+        for idx in frame_indices:
             if all(
                 m.matches_frame(frames, idx, platform, exception_data, cache)
                 for m in self._other_matchers
@@ -351,6 +378,104 @@ class Rule:
         )
 
 
+class RuleIndex:
+    """
+    An ordered list of rules, indexed by the frame properties that cannot
+    change while rules are applied: the family, and literal prefixes of
+    ``function`` and ``module`` patterns. The index only narrows down the
+    frames each rule is checked against, every candidate is still checked
+    with all of the rule's matchers, so the results are the same as checking
+    every rule against every frame.
+    """
+
+    INDEXED_FIELDS = ("function", "module")
+
+    def __init__(self, rules):
+        self.rules = rules
+        # Rules that need to be checked against every frame of their families.
+        self._unindexed = []
+        # field -> literal -> rule positions
+        self._exact = {field: defaultdict(list) for field in self.INDEXED_FIELDS}
+        # field -> prefix -> rule positions
+        self._prefixes = {field: defaultdict(list) for field in self.INDEXED_FIELDS}
+
+        for pos, rule in enumerate(rules):
+            if rule._index_key is None:
+                self._unindexed.append(pos)
+                continue
+            field, prefix, exact = rule._index_key
+            (self._exact if exact else self._prefixes)[field][prefix].append(pos)
+
+        self._prefix_lengths = {
+            field: sorted({len(prefix) for prefix in self._prefixes[field]})
+            for field in self.INDEXED_FIELDS
+        }
+
+    def __iter__(self):
+        return iter(self.rules)
+
+    def __len__(self):
+        return len(self.rules)
+
+    def _get_candidate_frames(self, match_frames):
+        """
+        Returns the indices of the frames each rule has to be checked
+        against, in frame order.
+        """
+        rules = self.rules
+        candidates = defaultdict(list)
+
+        frames_by_family = defaultdict(list)
+        for idx, match_frame in enumerate(match_frames):
+            frames_by_family[match_frame["family"]].append(idx)
+
+        for pos in self._unindexed:
+            families = rules[pos]._families
+            if families is None:
+                candidates[pos] = range(len(match_frames))
+            else:
+                candidates[pos] = sorted(
+                    chain.from_iterable(frames_by_family.get(f, ()) for f in families)
+                )
+
+        for idx, match_frame in enumerate(match_frames):
+            family = match_frame["family"]
+            for field in self.INDEXED_FIELDS:
+                value = match_frame[field]
+                if value is None:
+                    continue
+
+                positions = list(self._exact[field].get(value, ()))
+                prefixes = self._prefixes[field]
+                for length in self._prefix_lengths[field]:
+                    if length > len(value):
+                        break
+                    positions.extend(prefixes.get(value[:length], ()))
+
+                for pos in positions:
+                    families = rules[pos]._families
+                    if families is None or family in families:
+                        candidates[pos].append(idx)
+
+        return candidates
+
+    def iter_matching_frame_actions(self, match_frames, platform, exception_data, cache):
+        """
+        Yields ``(rule, idx, action)`` for all matching rules, in rule order.
+        Rules are matched one at a time when the previous one has been
+        consumed, so callers may modify `match_frames` in between.
+        """
+        candidates = self._get_candidate_frames(match_frames)
+        for pos, rule in enumerate(self.rules):
+            frame_indices = candidates.get(pos)
+            if not frame_indices:
+                continue
+            for idx, action in rule.get_matching_frame_actions(
+                match_frames, platform, exception_data, cache, frame_indices=frame_indices
+            ):
+                yield rule, idx, action
+
+
 class EnhancmentsVisitor(NodeVisitor):
     visit_comment = visit_empty = lambda *a: None
     unwrapped_exceptions = (InvalidEnhancerConfig,)
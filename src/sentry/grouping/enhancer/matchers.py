@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import FrozenSet, Optional, Tuple
 
 from sentry.grouping.utils import get_rule_bool
 from sentry.stacktraces.functions import get_function_name_for_frame
@@ -28,6 +28,10 @@ assert len(SHORT_MATCH_KEYS) == len(MATCH_KEYS)  # assert short key names are no
 FAMILIES = {"native": "N", "javascript": "J", "all": "a"}
 REVERSE_FAMILIES = {v: k for k, v in FAMILIES.items()}
 
+# Characters with a special meaning in glob patterns. A pattern can only match
+# values that start with the part of the pattern before the first of these.
+GLOB_SPECIAL_CHARS = frozenset(b"*?[]{}\\")
+
 
 MATCHERS = {
     # discover field names
@@ -223,6 +227,13 @@ class FamilyMatch(FrameMatch):
         super().__init__(*args, **kwargs)
         self._flags = set(self._encoded_pattern.split(b","))
 
+    @property
+    def families(self) -> Optional[FrozenSet[bytes]]:
+        """The families a frame must have to match, ``None`` for any family."""
+        if self.negated or b"all" in self._flags:
+            return None
+        return frozenset(self._flags)
+
     def _positive_frame_match(self, match_frame, platform, exception_data, cache):
         if b"all" in self._flags:
             return True
@@ -240,7 +251,44 @@ class InAppMatch(FrameMatch):
         return ref_val is not None and ref_val == match_frame["in_app"]
 
 
-class FunctionMatch(FrameMatch):
+def split_literal_prefix(pattern: bytes) -> Tuple[bytes, bool]:
+    """
+    Returns the literal part of a glob `pattern` before its first special
+    character, and whether the whole pattern is literal.
+    """
+    for idx, char in enumerate(pattern):
+        if char in GLOB_SPECIAL_CHARS:
+            return pattern[:idx], False
+    return pattern, True
+
+
+class IndexableMatch(FrameMatch):
+    """
+    A case sensitive glob match on a frame field that does not change while
+    rules are applied, which allows to index rules by the literal prefix of
+    their pattern.
+    """
+
+    field: str
+
+    @property
+    def literal_prefix(self) -> Optional[Tuple[bytes, bool]]:
+        """
+        The prefix every matching value starts with and whether values must
+        be equal to it, or ``None`` if the matcher cannot be indexed.
+        """
+        if self.negated:
+            return None
+        prefix, exact = split_literal_prefix(self._encoded_pattern)
+        if not prefix:
+            return None
+        return prefix, exact
+
+
+class FunctionMatch(IndexableMatch):
+
+    field = "function"
+
     def _positive_frame_match(self, match_frame, platform, exception_data, cache):
 
         return cached(cache, glob_match, match_frame["function"], self._encoded_pattern)
@@ -255,7 +303,7 @@ class FrameFieldMatch(FrameMatch):
         return cached(cache, glob_match, field, self._encoded_pattern)
 
 
-class ModuleMatch(FrameFieldMatch):
+class ModuleMatch(FrameFieldMatch, IndexableMatch):
 
     field = "module"
 
@@ -6,6 +6,7 @@ from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from typing import (
     Any,
     Callable,
+    List,
     Mapping,
     MutableMapping,
     MutableSequence,
@@ -22,19 +23,29 @@ import sentry_sdk
 from django.conf import settings
 from django.core.cache import cache
 
-from sentry import eventstore, features
+from sentry import buffer, eventstore, features, options, reprocessing
 from sentry.attachments import CachedAttachment, attachment_cache
-from sentry.event_manager import save_attachment
+from sentry.event_manager import (
+    commit_transaction_events,
+    prepare_transaction_events,
+    save_attachment,
+)
 from sentry.eventstore.processing import event_processing_store
 from sentry.ingest.types import ConsumerType
 from sentry.ingest.userreport import Conflict, save_userreport
 from sentry.killswitches import killswitch_matches_context
 from sentry.models import Project
-from sentry.signals import event_accepted
-from sentry.tasks.store import preprocess_event, save_event_transaction
+from sentry.signals import event_accepted, first_transaction_received
+from sentry.tasks.store import (
+    delete_raw_event,
+    preprocess_event,
+    save_event_transaction,
+    time_synthetic_monitoring_event,
+)
 from sentry.utils import json, metrics
 from sentry.utils.batching_kafka_consumer import AbstractBatchWorker
 from sentry.utils.cache import cache_key_for_event
+from sentry.utils.canonical import CanonicalKeyDict
 from sentry.utils.dates import to_datetime
 from sentry.utils.kafka import create_batching_kafka_consumer
 from sentry.utils.sdk import mark_scope_as_unsafe
@@ -94,6 +105,11 @@ class IngestConsumerWorker(AbstractBatchWorker):
             ]
         ] = []
 
+        # Event messages that are processed as a single unit, see
+        # ``_process_event_batch``.
+        event_messages: MutableSequence[Message] = []
+        batch_events = options.get("store.save-transactions-ingest-consumer-batch")
+
         projects_to_fetch = set()
 
         with metrics.timer("ingest_consumer.prepare_messages"):
@@ -101,7 +117,9 @@ class IngestConsumerWorker(AbstractBatchWorker):
                 message_type = message["type"]
                 projects_to_fetch.add(message["project_id"])
 
-                if message_type == "event":
+                if message_type == "event" and batch_events:
+                    event_messages.append(message)
+                elif message_type == "event":
                     other_messages.append((self.__process_event, message))
                 elif message_type == "attachment_chunk":
                     attachment_chunks.append(message)
@@ -124,6 +142,10 @@ class IngestConsumerWorker(AbstractBatchWorker):
                 for attachment_chunk in attachment_chunks:
                     process_attachment_chunk(attachment_chunk, projects=projects)
 
+        if event_messages:
+            with metrics.timer("ingest_consumer.process_event_batch"):
+                self._process_event_batch(event_messages, projects)
+
         if other_messages:
             with metrics.timer("ingest_consumer.process_other_messages_batch"):
                 other_messages_flush_start = time.monotonic()
@@ -148,6 +170,52 @@ class IngestConsumerWorker(AbstractBatchWorker):
                     (time.monotonic() - other_messages_flush_start) / len(other_messages),
                 )
 
+        # Don't hold buffered increments past the batch they were produced in.
+        with metrics.timer("ingest_consumer.flush_buffer_incrs"):
+            buffer.flush_incrs()
+
+    def _process_event_batch(
+        self, messages: Sequence[Message], projects: Mapping[int, Project]
+    ) -> None:
+        """
+        Processes all event messages of a batch as one unit. Payloads are
+        written to the processing store (concurrently, if an executor is
+        available), then transactions without attachments are saved inline
+        together (see ``_save_transaction_batch``), so that releases,
+        environments and other adjacent models are resolved once per batch
+        rather than once per event. All other events are dispatched as usual.
+        """
+        loaded = []
+        for message in messages:
+            result = _load_event(message, projects)
+            if result is not None:
+                loaded.append((message, *result))
+
+        payloads = [data for _, data, _ in loaded]
+        if self.__process_event_executor is None:
+            cache_keys = [_store_event(data) for data in payloads]
+        else:
+            cache_keys = list(self.__process_event_executor.map(_store_event, payloads))
+
+        transactions = []
+        for (message, data, callback), cache_key in zip(loaded, cache_keys):
+            if data.get("type") == "transaction" and not message.get("attachments"):
+                transactions.append(
+                    (
+                        data,
+                        int(message["project_id"]),
+                        float(message["start_time"]),
+                        cache_key,
+                        callback,
+                    )
+                )
+            else:
+                callback(cache_key)
+
+        metrics.timing("ingest_consumer.process_event_batch.transactions", len(transactions))
+        if transactions:
+            _save_transaction_batch(transactions, projects)
+
     def shutdown(self):
         if self.__process_event_executor is not None:
             self.__process_event_executor.shutdown()
@@ -267,7 +335,7 @@ def _load_event(
     ):
         return
 
-    def dispatch_task(cache_key: str) -> None:
+    def dispatch_task(cache_key: str, saved: bool = False) -> None:
         if attachments:
             with sentry_sdk.start_span(op="ingest_consumer.set_attachment_cache"):
                 attachment_objects = [
@@ -279,7 +347,11 @@ def _load_event(
                     cache_key, attachments=attachment_objects, timeout=CACHE_TIMEOUT
                 )
 
-        if data.get("type") == "transaction":
+        if saved:
+            # The transaction has already been saved inline by the consumer,
+            # see ``_save_transaction_batch``.
+            pass
+        elif data.get("type") == "transaction":
             # No need for preprocess/process for transactions thus submit
             # directly transaction specific save_event task.
             save_event_transaction.delay(
@@ -315,6 +387,130 @@ def _store_event(data) -> str:
     return event_processing_store.store(data)
 
 
+def _make_transaction_job(
+    data: Any, project_id: int, start_time: float
+) -> MutableMapping[str, Any]:
+    data = CanonicalKeyDict(data)
+    data["project"] = project_id
+    return {"data": data, "start_time": start_time}
+
+
+@metrics.wraps("ingest_consumer.save_transaction_batch")
+def _save_transaction_batch(
+    transactions: Sequence[Tuple[Any, int, float, str, Callable[..., None]]],
+    projects: Mapping[int, Project],
+) -> None:
+    """
+    Saves stored transaction events inline, mirroring ``_do_save_event`` but
+    saving the whole batch at once. `transactions` holds the payload,
+    project id, start time, cache key and dispatch callback of each event.
+
+    Events that cannot be prepared for saving are dispatched to the
+    ``save_event_transaction`` task instead. Once the batch is being
+    committed it is never saved again, since counters and outcomes may have
+    been recorded for it already.
+    """
+    jobs = []
+    pending = []
+    for data, project_id, start_time, cache_key, callback in transactions:
+        if killswitch_matches_context(
+            "store.load-shed-save-event-projects",
+            {
+                "project_id": project_id,
+                "event_type": "transaction",
+                "platform": data.get("platform") or "none",
+            },
+        ):
+            event_processing_store.delete_by_key(cache_key)
+            callback(cache_key, saved=True)
+            continue
+
+        jobs.append(_make_transaction_job(data, project_id, start_time))
+        pending.append((project_id, start_time, cache_key, callback))
+
+    if not jobs:
+        return
+
+    try:
+        with metrics.timer("ingest_consumer.save_transaction_batch.prepare_transaction_events"):
+            prepare_transaction_events(jobs, projects)
+    except Exception:
+        logger.exception("ingest_consumer.save_transaction_batch.prepare_failed")
+        jobs, pending = _prepare_transactions_individually(pending, projects)
+        if not jobs:
+            return
+
+    try:
+        with metrics.timer("ingest_consumer.save_transaction_batch.commit_transaction_events"):
+            commit_transaction_events(jobs)
+    except Exception:
+        # Like a failing ``save_event_transaction`` task, give up on these
+        # events rather than double counting them.
+        logger.exception("ingest_consumer.save_transaction_batch.commit_failed")
+        for _, _, cache_key, callback in pending:
+            callback(cache_key, saved=True)
+        return
+
+    first_transaction_projects = set()
+    for job, (project_id, start_time, cache_key, callback) in zip(jobs, pending):
+        project = projects[project_id]
+        if not project.flags.has_transactions and project_id not in first_transaction_projects:
+            first_transaction_projects.add(project_id)
+            first_transaction_received.send_robust(
+                project=project, event=job["event"], sender=Project
+            )
+
+        if reprocessing.event_supports_reprocessing(job["data"]):
+            delete_raw_event(project_id, job["event"].event_id, allow_hint_clear=True)
+
+        # Put the updated event back into the cache so that post_process
+        # has the most recent data.
+        data = dict(job["data"].items())
+        with metrics.timer("ingest_consumer.save_transaction_batch.write_processing_cache"):
+            event_processing_store.store(data)
+
+        callback(cache_key, saved=True)
+
+        metrics.timing(
+            "events.time-to-process",
+            time.time() - start_time,
+            instance=data["platform"],
+            tags={"is_reprocessing2": "false"},
+        )
+        time_synthetic_monitoring_event(data, project_id, start_time)
+
+
+def _prepare_transactions_individually(
+    pending: Sequence[Tuple[int, float, str, Callable[..., None]]],
+    projects: Mapping[int, Project],
+) -> Tuple[List[MutableMapping[str, Any]], List[Tuple[int, float, str, Callable[..., None]]]]:
+    """
+    Prepares the events of a batch that failed to prepare one by one, so that
+    only the events that fail on their own are dispatched to the
+    ``save_event_transaction`` task. The failed attempt may have modified the
+    payloads, so they are loaded from the processing store again.
+    """
+    jobs = []
+    prepared = []
+    for project_id, start_time, cache_key, callback in pending:
+        data = event_processing_store.get(cache_key)
+        try:
+            if data is None:
+                raise ValueError("Transaction is missing from the processing store")
+            job = _make_transaction_job(data, project_id, start_time)
+            prepare_transaction_events([job], projects)
+        except Exception:
+            logger.exception(
+                "ingest_consumer.save_transaction_batch.prepare_event_failed",
+                extra={"cache_key": cache_key},
+            )
+            callback(cache_key)
+        else:
+            jobs.append(job)
+            prepared.append((project_id, start_time, cache_key, callback))
+    return jobs, prepared
+
+
 @trace_func(name="ingest_consumer.process_event")
 def process_event(message: Message, projects: Mapping[int, Project]) -> None:
     return _do_process_event(message, projects)
@@ -1,8 +1,13 @@
+from hashlib import sha1
+from operator import itemgetter
+
 from symbolic import SourceView
 
+from sentry import options
+from sentry.utils.lru import LRUCache
 from sentry.utils.strings import codec_lookup
 
-__all__ = ["SourceCache", "SourceMapCache"]
+__all__ = ["SourceCache", "SourceMapCache", "ParsedArtifactCache", "parsed_artifacts"]
 
 
 def is_utf8(codec):
@@ -10,6 +15,22 @@ def is_utf8(codec):
     return name in ("utf-8", "ascii")
 
 
+def to_sourceview(source, encoding=None):
+    if isinstance(source, SourceView):
+        return source
+    if isinstance(source, str):
+        source = source.encode("utf-8")
+    # If an encoding is provided and it's not utf-8 compatible
+    # we try to re-encoding the source and create a source view
+    # from it.
+    elif encoding is not None and not is_utf8(encoding):
+        try:
+            source = source.decode(encoding).encode("utf-8")
+        except UnicodeError:
+            pass
+    return SourceView.from_bytes(source)
+
+
 class SourceCache:
     def __init__(self):
         self._cache = {}
@@ -38,20 +59,7 @@ class SourceCache:
 
     def add(self, url, source, encoding=None):
         url = self._get_canonical_url(url)
-
-        if not isinstance(source, SourceView):
-            if isinstance(source, str):
-                source = source.encode("utf-8")
-            # If an encoding is provided and it's not utf-8 compatible
-            # we try to re-encoding the source and create a source view
-            # from it.
-            elif encoding is not None and not is_utf8(encoding):
-                try:
-                    source = source.decode(encoding).encode("utf-8")
-                except UnicodeError:
-                    pass
-            source = SourceView.from_bytes(source)
-        self._cache[url] = source
+        self._cache[url] = to_sourceview(source, encoding)
 
     def add_error(self, url, error):
         url = self._get_canonical_url(url)
@@ -90,3 +98,61 @@ class SourceMapCache:
             sourcemap = self.get(sourcemap_url)
             return (sourcemap_url, sourcemap)
         return (None, None)
+
+
+class ParsedArtifactCache:
+    """
+    Process-wide cache of parsed artifacts (source views and source map
+    views), shared by the processors of all events handled by a worker.
+
+    Artifacts are keyed by the artifact key of the processor fetching them
+    (which covers the release, dist, url, project and whether scraping is
+    allowed, see ``get_artifact_key``) and the checksum of their contents,
+    so artifacts are never served to a project that could not fetch them
+    itself. The checksum last seen for every artifact key is remembered for
+    ``sourcemaps.local-cache.ttl`` seconds, during which artifacts are served
+    without fetching them at all. After that they are fetched again, but only
+    parsed again if their contents changed.
+    """
+
+    def __init__(self):
+        self.views = LRUCache(
+            "sourcemaps.parsed_artifacts", max_items=10000, max_weight=0, weigher=itemgetter(0)
+        )
+        self.checksums = LRUCache("sourcemaps.artifact_checksums", max_items=10000)
+
+    @property
+    def enabled(self):
+        return options.get("sourcemaps.local-cache.max-bytes") > 0
+
+    def get(self, cache_key):
+        """
+        Returns the parsed artifact for `cache_key` if its contents were seen
+        recently, or ``None``.
+        """
+        checksum = self.checksums.get(cache_key)
+        if checksum is None:
+            return None
+        entry = self.views.get((cache_key, checksum))
+        return entry[1] if entry is not None else None
+
+    def get_or_parse(self, cache_key, body, parse):
+        """
+        Returns the parsed artifact for the fetched `body`, calling `parse`
+        unless an artifact with the same contents was parsed before.
+        """
+        self.views.max_weight = options.get("sourcemaps.local-cache.max-bytes")
+
+        checksum = sha1(body).hexdigest()
+        key = (cache_key, checksum)
+        entry = self.views.get(key)
+        if entry is None:
+            # Parsed views take about as much memory as their source.
+            entry = (len(body), parse())
+            self.views.set(key, entry)
+
+        self.checksums.set(cache_key, checksum, ttl=options.get("sourcemaps.local-cache.ttl"))
+        return entry[1]
+
+
+parsed_artifacts = ParsedArtifactCache()
@@ -3,8 +3,10 @@ import errno
 import logging
 import re
 import sys
+import threading
 import time
 import zlib
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
 from io import BytesIO
 from os.path import splitext
@@ -16,6 +18,7 @@ from django.conf import settings
 from django.utils import timezone
 from django.utils.encoding import force_bytes, force_text
 from requests.utils import get_encoding_from_headers
+from sentry_sdk import Hub
 from symbolic import SourceMapView
 
 from sentry import http, options
@@ -36,7 +39,7 @@ from sentry.utils.retries import ConditionalRetryPolicy, exponential_delay
 from sentry.utils.safe import get_path
 from sentry.utils.urls import non_standard_url_join
 
-from .cache import SourceCache, SourceMapCache
+from .cache import SourceCache, SourceMapCache, parsed_artifacts, to_sourceview
 
 __all__ = ["JavaScriptStacktraceProcessor"]
 
@@ -72,11 +75,17 @@ CACHE_CONTROL_MIN = 60
 # the maximum number of remote resources (i.e. source files) that should be
 # fetched
 MAX_RESOURCE_FETCHES = 100
+# Number of artifacts fetched concurrently per worker process
+MAX_CONCURRENT_FETCHES = 8
 
 CACHE_MAX_VALUE_SIZE = settings.SENTRY_CACHE_MAX_VALUE_SIZE
 
 logger = logging.getLogger(__name__)
 
+_fetch_pool = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_FETCHES)
+_in_flight_lock = threading.Lock()
+_in_flight_fetches = {}
+
 
 class UnparseableSourcemap(http.BadSource):
     error_type = EventError.JS_INVALID_SOURCEMAP
@@ -296,6 +305,46 @@ def get_cache_keys(filename, release, dist):
     return cache_key, cache_key_meta
 
 
+def get_artifact_cache_key(url, release, dist):
+    """
+    Returns the key under which the contents of `url` are cached by
+    `fetch_file`: the release file cache key if there is a release, and the
+    scraping cache key otherwise.
+    """
+    if release:
+        return get_cache_keys(url, release, dist)[0]
+    return get_scraping_cache_key(url)
+
+
+def get_scraping_cache_key(url):
+    return f"source:cache:v4:{md5_text(url).hexdigest()}"
+
+
+def fetch_deduplicated(key, fetch):
+    """
+    Calls `fetch` unless another thread of this process is already fetching
+    `key`, in which case its result (or error) is shared instead.
+    """
+    with _in_flight_lock:
+        future = _in_flight_fetches.get(key)
+        is_owner = future is None
+        if is_owner:
+            future = _in_flight_fetches[key] = Future()
+
+    if not is_owner:
+        metrics.incr("sourcemaps.fetch.deduplicated", skip_internal=True)
+        return future.result()
+
+    try:
+        future.set_result(fetch())
+    except BaseException as exc:
+        future.set_exception(exc)
+    finally:
+        with _in_flight_lock:
+            del _in_flight_fetches[key]
+    return future.result()
+
+
 def result_from_cache(filename, result):
     # Previous caches would be a 3-tuple instead of a 4-tuple,
     # so this is being maintained for backwards compatibility
@@ -623,7 +672,7 @@ def fetch_file(url, project=None, release=None, dist=None, allow_scraping=True):
 
     # otherwise, try the web-scraping cache and then the web itself
 
-    cache_key = f"source:cache:v4:{md5_text(url).hexdigest()}"
+    cache_key = get_scraping_cache_key(url)
 
     if result is None:
         if not allow_scraping or not url.startswith(("http:", "https:")):
@@ -762,6 +811,10 @@ def fetch_sourcemap(url, project=None, release=None, dist=None, allow_scraping=T
                 allow_scraping=allow_scraping,
             )
         body = result.body
+    return parse_sourcemap(url, body)
+
+
+def parse_sourcemap(url, body):
     try:
         with sentry_sdk.start_span(
             op="JavaScriptStacktraceProcessor.fetch_sourcemap.SourceMapView.from_json_bytes"
@@ -1144,77 +1197,91 @@ class JavaScriptStacktraceProcessor(StacktraceProcessor):
         Look for and (if found) cache a source file and its associated source
         map (if any).
         """
+        if self.reserve_fetch(filename):
+            self.cache_artifacts(filename, *self.fetch_artifacts(filename))
 
-        sourcemaps = self.sourcemaps
-        cache = self.cache
-
+    def reserve_fetch(self, filename):
+        """
+        Counts a fetch against `max_fetches`, recording an error for
+        `filename` if there are none left.
+        """
         self.fetch_count += 1
 
         if self.fetch_count > self.max_fetches:
-            cache.add_error(filename, {"type": EventError.JS_TOO_MANY_REMOTE_SOURCES})
-            return
+            self.cache.add_error(filename, {"type": EventError.JS_TOO_MANY_REMOTE_SOURCES})
+            return False
+        return True
 
+    def fetch_artifacts(self, filename):
+        """
+        Fetches a source file and its source map. Returns the results of
+        `fetch_source` and `fetch_sourcemap`, or the `BadSource` errors
+        raised by them. The source map is `None` if there is none or if it
+        was already cached.
+
+        Does not modify the caches of the processor, so that it can be called
+        from worker threads.
+        """
         # TODO: respect cache-control/max-age headers to some extent
         logger.debug("Attempting to cache source %r", filename)
         try:
-            # this both looks in the database and tries to scrape the internet
+            source = self.fetch_source(filename)
+        except http.BadSource as exc:
+            return exc, None
+
+        sourcemap_url = source[2]
+        if not sourcemap_url or sourcemap_url in self.sourcemaps:
+            return source, None
+
+        # pull down sourcemap
+        try:
             with sentry_sdk.start_span(
-                op="JavaScriptStacktraceProcessor.cache_source.fetch_file"
+                op="JavaScriptStacktraceProcessor.cache_source.fetch_sourcemap"
             ) as span:
-                span.set_data("filename", filename)
-                result = fetch_file(
-                    filename,
-                    project=self.project,
-                    release=self.release,
-                    dist=self.dist,
-                    allow_scraping=self.allow_scraping,
-                )
+                span.set_data("sourcemap_url", sourcemap_url)
+                return source, self.fetch_sourcemap(sourcemap_url)
         except http.BadSource as exc:
+            return source, exc
+
+    def cache_artifacts(self, filename, source, sourcemap_view):
+        """
+        Caches the results of `fetch_artifacts` for `filename`.
+        """
+        sourcemaps = self.sourcemaps
+        cache = self.cache
+
+        if isinstance(source, http.BadSource):
             # most people don't upload release artifacts for their third-party libraries,
             # so ignore missing node_modules files
-            if exc.data["type"] == EventError.JS_MISSING_SOURCE and "node_modules" in filename:
+            if source.data["type"] == EventError.JS_MISSING_SOURCE and "node_modules" in filename:
                 pass
             else:
-                cache.add_error(filename, exc.data)
+                cache.add_error(filename, source.data)
 
             # either way, there's no more for us to do here, since we don't have
             # a valid file to cache
             return
-        cache.add(filename, result.body, result.encoding)
-        cache.alias(result.url, filename)
 
-        sourcemap_url = discover_sourcemap(result)
+        source_view, url, sourcemap_url = source
+        cache.add(filename, source_view)
+        cache.alias(url, filename)
+
         if not sourcemap_url:
             return
 
-        logger.debug(
-            "Found sourcemap URL %r for minified script %r", sourcemap_url[:256], result.url
-        )
+        logger.debug("Found sourcemap URL %r for minified script %r", sourcemap_url[:256], url)
         sourcemaps.link(filename, sourcemap_url)
         if sourcemap_url in sourcemaps:
             return
 
-        # pull down sourcemap
-        try:
-            with sentry_sdk.start_span(
-                op="JavaScriptStacktraceProcessor.cache_source.fetch_sourcemap"
-            ) as span:
-                span.set_data("sourcemap_url", sourcemap_url)
-                sourcemap_view = fetch_sourcemap(
-                    sourcemap_url,
-                    project=self.project,
-                    release=self.release,
-                    dist=self.dist,
-                    allow_scraping=self.allow_scraping,
-                )
-        except http.BadSource as exc:
+        if isinstance(sourcemap_view, http.BadSource):
             # we don't perform the same check here as above, because if someone has
             # uploaded a node_modules file, which has a sourceMappingURL, they
             # presumably would like it mapped (and would like to know why it's not
             # working, if that's the case). If they're not looking for it to be
             # mapped, then they shouldn't be uploading the source file in the
             # first place.
-            cache.add_error(filename, exc.data)
+            cache.add_error(filename, sourcemap_view.data)
             return
 
         with sentry_sdk.start_span(
@@ -1230,6 +1297,92 @@ class JavaScriptStacktraceProcessor(StacktraceProcessor):
                 if source_view is not None:
                     self.cache.add(non_standard_url_join(sourcemap_url, source_name), source_view)
 
+    def get_artifact_key(self, kind, url):
+        """
+        Returns the key of an artifact in the process-wide caches. Besides
+        the cache key of its contents this covers everything that affects
+        whether it can be fetched.
+        """
+        cache_key = get_artifact_cache_key(url, self.release, self.dist)
+        return (kind, cache_key, self.project.id, self.allow_scraping)
+
+    def fetch_source(self, filename):
+        """
+        Fetches and parses a source file, unless it is in the process-wide
+        cache of parsed artifacts. Returns a tuple of its source view, the url
+        it was fetched from, and the url of its source map (if any).
+        """
+        key = self.get_artifact_key("source", filename)
+        if parsed_artifacts.enabled:
+            rv = parsed_artifacts.get(key)
+            if rv is not None:
+                return rv
+
+        def fetch():
+            # this both looks in the database and tries to scrape the internet
+            with sentry_sdk.start_span(
+                op="JavaScriptStacktraceProcessor.cache_source.fetch_file"
+            ) as span:
+                span.set_data("filename", filename)
+                result = fetch_file(
+                    filename,
+                    project=self.project,
+                    release=self.release,
+                    dist=self.dist,
+                    allow_scraping=self.allow_scraping,
+                )
+
+            def parse():
+                return (
+                    to_sourceview(result.body, result.encoding),
+                    result.url,
+                    discover_sourcemap(result),
+                )
+
+            if not parsed_artifacts.enabled:
+                return parse()
+            return parsed_artifacts.get_or_parse(key, result.body, parse)
+
+        return fetch_deduplicated(key, fetch)
+
+    def fetch_sourcemap(self, sourcemap_url):
+        """
+        Fetches and parses a source map, unless it is in the process-wide
+        cache of parsed artifacts. Inline (data uri) source maps are never
+        cached.
+        """
+        if is_data_uri(sourcemap_url):
+            return fetch_sourcemap(sourcemap_url)
+
+        key = self.get_artifact_key("sourcemap", sourcemap_url)
+        if parsed_artifacts.enabled:
+            sourcemap_view = parsed_artifacts.get(key)
+            if sourcemap_view is not None:
+                return sourcemap_view
+
+        def fetch():
+            if not parsed_artifacts.enabled:
+                return fetch_sourcemap(
+                    sourcemap_url,
+                    project=self.project,
+                    release=self.release,
+                    dist=self.dist,
+                    allow_scraping=self.allow_scraping,
+                )
+
+            result = fetch_file(
+                sourcemap_url,
+                project=self.project,
+                release=self.release,
+                dist=self.dist,
+                allow_scraping=self.allow_scraping,
+            )
+            return parsed_artifacts.get_or_parse(
+                key, result.body, lambda: parse_sourcemap(sourcemap_url, result.body)
+            )
+
+        return fetch_deduplicated(key, fetch)
+
     def populate_source_cache(self, frames):
         """
         Fetch all sources that we know are required (being referenced directly
@@ -1251,6 +1404,10 @@ class JavaScriptStacktraceProcessor(StacktraceProcessor):
                 continue
             pending_file_list.add(f["abs_path"])
 
+        if len(pending_file_list) > 1 and options.get("sourcemaps.concurrent-fetches"):
+            self.cache_sources_concurrently(pending_file_list)
+            return
+
         for idx, filename in enumerate(pending_file_list):
             with sentry_sdk.start_span(
                 op="JavaScriptStacktraceProcessor.populate_source_cache.cache_source"
@@ -1258,6 +1415,28 @@ class JavaScriptStacktraceProcessor(StacktraceProcessor):
                 span.set_data("filename", filename)
                 self.cache_source(filename=filename)
 
+    def cache_sources_concurrently(self, filenames):
+        """
+        Like `cache_source` for every file, but fetches the files and their
+        source maps in the shared pool of fetch threads.
+        """
+        hub = Hub(Hub.current)
+
+        def fetch_artifacts(filename):
+            with hub, sentry_sdk.start_span(
+                op="JavaScriptStacktraceProcessor.populate_source_cache.fetch_artifacts"
+            ) as span:
+                span.set_data("filename", filename)
+                return self.fetch_artifacts(filename)
+
+        pending = [
+            (filename, _fetch_pool.submit(fetch_artifacts, filename))
+            for filename in filenames
+            if self.reserve_fetch(filename)
+        ]
+        for filename, future in pending:
+            self.cache_artifacts(filename, *future.result())
+
     def close(self):
         StacktraceProcessor.close(self)
         if self.sourcemaps_touched:
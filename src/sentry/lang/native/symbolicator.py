@@ -1,6 +1,7 @@
 import base64
 import logging
 import sys
+import threading
 import time
 import uuid
 from copy import deepcopy
@@ -10,6 +11,7 @@ import jsonschema
 import sentry_sdk
 from django.conf import settings
 from django.urls import reverse
+from requests.adapters import HTTPAdapter
 from requests.exceptions import RequestException
 
 from sentry import features, options
@@ -130,6 +132,43 @@ def _task_id_cache_key_for_event(project_id, event_id):
     return f"symbolicator:{event_id}:{project_id}"
 
 
+_pooled_session = None
+_long_poll_lock = threading.Lock()
+_long_polls_in_flight = 0
+
+
+def get_pooled_session():
+    """
+    Returns the HTTP session shared by all long-polling symbolicator sessions
+    of this process, which keeps connections to symbolicator alive between
+    events.
+    """
+    global _pooled_session
+    with _long_poll_lock:
+        if _pooled_session is None:
+            session = Session()
+            adapter = HTTPAdapter(pool_maxsize=options.get("symbolicator.long-poll.max-concurrent"))
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _pooled_session = session
+        return _pooled_session
+
+
+def _acquire_long_poll():
+    global _long_polls_in_flight
+    with _long_poll_lock:
+        if _long_polls_in_flight >= options.get("symbolicator.long-poll.max-concurrent"):
+            return False
+        _long_polls_in_flight += 1
+        return True
+
+
+def _release_long_poll():
+    global _long_polls_in_flight
+    with _long_poll_lock:
+        _long_polls_in_flight -= 1
+
+
 class Symbolicator:
     def __init__(self, project, event_id):
         symbolicator_options = options.get("symbolicator.options")
@@ -142,6 +181,7 @@ class Symbolicator:
                 "organization", Organization.objects.get_from_cache(id=project.organization_id)
             )
 
+        self.long_poll = options.get("symbolicator.long-poll")
         self.sess = SymbolicatorSession(
             url=base_url,
             project_id=str(project.id),
@@ -149,6 +189,7 @@ class Symbolicator:
             timeout=settings.SYMBOLICATOR_POLL_TIMEOUT,
             sources=get_sources_for_project(project),
             options=get_options_for_project(project),
+            pooled=self.long_poll,
         )
 
         self.task_id_cache_key = _task_id_cache_key_for_event(project.id, event_id)
@@ -172,6 +213,9 @@ class Symbolicator:
                     # have a response ready immediately, so we start polling after
                     # some timeout.
                     json_response = create_task()
+
+                if self.long_poll and json_response["status"] == "pending":
+                    json_response = self._wait_for_task(json_response, task_name)
             except ServiceUnavailable:
                 # 503 can indicate that symbolicator is restarting. Wait for a
                 # reboot, then try again. This overrides the default behavior of
@@ -202,6 +246,39 @@ class Symbolicator:
                 )
                 return json_response
 
+    def _wait_for_task(self, json_response, task_name):
+        """
+        Long-polls symbolicator for the result of a pending task while holding
+        on to the event, instead of bailing out and restarting symbolication
+        from scratch after `retry_after`.
+
+        Gives up after ``symbolicator.long-poll.max-wait`` seconds, when too
+        many tasks are polled concurrently in this process or when
+        symbolicator lost the task, and returns the last response. The task id
+        is stored before waiting so that a restarted worker resumes polling.
+        """
+        if not _acquire_long_poll():
+            metrics.incr("events.symbolicator.long_poll.saturated", tags={"task_name": task_name})
+            return json_response
+
+        try:
+            default_cache.set(
+                self.task_id_cache_key, json_response["request_id"], REQUEST_CACHE_TIMEOUT
+            )
+            deadline = time.monotonic() + options.get("symbolicator.long-poll.max-wait")
+            with metrics.timer("events.symbolicator.long_poll", tags={"task_name": task_name}):
+                while json_response["status"] == "pending" and time.monotonic() < deadline:
+                    response = self.sess.query_task(
+                        json_response["request_id"], timeout=settings.SYMBOLICATOR_POLL_TIMEOUT
+                    )
+                    if response is None:
+                        break
+                    json_response = response
+        finally:
+            _release_long_poll()
+
+        return json_response
+
     def process_minidump(self, minidump):
         return self._process(lambda: self.sess.upload_minidump(minidump), "process_minidump")
 
@@ -481,7 +558,14 @@ class SymbolicatorSession:
     _worker_id = None
 
     def __init__(
-        self, url=None, sources=None, project_id=None, event_id=None, timeout=None, options=None
+        self,
+        url=None,
+        sources=None,
+        project_id=None,
+        event_id=None,
+        timeout=None,
+        options=None,
+        pooled=False,
     ):
         self.url = url
         self.project_id = project_id
@@ -489,6 +573,7 @@ class SymbolicatorSession:
         self.sources = sources or []
         self.options = options or None
         self.timeout = timeout
+        self.pooled = pooled
         self.session = None
 
         # Build some maps for use in ._process_response()
@@ -517,11 +602,12 @@ class SymbolicatorSession:
 
     def open(self):
         if self.session is None:
-            self.session = Session()
+            self.session = get_pooled_session() if self.pooled else Session()
 
     def close(self):
         if self.session is not None:
-            self.session.close()
+            if not self.pooled:
+                self.session.close()
             self.session = None
 
     def _ensure_open(self):
@@ -657,11 +743,12 @@ class SymbolicatorSession:
             files={"apple_crash_report": report},
         )
 
-    def query_task(self, task_id):
+    def query_task(self, task_id, timeout=0):
         task_url = f"requests/{task_id}"
 
         params = {
-            "timeout": 0,  # Only wait when creating, but not when querying tasks
+            # Only wait when creating or long-polling, but not when querying tasks
+            "timeout": timeout,
             "scope": self.project_id,
         }
 
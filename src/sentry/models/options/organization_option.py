@@ -7,6 +7,7 @@ from django.db import models
 from sentry.db.models import FlexibleForeignKey, Model, sane_repr
 from sentry.db.models.fields import EncryptedPickledObjectField
 from sentry.db.models.manager import OptionManager, Value
+from sentry.signals import option_changed
 from sentry.tasks.relay import schedule_update_config_cache
 from sentry.utils.cache import cache
 
@@ -66,6 +67,7 @@ class OrganizationOptionManager(OptionManager["Organization"]):
             schedule_update_config_cache(
                 organization_id=organization_id, generate=False, update_reason=update_reason
             )
+            option_changed.send_robust(sender=self.model, update_reason=update_reason)
 
         cache_key = self._make_key(organization_id)
         result = {i.key: i.value for i in self.filter(organization=organization_id)}
@@ -8,6 +8,7 @@ from sentry import projectoptions
 from sentry.db.models import FlexibleForeignKey, Model, sane_repr
 from sentry.db.models.fields import EncryptedPickledObjectField
 from sentry.db.models.manager import OptionManager, ValidateFunction, Value
+from sentry.signals import option_changed
 from sentry.tasks.relay import schedule_update_config_cache
 from sentry.utils.cache import cache
 
@@ -71,11 +72,43 @@ class ProjectOptionManager(OptionManager["Project"]):
         values: Mapping[str, Value] = self._option_cache.get(cache_key, {})
         return values
 
+    def get_all_values_bulk(self, projects: Sequence[Project]) -> Mapping[int, Mapping[str, Value]]:
+        """
+        Like `get_all_values`, but for many projects at once. Options missing
+        from the local cache are read with a single cache round trip, and
+        options missing from the cache with a single query.
+        """
+        project_ids = {p.id if isinstance(p, models.Model) else p for p in projects}
+        result = {}
+        missing = {}
+        for project_id in project_ids:
+            cache_key = self._make_key(project_id)
+            if cache_key in self._option_cache:
+                result[project_id] = self._option_cache[cache_key]
+            else:
+                missing[cache_key] = project_id
+
+        if missing:
+            for cache_key, values in cache.get_many(list(missing)).items():
+                if values is not None:
+                    self._option_cache[cache_key] = result[missing.pop(cache_key)] = values
+
+        if missing:
+            loaded: dict[str, dict[str, Value]] = {cache_key: {} for cache_key in missing}
+            for option in self.filter(project__in=list(missing.values())):
+                loaded[self._make_key(option.project_id)][option.key] = option.value
+            cache.set_many(loaded)
+            for cache_key, values in loaded.items():
+                self._option_cache[cache_key] = result[missing[cache_key]] = values
+
+        return result
+
     def reload_cache(self, project_id: int, update_reason: str) -> Mapping[str, Value]:
         if update_reason != "projectoption.get_all_values":
             schedule_update_config_cache(
                 project_id=project_id, generate=True, update_reason=update_reason
             )
+            option_changed.send_robust(sender=self.model, update_reason=update_reason)
         cache_key = self._make_key(project_id)
         result = {i.key: i.value for i in self.filter(project=project_id)}
         cache.set(cache_key, result)
@@ -1,10 +1,14 @@
+import struct
 from threading import local
 
 import sentry_sdk
 from django.core.cache import InvalidCacheBackendError, caches
 
+from sentry import options
+from sentry.nodestore.localcache import local_cache
 from sentry.utils import json
 from sentry.utils.cache import memoize
+from sentry.utils.codecs import ZstdCodec
 from sentry.utils.services import Service
 
 # Cache an instance of the encoder we want to use
@@ -22,6 +26,32 @@ json_dumps = json.JSONEncoder(
 
 json_loads = json._default_decoder.decode
 
+# Binary node format. A node starts with ``BINARY_MAGIC``, followed by a
+# header of (version, flags, number of subkeys) and an offset table with one
+# (key length, key, offset, length) entry per subkey. Payloads follow the
+# table, offsets are relative to the end of the table. The default (``None``)
+# subkey is stored with a key length of ``BINARY_DEFAULT_KEY``.
+#
+# The leading NUL byte can never start a newline-framed JSON node, a pickle
+# or a zlib stream, so all formats can be told apart by their first bytes.
+BINARY_MAGIC = b"\x00snf"
+BINARY_VERSION = 1
+BINARY_FLAG_ZSTD = 1 << 0
+BINARY_DEFAULT_KEY = 0xFFFF
+
+_binary_header = struct.Struct("!BBH")
+_binary_key_length = struct.Struct("!H")
+_binary_offsets = struct.Struct("!II")
+
+_zstd = ZstdCodec()
+
+
+def get_binary_flags(value):
+    """
+    Returns the flags of a binary node.
+    """
+    return _binary_header.unpack_from(value, len(BINARY_MAGIC))[1]
+
 
 class NodeStorage(local, Service):
     """
@@ -92,6 +122,9 @@ class NodeStorage(local, Service):
         if value is None:
             return None
 
+        if value[: len(BINARY_MAGIC)] == BINARY_MAGIC:
+            return self._decode_binary(value, subkey)
+
         lines_iter = iter(value.splitlines())
         try:
             if subkey is not None:
@@ -112,6 +145,45 @@ class NodeStorage(local, Service):
         except StopIteration:
             return None
 
+    def _decode_binary(self, value, subkey):
+        """
+        Decodes only the requested subkey of a binary node. The offset table
+        is read through a ``memoryview``, so other subkeys are neither copied
+        nor decompressed.
+        """
+        view = memoryview(value)
+        offset = len(BINARY_MAGIC)
+        version, flags, count = _binary_header.unpack_from(view, offset)
+        if version != BINARY_VERSION:
+            raise ValueError(f"Unsupported node format version: {version}")
+        offset += _binary_header.size
+
+        if subkey is not None:
+            subkey = subkey.encode("ascii")
+
+        found = None
+        for _ in range(count):
+            (key_length,) = _binary_key_length.unpack_from(view, offset)
+            offset += _binary_key_length.size
+            if key_length == BINARY_DEFAULT_KEY:
+                key = None
+            else:
+                key = view[offset : offset + key_length]
+                offset += key_length
+            payload_offset, payload_length = _binary_offsets.unpack_from(view, offset)
+            offset += _binary_offsets.size
+            if found is None and key == subkey:
+                found = (payload_offset, payload_length)
+
+        if found is None:
+            return None
+
+        start = offset + found[0]
+        payload = view[start : start + found[1]]
+        if flags & BINARY_FLAG_ZSTD:
+            return json_loads(_zstd.decode(payload))
+        return json_loads(payload.tobytes())
+
     def _get_bytes(self, id):
         """
         >>> nodestore._get_bytes('key1')
@@ -119,6 +191,21 @@ class NodeStorage(local, Service):
         """
         raise NotImplementedError
 
+    def _read_bytes(self, id):
+        if local_cache.enabled:
+            return local_cache.get_many([id], self._get_bytes_multi)[id]
+        return self._get_bytes(id)
+
+    def _read_bytes_multi(self, id_list):
+        """
+        Reads through the process-local tier if it is enabled (see
+        ``sentry.nodestore.localcache``), which also batches concurrent reads
+        from different threads into one ``_get_bytes_multi`` call.
+        """
+        if local_cache.enabled:
+            return local_cache.get_many(id_list, self._get_bytes_multi)
+        return self._get_bytes_multi(id_list)
+
     def get(self, id, subkey=None):
         """
         >>> nodestore.get('key1')
@@ -134,7 +221,7 @@ class NodeStorage(local, Service):
                     return item_from_cache
 
             span.set_tag("subkey", str(subkey))
-            bytes_data = self._get_bytes(id)
+            bytes_data = self._read_bytes(id)
             rv = self._decode(bytes_data, subkey=subkey)
             if subkey is None:
                 # set cache item only after we know decoding did not fail
@@ -181,7 +268,7 @@ class NodeStorage(local, Service):
 
             items = {
                 id: self._decode(value, subkey=subkey)
-                for id, value in self._get_bytes_multi(uncached_ids).items()
+                for id, value in self._read_bytes_multi(uncached_ids).items()
             }
             if subkey is None:
                 self._set_cache_items(items)
@@ -200,7 +287,13 @@ class NodeStorage(local, Service):
 
         >>> _encode({"unprocessed": {}, None: {"stacktrace": {}}})
         b'{"stacktrace": {}}\nunprocessed\n{}'
+
+        With the ``nodestore.binary-format`` option enabled the binary format
+        is written instead, see ``_encode_binary``.
         """
+        if options.get("nodestore.binary-format"):
+            return self._encode_binary(data, compress=options.get("nodestore.binary-format-zstd"))
+
         lines = [json_dumps(data.pop(None)).encode("utf8")]
         for key, value in data.items():
             lines.append(key.encode("ascii"))
@@ -208,6 +301,35 @@ class NodeStorage(local, Service):
 
         return b"\n".join(lines)
 
+    def _encode_binary(self, data, compress=False):
+        """
+        Encode data dict into the binary node format, which stores an offset
+        table in front of the payloads so that readers can decode a single
+        subkey without scanning the others. With `compress`, every subkey is
+        compressed with zstd on its own.
+        """
+        flags = BINARY_FLAG_ZSTD if compress else 0
+        table = []
+        payloads = []
+        payload_offset = 0
+        for key, value in data.items():
+            payload = json_dumps(value).encode("utf8")
+            if compress:
+                payload = _zstd.encode(payload)
+            if key is None:
+                table.append(_binary_key_length.pack(BINARY_DEFAULT_KEY))
+            else:
+                key = key.encode("ascii")
+                table.append(_binary_key_length.pack(len(key)))
+                table.append(key)
+            table.append(_binary_offsets.pack(payload_offset, len(payload)))
+            payloads.append(payload)
+            payload_offset += len(payload)
+
+        return b"".join(
+            [BINARY_MAGIC, _binary_header.pack(BINARY_VERSION, flags, len(data))] + table + payloads
+        )
+
     def _set_bytes(self, id, data, ttl=None):
         """
         >>> nodestore.set('key1', b"{'foo': 'bar'}")
@@ -243,6 +365,7 @@ class NodeStorage(local, Service):
             cache_item = data.get(None)
             bytes_data = self._encode(data)
             self._set_bytes(id, bytes_data, ttl=ttl)
+            local_cache.invalidate([id])
             # set cache only after encoding and write to nodestore has succeeded
             self._set_cache_item(id, cache_item)
 
@@ -270,10 +393,12 @@ class NodeStorage(local, Service):
             self.cache.set_many(items)
 
     def _delete_cache_item(self, id):
+        local_cache.invalidate([id])
         if self.cache:
             self.cache.delete(id)
 
     def _delete_cache_items(self, id_list):
+        local_cache.invalidate(id_list)
         if self.cache:
             self.cache.delete_many([id for id in id_list])
 
@@ -1,12 +1,14 @@
+import base64
 import logging
 import math
 import pickle
+import zlib
 
 from django.utils import timezone
 
 from sentry.db.models import create_or_update
-from sentry.nodestore.base import NodeStorage
-from sentry.utils.strings import compress, decompress
+from sentry.nodestore.base import BINARY_FLAG_ZSTD, BINARY_MAGIC, NodeStorage, get_binary_flags
+from sentry.utils.strings import compress
 
 from .models import Node
 
@@ -23,7 +25,7 @@ class DjangoNodeStorage(NodeStorage):
             return None
 
         try:
-            if value.startswith(b"{"):
+            if value.startswith(b"{") or value.startswith(BINARY_MAGIC):
                 return NodeStorage._decode(self, value, subkey=subkey)
 
             if subkey is None:
@@ -34,22 +36,36 @@ class DjangoNodeStorage(NodeStorage):
             logger.exception(e)
             return {}
 
+    def _load_data(self, data):
+        """
+        Binary nodes with zstd compressed subkeys are only base64-encoded,
+        everything else (including other binary nodes) is a zlib stream.
+        """
+        value = base64.b64decode(data)
+        if value.startswith(BINARY_MAGIC):
+            return value
+        return zlib.decompress(value)
+
     def _get_bytes(self, id):
         try:
             data = Node.objects.get(id=id).data
-            return decompress(data)
+            return self._load_data(data)
         except Node.DoesNotExist:
             return None
 
     def _get_bytes_multi(self, id_list):
-        return {n.id: decompress(n.data) for n in Node.objects.filter(id__in=id_list)}
+        return {n.id: self._load_data(n.data) for n in Node.objects.filter(id__in=id_list)}
 
     def delete_multi(self, id_list):
         Node.objects.filter(id__in=id_list).delete()
         self._delete_cache_items(id_list)
 
     def _set_bytes(self, id, data, ttl=None):
-        create_or_update(Node, id=id, values={"data": compress(data), "timestamp": timezone.now()})
+        if data.startswith(BINARY_MAGIC) and get_binary_flags(data) & BINARY_FLAG_ZSTD:
+            data = base64.b64encode(data).decode("utf-8")
+        else:
+            data = compress(data)
+        create_or_update(Node, id=id, values={"data": data, "timestamp": timezone.now()})
 
     def cleanup(self, cutoff_timestamp):
         from sentry.db.deletion import BulkDeleteQuery
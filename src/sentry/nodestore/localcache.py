@@ -0,0 +1,154 @@
+"""
+Process-local read tier for nodestore.
+
+Nodestore backends are thread-local (see ``NodeStorage``), so the tier lives
+at module level and is shared by all threads of a process. It caches the raw
+node bytes rather than decoded payloads: decoded nodes are mutable dicts that
+callers routinely modify, and the bytes also allow serving subkey reads.
+"""
+
+import threading
+from concurrent.futures import Future
+
+from sentry import options
+from sentry.utils import metrics
+from sentry.utils.lru import LRUCache
+
+# Stored for ids that were not found in the backend.
+MISSING = b""
+
+
+def _weigh(value):
+    # Account for the key and entry overhead so that negative entries are not free.
+    return len(value) + 100
+
+
+class NodeLocalCache:
+    def __init__(self):
+        self.lru = LRUCache("nodestore", max_items=100000, max_weight=0, weigher=_weigh)
+        self._lock = threading.Lock()
+        # Ids queued for the next backend read, and futures for every id that
+        # is either queued or currently being read.
+        self._queued = []
+        self._futures = {}
+        self._reading = False
+        # Bumped by every invalidation. Ids invalidated while they are queued
+        # or being read map to the generation of their last invalidation, so
+        # that reads started before it are not cached.
+        self._generation = 0
+        self._invalidated = {}
+
+    @property
+    def enabled(self):
+        return options.get("nodestore.local-cache.max-bytes") > 0
+
+    def get_many(self, id_list, fetch):
+        """
+        Returns the raw bytes (or ``None``) for every id in `id_list`. Ids
+        missing from the cache are read with `fetch`, a backend's
+        ``_get_bytes_multi``. Concurrent callers are batched: while one
+        thread reads from the backend, ids requested by other threads are
+        queued and read together in the next round trip.
+        """
+        self.lru.max_weight = options.get("nodestore.local-cache.max-bytes")
+
+        cached = self.lru.get_many(id_list)
+        rv = {}
+        for id, value in cached.items():
+            if not value:
+                metrics.incr("nodestore.local_cache.negative_hit", skip_internal=True)
+                rv[id] = None
+            else:
+                rv[id] = value
+
+        futures = {}
+        with self._lock:
+            for id in id_list:
+                if id in rv or id in futures:
+                    continue
+                future = self._futures.get(id)
+                if future is None:
+                    future = self._futures[id] = Future()
+                    self._queued.append(id)
+                futures[id] = future
+            lead = futures and not self._reading
+            if lead:
+                self._reading = True
+
+        if lead:
+            self._read_queued(fetch)
+
+        for id, future in futures.items():
+            rv[id] = future.result()
+        return rv
+
+    def _read_queued(self, fetch):
+        try:
+            while True:
+                with self._lock:
+                    batch, self._queued = self._queued, []
+                    if not batch:
+                        self._reading = False
+                        return
+                    generation = self._generation
+                self._read_batch(batch, generation, fetch)
+        except BaseException as e:
+            # Nobody reads the ids queued in the meantime anymore, so fail
+            # them instead of leaving their callers waiting.
+            with self._lock:
+                self._reading = False
+                queued, self._queued = self._queued, []
+                futures = [self._pop_future(id) for id in queued]
+            for future in futures:
+                future.set_exception(e)
+            raise
+
+    def _read_batch(self, batch, generation, fetch):
+        metrics.timing("nodestore.local_cache.batch_size", len(batch))
+        results = None
+        error = None
+        try:
+            values = fetch(batch)
+            results = {id: values.get(id) for id in batch}
+            with self._lock:
+                self._store(results, generation)
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            with self._lock:
+                futures = [(id, self._pop_future(id)) for id in batch]
+
+            for id, future in futures:
+                if results is None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(results[id])
+
+    def _pop_future(self, id):
+        self._invalidated.pop(id, None)
+        return self._futures.pop(id)
+
+    def _store(self, results, generation):
+        ttl = options.get("nodestore.local-cache.ttl")
+        negative_ttl = options.get("nodestore.local-cache.negative-ttl")
+        for id, value in results.items():
+            # Skip values read before the id was invalidated, they may be stale.
+            if self._invalidated.get(id, 0) > generation:
+                continue
+            if value is None:
+                if negative_ttl > 0:
+                    self.lru.set(id, MISSING, ttl=negative_ttl)
+            elif ttl > 0:
+                self.lru.set(id, value, ttl=ttl)
+
+    def invalidate(self, id_list):
+        with self._lock:
+            self._generation += 1
+            for id in id_list:
+                if id in self._futures:
+                    self._invalidated[id] = self._generation
+        self.lru.delete_many(id_list)
+
+
+local_cache = NodeLocalCache()
@@ -122,6 +122,14 @@ register(
 # it break everywhere.
 register("symbolicator.ignored_sources", type=Sequence, default=(), flags=FLAG_ALLOW_EMPTY)
 
+# Wait for pending symbolication tasks by long-polling symbolicator in place for
+# up to `max-wait` seconds, instead of restarting symbolication after a delay.
+# At most `max-concurrent` tasks are polled at a time per process, sharing one
+# pool of connections.
+register("symbolicator.long-poll", type=Bool, default=False, flags=FLAG_PRIORITIZE_DISK)
+register("symbolicator.long-poll.max-wait", default=60.0, flags=FLAG_PRIORITIZE_DISK)
+register("symbolicator.long-poll.max-concurrent", default=16, flags=FLAG_PRIORITIZE_DISK)
+
 # Backend chart rendering via chartcuterie
 register("chart-rendering.enabled", default=False, flags=FLAG_ALLOW_EMPTY | FLAG_PRIORITIZE_DISK)
 register(
@@ -216,6 +224,7 @@ register("snuba.search.max-pre-snuba-candidates", default=5000)
 register("snuba.search.chunk-growth-rate", default=1.5)
 register("snuba.search.max-chunk-size", default=2000)
 register("snuba.search.max-total-chunk-time-seconds", default=30.0)
+register("snuba.search.prefetch-chunks", type=Bool, default=True)
 register("snuba.search.hits-sample-size", default=100)
 register("snuba.track-outcomes-sample-rate", default=0.0)
 
@@ -268,6 +277,10 @@ register("post-process.use-error-hook-sampling", default=False)  # unused
 # From 0.0 to 1.0: Randomly enqueue process_resource_change task
 register("post-process.error-hook-sample-rate", default=0.0)  # unused
 
+# Seconds for which the results of event frequency rule conditions are shared
+# by the events of a group. Disabled when 0.
+register("rules.event-frequency.cache-ttl", default=0, flags=FLAG_PRIORITIZE_DISK)
+
 # Transaction events
 # True => kill switch to disable ingestion of transaction events for internal project.
 register("transaction-events.force-disable-internal-project", default=False)
@@ -280,6 +293,25 @@ register("outcomes.tsdb-in-consumer-sample-rate", default=0.0)  # unused
 register("nodedata.cache-sample-rate", default=0.0, flags=FLAG_PRIORITIZE_DISK)
 register("nodedata.cache-on-save", default=False, flags=FLAG_PRIORITIZE_DISK)
 
+# Write nodes in the binary, offset-table based node format (optionally with
+# zstd-compressed subkeys). Reading supports all formats regardless.
+register("nodestore.binary-format", default=False, flags=FLAG_PRIORITIZE_DISK)
+register("nodestore.binary-format-zstd", default=False, flags=FLAG_PRIORITIZE_DISK)
+
+# Process-local read tier in front of nodestore, disabled when the byte budget
+# is 0. Found nodes are kept for `ttl` seconds, misses for `negative-ttl`.
+register("nodestore.local-cache.max-bytes", default=0, flags=FLAG_PRIORITIZE_DISK)
+register("nodestore.local-cache.ttl", default=10.0, flags=FLAG_PRIORITIZE_DISK)
+register("nodestore.local-cache.negative-ttl", default=2.0, flags=FLAG_PRIORITIZE_DISK)
+
+# Process-wide cache of parsed JavaScript sources and source maps, disabled
+# when the byte budget is 0. Artifacts are refetched (but not reparsed unless
+# they changed) after `ttl` seconds.
+register("sourcemaps.local-cache.max-bytes", default=0, flags=FLAG_PRIORITIZE_DISK)
+register("sourcemaps.local-cache.ttl", default=300.0, flags=FLAG_PRIORITIZE_DISK)
+# Fetch the sources and source maps of JavaScript events in a pool of threads.
+register("sourcemaps.concurrent-fetches", type=Bool, default=False, flags=FLAG_PRIORITIZE_DISK)
+
 # Use nodestore for eventstore.get_events
 register("eventstore.use-nodestore", default=False, flags=FLAG_PRIORITIZE_DISK)
 
@@ -365,6 +397,11 @@ register("eventstream:kafka-headers", default=False)
 register("post-process-forwarder:kafka-headers", default=False)
 # Number of threads to use for post processing
 register("post-process-forwarder:concurrency", default=1)
+# Coalesce the messages of every forwarder batch by group, and post process the
+# events of a group in one task.
+register("post-process-forwarder:batch-by-group", type=Bool, default=False)
+# The maximum number of events of a group post processed by one task.
+register("post-process-forwarder:max-group-batch-size", default=100)
 
 # Subscription queries sampling rate
 register("subscriptions-query.sample-rate", default=0.01)
@@ -384,6 +421,10 @@ register("performance.suspect-spans-ingestion.rollout-rate", default=0)
 # special save_event task for transactions avoiding the preprocess.
 register("store.save-transactions-ingest-consumer-rate", default=0.0)
 
+# Save transactions inline in the ingest consumer, one batch at a time, instead
+# of spawning a save_event_transaction task per event.
+register("store.save-transactions-ingest-consumer-batch", default=False)
+
 # Drop delete_old_primary_hash messages for a particular project.
 register("reprocessing2.drop-delete-old-primary-hash", default=[])
 
@@ -391,3 +432,7 @@ register("reprocessing2.drop-delete-old-primary-hash", default=[])
 # contents are a list of project IDs to message types to be randomly assigned
 # e.g. [{"project_id": 2, "message_type": "error"}, {"project_id": 3, "message_type": "transaction"}]
 register("kafka.send-project-events-to-random-partitions", default=[])
+
+# Number of scheduled digests delivered together by one deliver_digests task.
+# Set to 0 to spawn a deliver_digest task per digest.
+register("digests.delivery-batch-size", default=0)
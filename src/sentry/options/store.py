@@ -7,6 +7,7 @@ from django.db.utils import OperationalError, ProgrammingError
 from django.utils import timezone
 from django.utils.functional import cached_property
 
+from sentry.signals import option_changed
 from sentry.utils.hashlib import md5_text
 
 Key = namedtuple("Key", ("name", "default", "type", "flags", "ttl", "grace", "cache_key"))
@@ -14,6 +15,17 @@ Key = namedtuple("Key", ("name", "default", "type", "flags", "ttl", "grace", "ca
 CACHE_FETCH_ERR = "Unable to fetch option cache for %s"
 CACHE_UPDATE_ERR = "Unable to update option cache for %s"
 
+# Every change to an option increments the version stored at
+# ``VERSION_CACHE_KEY`` and records the cache key of the changed option at
+# ``CHANGE_CACHE_KEY``. See ``OptionsStore.poll``.
+VERSION_CACHE_KEY = "o:version"
+CHANGE_CACHE_KEY = "o:change:%s"
+CHANGE_TTL = 60 * 60
+
+# Stores that fall further behind than this drop their entire local cache
+# instead of reading back every change.
+MAX_CHANGES_PER_POLL = 100
+
 logger = logging.getLogger("sentry")
 
 
@@ -38,9 +50,15 @@ class OptionsStore:
     OptionsManager instead, unless you need raw access to something.
     """
 
-    def __init__(self, cache=None, ttl=None):
+    def __init__(self, cache=None, ttl=None, poll_interval=0):
         self.cache = cache
         self.ttl = ttl
+        # When set, values are kept in the local cache until they are
+        # invalidated by a change that is picked up by ``poll``, which runs at
+        # most once per `poll_interval` seconds.
+        self.poll_interval = poll_interval
+        self._version = None
+        self._next_poll = 0
         self.flush_local_cache()
 
     @cached_property
@@ -103,11 +121,17 @@ class OptionsStore:
         This allows the OptionStore to pave over potential network hiccups
         by returning a stale value.
         """
+        if self.poll_interval:
+            self.maybe_poll()
+
         try:
             value, expires, grace = self._local_cache[key.cache_key]
         except KeyError:
             return None
 
+        if self.poll_interval:
+            return value
+
         now = int(time())
 
         # Key is within normal expiry window, so just return it
@@ -182,7 +206,10 @@ class OptionsStore:
         assert self.cache is not None, "cache must be configured before mutating options"
 
         self.set_store(key, value)
-        return self.set_cache(key, value)
+        option_changed.send_robust(sender=self.model, update_reason="options.set")
+        rv = self.set_cache(key, value)
+        self.publish_change(key)
+        return rv
 
     def set_store(self, key, value):
         from sentry.db.models.query import create_or_update
@@ -217,7 +244,10 @@ class OptionsStore:
         assert self.cache is not None, "cache must be configured before mutating options"
 
         self.delete_store(key)
-        return self.delete_cache(key)
+        option_changed.send_robust(sender=self.model, update_reason="options.delete")
+        rv = self.delete_cache(key)
+        self.publish_change(key)
+        return rv
 
     def delete_store(self, key):
         self.model.objects.filter(key=key.name).delete()
@@ -236,11 +266,124 @@ class OptionsStore:
             logger.warning(CACHE_UPDATE_ERR, key.name, extra={"key": key.name}, exc_info=True)
             return False
 
+    def publish_change(self, key):
+        """
+        Records a change of `key` so that stores in other processes drop it
+        from their local caches on their next ``poll``.
+        """
+        try:
+            try:
+                version = self.cache.incr(VERSION_CACHE_KEY)
+            except ValueError:
+                # The version does not exist yet or has been evicted. Stores
+                # that already saw a version treat a lower one as a gap.
+                self.cache.add(VERSION_CACHE_KEY, 0, None)
+                version = self.cache.incr(VERSION_CACHE_KEY)
+            self.cache.set(CHANGE_CACHE_KEY % version, key.cache_key, CHANGE_TTL)
+        except Exception:
+            logger.warning(CACHE_UPDATE_ERR, key.name, extra={"key": key.name}, exc_info=True)
+
+    def maybe_poll(self):
+        if self.cache is None:
+            return
+        now = time()
+        if now < self._next_poll:
+            return
+        self._next_poll = now + self.poll_interval
+        self.poll()
+
+    def poll(self):
+        """
+        Drops the options that changed since the last poll from the local
+        cache, so that they are fetched again on their next access. If the
+        changes cannot be read back, the entire local cache is dropped.
+        """
+        try:
+            version = self.cache.get(VERSION_CACHE_KEY) or 0
+        except Exception:
+            # Keep serving local values until the cache is reachable again.
+            logger.warning(CACHE_FETCH_ERR, VERSION_CACHE_KEY, exc_info=True)
+            return
+
+        previous, self._version = self._version, version
+        if previous == version:
+            return
+
+        if previous is None or not 0 < version - previous <= MAX_CHANGES_PER_POLL:
+            self.flush_local_cache()
+            return
+
+        change_keys = [CHANGE_CACHE_KEY % v for v in range(previous + 1, version + 1)]
+        try:
+            changes = self.cache.get_many(change_keys)
+        except Exception:
+            logger.warning(CACHE_FETCH_ERR, CHANGE_CACHE_KEY, exc_info=True)
+            changes = {}
+
+        if len(changes) < len(change_keys):
+            self.flush_local_cache()
+            return
+
+        for cache_key in changes.values():
+            self._local_cache.pop(cache_key, None)
+
+    def warm(self, keys):
+        """
+        Loads the values of all `keys` into the local cache, with a single
+        read from the cache and a single query for the values missing there.
+        """
+        if self.cache is None:
+            return
+
+        keys = [key for key in keys if key.ttl > 0]
+
+        try:
+            # Read the version first, so that changes made while warming are
+            # picked up by the next poll.
+            version = self.cache.get(VERSION_CACHE_KEY) or 0
+            values = self.cache.get_many([key.cache_key for key in keys])
+        except Exception:
+            logger.warning(CACHE_FETCH_ERR, "warm", exc_info=True)
+            return
+
+        missing = {key.name: key for key in keys if values.get(key.cache_key) is None}
+        if missing:
+            try:
+                stored = {
+                    missing[option.key].cache_key: option.value
+                    for option in self.model.objects.filter(key__in=list(missing))
+                }
+            except (ProgrammingError, OperationalError):
+                stored = {}
+            except Exception:
+                logger.exception("option.failed-lookup", extra={"key": "warm"})
+                stored = {}
+
+            if stored:
+                try:
+                    self.cache.set_many(stored, self.ttl)
+                except Exception:
+                    logger.warning(CACHE_UPDATE_ERR, "warm", exc_info=True)
+                values.update(stored)
+
+        for key in keys:
+            value = values.get(key.cache_key)
+            if value is not None:
+                self._local_cache[key.cache_key] = _make_cache_value(key, value)
+
+        if self.poll_interval:
+            self._version = version
+            self._next_poll = time() + self.poll_interval
+
     def clean_local_cache(self):
         """
         Iterate over our local cache items, and
         remove the keys that are beyond their grace time.
         """
+        if self.poll_interval:
+            # Values are only removed when they change.
+            return
+
         to_expire = []
         now = int(time())
 
@@ -1,8 +1,10 @@
 import logging
 import uuid
+from collections import defaultdict
 from datetime import datetime
-from typing import Any, Mapping, Optional, Sequence
+from typing import Any, Mapping, MutableMapping, Optional, Sequence
 
+from django.conf import settings
 from pytz import utc
 from sentry_sdk import Hub, capture_exception
 
@@ -17,7 +19,7 @@ from sentry.ingest.inbound_filters import (
     get_filter_key,
 )
 from sentry.interfaces.security import DEFAULT_DISALLOWED_SOURCES
-from sentry.models import Project
+from sentry.models import Organization, Project, ProjectKeyStatus, ProjectOption
 from sentry.relay.config.metric_extraction import get_metric_conditional_tagging_rules
 from sentry.relay.utils import to_camel_case_name
 from sentry.utils import metrics
@@ -29,19 +31,112 @@ EXPOSABLE_FEATURES = [
     "organizations:profiling",
 ]
 
+#: Project features checked while building a project config. They are
+#: resolved in batch by `get_project_configs`.
+PROJECT_CONFIG_PROJECT_FEATURES = [
+    "projects:custom-inbound-filters",
+    "projects:performance-suspect-spans-ingestion",
+] + [feature for feature in EXPOSABLE_FEATURES if feature.startswith("projects:")]
+
 logger = logging.getLogger(__name__)
 
 
-def get_exposed_features(project: Project) -> Sequence[str]:
+class _ConfigContext:
+    """
+    Resolves the feature flags and organization level settings that go into a
+    project config. This computes every value on demand, see
+    `_BulkConfigContext` for the variant used to build many configs at once.
+    """
 
-    active_features = []
-    for feature in EXPOSABLE_FEATURES:
+    def has_feature(self, feature: str, project: Project) -> bool:
         if feature.startswith("organizations:"):
-            has_feature = features.has(feature, project.organization)
+            return features.has(feature, project.organization)
         elif feature.startswith("projects:"):
-            has_feature = features.has(feature, project)
+            return features.has(feature, project)
         else:
+            raise RuntimeError("Features must start with 'organizations:' or 'projects:'")
+
+    def get_trusted_relays(self, organization: Organization) -> Sequence[str]:
+        return [r["public_key"] for r in organization.get_option("sentry:trusted-relays", []) if r]
+
+    def get_event_retention(self, organization: Organization) -> Optional[int]:
+        return quotas.get_event_retention(organization)
+
+
+class _BulkConfigContext(_ConfigContext):
+    """
+    Resolves organization level values once per organization, and project
+    features in batch for all given projects.
+    """
+
+    def __init__(self, projects: Sequence[Project]) -> None:
+        self._features: MutableMapping[Any, bool] = {}
+        self._trusted_relays: MutableMapping[int, Sequence[str]] = {}
+        self._event_retention: MutableMapping[int, Optional[int]] = {}
+
+        projects_by_org = defaultdict(list)
+        for project in projects:
+            projects_by_org[project.organization].append(project)
+
+        for organization, org_projects in projects_by_org.items():
+            self._load_project_features(organization, org_projects)
+
+    def _load_project_features(
+        self, organization: Organization, projects: Sequence[Project]
+    ) -> None:
+        # Same lookup order as `FeatureManager.has`: registered handlers
+        # first, then the entity handler, then the configured default.
+        batch_features = (
+            features.batch_has(
+                PROJECT_CONFIG_PROJECT_FEATURES, projects=projects, organization=organization
+            )
+            or {}
+        )
+        for feature in PROJECT_CONFIG_PROJECT_FEATURES:
+            handled = features.has_for_batch_handlers(feature, organization, projects)
+            default = settings.SENTRY_FEATURES.get(feature, False)
+            for project in projects:
+                active = handled.get(project)
+                if active is None:
+                    active = batch_features.get(f"project:{project.id}", {}).get(feature)
+                if active is None:
+                    active = default
+                self._features[(feature, project.id)] = active
+
+    def has_feature(self, feature: str, project: Project) -> bool:
+        if feature.startswith("organizations:"):
+            key = (feature, project.organization_id)
+        else:
+            key = (feature, project.id)
+
+        if key not in self._features:
+            self._features[key] = super().has_feature(feature, project)
+        return self._features[key]
+
+    def get_trusted_relays(self, organization: Organization) -> Sequence[str]:
+        if organization.id not in self._trusted_relays:
+            self._trusted_relays[organization.id] = super().get_trusted_relays(organization)
+        return self._trusted_relays[organization.id]
+
+    def get_event_retention(self, organization: Organization) -> Optional[int]:
+        if organization.id not in self._event_retention:
+            self._event_retention[organization.id] = super().get_event_retention(organization)
+        return self._event_retention[organization.id]
+
+
+_default_context = _ConfigContext()
+
+
+def get_exposed_features(
+    project: Project, context: Optional[_ConfigContext] = None
+) -> Sequence[str]:
+    context = context or _default_context
+
+    active_features = []
+    for feature in EXPOSABLE_FEATURES:
+        if not feature.startswith(("organizations:", "projects:")):
             raise RuntimeError("EXPOSABLE_FEATURES must start with 'organizations:' or 'projects:'")
+        has_feature = context.has_feature(feature, project)
 
         if has_feature:
             metrics.incr(
@@ -86,7 +181,8 @@ def get_public_key_configs(project, full_config, project_keys=None):
     return public_keys
 
 
-def get_filter_settings(project):
+def get_filter_settings(project, context=None):
+    context = context or _default_context
     filter_settings = {}
 
     for flt in get_all_filter_specs():
@@ -94,7 +190,7 @@ def get_filter_settings(project):
         settings = _load_filter_settings(flt, project)
         filter_settings[filter_id] = settings
 
-    if features.has("projects:custom-inbound-filters", project):
+    if context.has_feature("projects:custom-inbound-filters", project):
         invalid_releases = project.get_option(f"sentry:{FilterTypes.RELEASES}")
         if invalid_releases:
             filter_settings["releases"] = {"releases": invalid_releases}
@@ -138,6 +234,52 @@ def get_project_config(project, full_config=True, project_keys=None):
 
     :return: a ProjectConfig object for the given project
     """
+    return _get_project_config(project, full_config, project_keys, _default_context)
+
+
+def get_project_configs(projects, project_keys, full_config=True):
+    """
+    Constructs the ProjectConfig information for many projects at once.
+
+    Options, feature flags and organization level settings are loaded for all
+    projects together rather than once per config, which makes this much
+    cheaper than calling `get_project_config` in a loop when regenerating the
+    configs of a whole organization.
+
+    :param projects: The projects to load configuration for.
+    :param project_keys: The project keys to build configs for. Every key
+        must belong to one of `projects`, inactive keys are skipped.
+    :param full_config: Same as for `get_project_config`.
+
+    :return: a mapping of public key to the ProjectConfig object for that key
+    """
+    projects_by_id = {project.id: project for project in projects}
+
+    # Bind shared organization instances so that they are not loaded once
+    # per project.
+    unbound = [p for p in projects if not Project.organization.is_cached(p)]
+    if unbound:
+        organizations = Organization.objects.in_bulk({p.organization_id for p in unbound})
+        for project in unbound:
+            project.organization = organizations[project.organization_id]
+
+    ProjectOption.objects.get_all_values_bulk(projects)
+    context = _BulkConfigContext(projects)
+
+    configs = {}
+    for project_key in project_keys:
+        if project_key.status != ProjectKeyStatus.ACTIVE:
+            continue
+        project = projects_by_id[project_key.project_id]
+        project_key.project = project
+        configs[project_key.public_key] = _get_project_config(
+            project, full_config, [project_key], context
+        )
+
+    return configs
+
+
+def _get_project_config(project, full_config, project_keys, context):
     with configure_scope() as scope:
         scope.set_tag("project", project.id)
 
@@ -157,22 +299,15 @@ def get_project_config(project, full_config=True, project_keys=None):
             "publicKeys": public_keys,
             "config": {
                 "allowedDomains": list(get_origins(project)),
-                "trustedRelays": [
-                    r["public_key"]
-                    for r in project.organization.get_option("sentry:trusted-relays", [])
-                    if r
-                ],
+                "trustedRelays": context.get_trusted_relays(project.organization),
                 "piiConfig": get_pii_config(project),
                 "datascrubbingSettings": get_datascrubbing_settings(project),
-                "features": get_exposed_features(project),
+                "features": get_exposed_features(project, context),
             },
             "organizationId": project.organization_id,
             "projectId": project.id,  # XXX: Unused by Relay, required by Python store
         }
-    allow_dynamic_sampling = features.has(
-        "organizations:filters-and-sampling",
-        project.organization,
-    )
+    allow_dynamic_sampling = context.has_feature("organizations:filters-and-sampling", project)
     if allow_dynamic_sampling:
         dynamic_sampling = project.get_option("sentry:dynamic_sampling")
         if dynamic_sampling is not None:
@@ -182,11 +317,11 @@ def get_project_config(project, full_config=True, project_keys=None):
         # This is all we need for external Relay processors
         return ProjectConfig(project, **cfg)
 
-    if features.has("organizations:performance-ops-breakdown", project.organization):
+    if context.has_feature("organizations:performance-ops-breakdown", project):
         cfg["config"]["breakdownsV2"] = project.get_option("sentry:breakdowns")
-    if features.has("organizations:transaction-metrics-extraction", project.organization):
+    if context.has_feature("organizations:transaction-metrics-extraction", project):
         cfg["config"]["transactionMetrics"] = get_transaction_metrics_settings(
-            project, cfg["config"].get("breakdownsV2")
+            project, cfg["config"].get("breakdownsV2"), context
         )
 
         # This config key is technically not specific to _transaction_ metrics,
@@ -198,20 +333,20 @@ def get_project_config(project, full_config=True, project_keys=None):
             )
         except Exception:
             capture_exception()
-    if features.has("organizations:metrics-extraction", project.organization):
+    if context.has_feature("organizations:metrics-extraction", project):
         cfg["config"]["sessionMetrics"] = {
             "version": 1,
             "drop": False,
         }
 
-    if features.has("projects:performance-suspect-spans-ingestion", project=project):
+    if context.has_feature("projects:performance-suspect-spans-ingestion", project):
         cfg["config"]["spanAttributes"] = project.get_option("sentry:span_attributes")
     with Hub.current.start_span(op="get_filter_settings"):
-        cfg["config"]["filterSettings"] = get_filter_settings(project)
+        cfg["config"]["filterSettings"] = get_filter_settings(project, context)
     with Hub.current.start_span(op="get_grouping_config_dict_for_project"):
         cfg["config"]["groupingConfig"] = get_grouping_config_dict_for_project(project)
     with Hub.current.start_span(op="get_event_retention"):
-        cfg["config"]["eventRetention"] = quotas.get_event_retention(project.organization)
+        cfg["config"]["eventRetention"] = context.get_event_retention(project.organization)
     with Hub.current.start_span(op="get_all_quotas"):
         cfg["config"]["quotas"] = get_quotas(project, keys=project_keys)
 
@@ -414,12 +549,15 @@ ALL_MEASUREMENT_METRICS = frozenset(
 
 
 def get_transaction_metrics_settings(
-    project: Project, breakdowns_config: Optional[Mapping[str, Any]]
+    project: Project,
+    breakdowns_config: Optional[Mapping[str, Any]],
+    context: Optional[_ConfigContext] = None,
 ):
+    context = context or _default_context
     metrics = []
     custom_tags = []
 
-    if features.has("organizations:transaction-metrics-extraction", project.organization):
+    if context.has_feature("organizations:transaction-metrics-extraction", project):
         metrics.extend(sorted(TRANSACTION_METRICS))
         # TODO: for now let's extract all known measurements. we might want to
         # be more fine-grained in the future once we know which measurements we
@@ -5,17 +5,18 @@ import contextlib
 import logging
 import re
 from datetime import datetime, timedelta
-from typing import Any, Mapping
+from typing import Any, Iterable, Mapping, MutableMapping, NamedTuple, Sequence
 
 from django import forms
 from django.core.cache import cache
 from django.utils import timezone
 
-from sentry import release_health, tsdb
+from sentry import eventfrequency, options, release_health, tsdb
 from sentry.eventstore.models import Event
 from sentry.receivers.rules import DEFAULT_RULE_LABEL
 from sentry.rules import EventState
 from sentry.rules.conditions.base import EventCondition
+from sentry.tsdb.base import TSDBModel
 from sentry.utils import metrics
 from sentry.utils.snuba import options_override
 
@@ -82,11 +83,129 @@ class EventFrequencyForm(forms.Form):  # type: ignore
         return cleaned_data
 
 
+class EventFrequencyQuery(NamedTuple):
+    """
+    A count of the events of a group, as queried by frequency conditions.
+    `method` is the name of the tsdb method counting them.
+    """
+
+    method: str
+    model: TSDBModel
+    group_id: int
+    start: datetime
+    end: datetime
+    environment_id: int | None
+
+
+def get_recent_totals(queries: Iterable[EventFrequencyQuery]) -> Sequence[int | None]:
+    """
+    Answers queries from the store of recent event frequencies where possible,
+    see `sentry.eventfrequency`.
+    """
+    return eventfrequency.get_totals(  # type: ignore
+        [
+            (query.model, query.group_id, query.start, query.end, query.environment_id)
+            for query in queries
+        ]
+    )
+
+
+class EventFrequencyBatch:
+    """
+    Resolves the frequency queries of all rules for an event at once, with a
+    single tsdb call per consistency requirement instead of one call per
+    condition. Results are also shared by the events of a group for
+    ``rules.event-frequency.cache-ttl`` seconds to absorb bursts.
+
+    All queries of a batch end at (or are offset from) the same point in time.
+    """
+
+    def __init__(self, tsdb: Any = tsdb) -> None:
+        self.tsdb = tsdb
+        self.end = timezone.now()
+        self.results: MutableMapping[EventFrequencyQuery, int] = {}
+
+    def get_cache_key(self, query: EventFrequencyQuery) -> str:
+        duration = int((query.end - query.start).total_seconds())
+        offset = int((self.end - query.end).total_seconds())
+        return "r.c.efq:{}:{}:{}:{}:{}:{}".format(
+            query.method, query.model.value, query.group_id, query.environment_id, duration, offset
+        )
+
+    def get(self, query: EventFrequencyQuery) -> int | None:
+        return self.results.get(query)
+
+    def resolve(self, queries: Iterable[EventFrequencyQuery]) -> None:
+        pending = {query for query in queries if query not in self.results}
+        recent = list(pending)
+        for query, total in zip(recent, get_recent_totals(recent)):
+            if total is not None:
+                self.results[query] = total
+                pending.discard(query)
+
+        cache_ttl = options.get("rules.event-frequency.cache-ttl")
+        if pending and cache_ttl:
+            cache_keys = {query: self.get_cache_key(query) for query in pending}
+            cached = cache.get_many(cache_keys.values())
+            for query, cache_key in cache_keys.items():
+                if cache_key in cached:
+                    self.results[query] = cached[cache_key]
+                    pending.discard(query)
+
+        metrics.timing("rules.conditions.event_frequency.batch_size", len(pending))
+        if not pending:
+            return
+
+        # For conditions with interval >= 1 hour we don't need to worry about read your writes
+        # consistency. Disable it so that we can scale to more nodes.
+        short = [query for query in pending if query.end - query.start < timedelta(hours=1)]
+        self._query(short)
+        with options_override({"consistent": False}):
+            self._query(
+                [query for query in pending if query.end - query.start >= timedelta(hours=1)]
+            )
+
+        if cache_ttl:
+            cache.set_many(
+                {self.get_cache_key(query): self.results[query] for query in pending}, cache_ttl
+            )
+
+    def _query(self, queries: Sequence[EventFrequencyQuery]) -> None:
+        if not queries:
+            return
+
+        results = self.tsdb.get_totals_multi(
+            [
+                (
+                    query.method,
+                    query.model,
+                    [query.group_id],
+                    query.start,
+                    query.end,
+                    query.environment_id,
+                    query.group_id,
+                )
+                for query in queries
+            ],
+            use_cache=True,
+        )
+        for query, result in zip(queries, results):
+            self.results[query] = result[query.group_id]
+
+
 class BaseEventFrequencyCondition(EventCondition, abc.ABC):
     intervals = standard_intervals
     form_cls = EventFrequencyForm
     label: str
 
+    # The tsdb method and model counting the events of the group in
+    # `query_hook`. Conditions that set them can be resolved in bulk by an
+    # `EventFrequencyBatch`.
+    tsdb_method: str | None = None
+    tsdb_model: TSDBModel | None = None
+
+    batch: EventFrequencyBatch | None = None
+
     def __init__(self, *args: Any, **kwargs: Any) -> None:
         self.tsdb = kwargs.pop("tsdb", tsdb)
         self.form_fields = {
@@ -133,11 +252,72 @@ class BaseEventFrequencyCondition(EventCondition, abc.ABC):
 
     def query_hook(self, event: Event, start: datetime, end: datetime, environment_id: str) -> int:
         """ """
-        raise NotImplementedError  # subclass must implement
+        if self.tsdb_method is None:
+            raise NotImplementedError  # subclass must implement
+        return self.get_group_total(event, start, end, environment_id)
+
+    def get_frequency_query(
+        self, event: Event, start: datetime, end: datetime, environment_id: str
+    ) -> EventFrequencyQuery:
+        assert self.tsdb_method is not None and self.tsdb_model is not None
+        return EventFrequencyQuery(
+            self.tsdb_method, self.tsdb_model, event.group_id, start, end, environment_id
+        )
+
+    def get_group_total(
+        self, event: Event, start: datetime, end: datetime, environment_id: str
+    ) -> int:
+        query = self.get_frequency_query(event, start, end, environment_id)
+        if self.batch is not None:
+            total = self.batch.get(query)
+        else:
+            (total,) = get_recent_totals([query])
+        if total is not None:
+            return total
+
+        totals: Mapping[int, int] = getattr(self.tsdb, query.method)(
+            model=query.model,
+            keys=[event.group_id],
+            start=start,
+            end=end,
+            environment_id=environment_id,
+            use_cache=True,
+            jitter_value=event.group_id,
+        )
+        return totals[event.group_id]
+
+    def get_frequency_queries(self, event: Event, end: datetime) -> Sequence[EventFrequencyQuery]:
+        """
+        Returns the queries `passes` will make for `event` when evaluated by a
+        batch ending at `end`, so that they can be resolved up front.
+        """
+        interval = self.get_option("interval")
+        if self.tsdb_method is None or interval not in self.intervals:
+            return []
+
+        # TODO(mgaeta): Bug: Rule is optional.
+        environment_id = self.rule.environment_id  # type: ignore
+        return [
+            self.get_frequency_query(event, start, end, environment_id)
+            for start, end in self.get_windows(interval, end)
+        ]
+
+    def get_windows(self, interval: str, end: datetime) -> Sequence[tuple[datetime, datetime]]:
+        """
+        Returns the time windows compared by the condition, the current one
+        first.
+        """
+        _, duration = self.intervals[interval]
+        windows = [(end - duration, end)]
+        if self.get_option("comparisonType", COMPARISON_TYPE_COUNT) == COMPARISON_TYPE_PERCENT:
+            comparison_interval = comparison_intervals[self.get_option("comparisonInterval")][1]
+            comparison_end = end - comparison_interval
+            windows.append((comparison_end - duration, comparison_end))
+        return windows
 
     def get_rate(self, event: Event, interval: str, environment_id: str) -> int:
         _, duration = self.intervals[interval]
-        end = timezone.now()
+        end = self.batch.end if self.batch is not None else timezone.now()
 
         # For conditions with interval >= 1 hour we don't need to worry about read your writes
         # consistency. Disable it so that we can scale to more nodes.
@@ -145,16 +325,16 @@ class BaseEventFrequencyCondition(EventCondition, abc.ABC):
         if duration >= timedelta(hours=1):
             option_override_cm = options_override({"consistent": False})
         with option_override_cm:
-            result: int = self.query(event, end - duration, end, environment_id=environment_id)
-            comparison_type = self.get_option("comparisonType", COMPARISON_TYPE_COUNT)
-            if comparison_type == COMPARISON_TYPE_PERCENT:
-                comparison_interval = comparison_intervals[self.get_option("comparisonInterval")][1]
-                comparison_end = end - comparison_interval
+            windows = self.get_windows(interval, end)
+            start, end = windows[0]
+            result: int = self.query(event, start, end, environment_id=environment_id)
+            if len(windows) > 1:
                 # TODO: Figure out if there's a way we can do this less frequently. All queries are
                 # automatically cached for 10s. We could consider trying to cache this and the main
                 # query for 20s to reduce the load.
+                comparison_start, comparison_end = windows[1]
                 comparison_result = self.query(
-                    event, comparison_end - duration, comparison_end, environment_id=environment_id
+                    event, comparison_start, comparison_end, environment_id=environment_id
                 )
                 result = (
                     int(max(0, ((result / comparison_result) * 100) - 100))
@@ -184,35 +364,15 @@ class BaseEventFrequencyCondition(EventCondition, abc.ABC):
 class EventFrequencyCondition(BaseEventFrequencyCondition):
     id = "sentry.rules.conditions.event_frequency.EventFrequencyCondition"
     label = "The issue is seen more than {value} times in {interval}"
-
-    def query_hook(self, event: Event, start: datetime, end: datetime, environment_id: str) -> int:
-        sums: Mapping[int, int] = self.tsdb.get_sums(
-            model=self.tsdb.models.group,
-            keys=[event.group_id],
-            start=start,
-            end=end,
-            environment_id=environment_id,
-            use_cache=True,
-            jitter_value=event.group_id,
-        )
-        return sums[event.group_id]
+    tsdb_method = "get_sums"
+    tsdb_model = TSDBModel.group
 
 
 class EventUniqueUserFrequencyCondition(BaseEventFrequencyCondition):
     id = "sentry.rules.conditions.event_frequency.EventUniqueUserFrequencyCondition"
     label = "The issue is seen by more than {value} users in {interval}"
-
-    def query_hook(self, event: Event, start: datetime, end: datetime, environment_id: str) -> int:
-        totals: Mapping[int, int] = self.tsdb.get_distinct_counts_totals(
-            model=self.tsdb.models.users_affected_by_group,
-            keys=[event.group_id],
-            start=start,
-            end=end,
-            environment_id=environment_id,
-            use_cache=True,
-            jitter_value=event.group_id,
-        )
-        return totals[event.group_id]
+    tsdb_method = "get_distinct_counts_totals"
+    tsdb_model = TSDBModel.users_affected_by_group
 
 
 percent_intervals = {
@@ -264,6 +424,8 @@ class EventFrequencyPercentCondition(BaseEventFrequencyCondition):
     id = "sentry.rules.conditions.event_frequency.EventFrequencyPercentCondition"
     label = "The issue affects more than {value} percent of sessions in {interval}"
     logger = logging.getLogger("rules.event_frequency")
+    tsdb_method = "get_sums"
+    tsdb_model = TSDBModel.group
 
     def __init__(self, *args: Any, **kwargs: Any) -> None:
         self.intervals = percent_intervals
@@ -283,10 +445,10 @@ class EventFrequencyPercentCondition(BaseEventFrequencyCondition):
             ],
         }
 
-    def query_hook(self, event: Event, start: datetime, end: datetime, environment_id: str) -> int:
+    def get_session_count_last_hour(self, event: Event, end: datetime, environment_id: str) -> int:
         project_id = event.project_id
         cache_key = f"r.c.spc:{project_id}-{environment_id}"
-        session_count_last_hour = cache.get(cache_key)
+        session_count_last_hour: int | None = cache.get(cache_key)
         if session_count_last_hour is None:
             with options_override({"consistent": False}):
                 session_count_last_hour = release_health.get_project_sessions_count(  # type: ignore
@@ -298,21 +460,26 @@ class EventFrequencyPercentCondition(BaseEventFrequencyCondition):
                 )
 
             cache.set(cache_key, session_count_last_hour, 600)
+        return session_count_last_hour  # type: ignore
+
+    def get_frequency_queries(self, event: Event, end: datetime) -> Sequence[EventFrequencyQuery]:
+        # Issue counts are only queried for projects with enough sessions.
+        # TODO(mgaeta): Bug: Rule is optional.
+        environment_id = self.rule.environment_id  # type: ignore
+        if self.get_session_count_last_hour(event, end, environment_id) < MIN_SESSIONS_TO_FIRE:
+            return []
+        return super().get_frequency_queries(event, end)
+
+    def query_hook(self, event: Event, start: datetime, end: datetime, environment_id: str) -> int:
+        project_id = event.project_id
+        session_count_last_hour = self.get_session_count_last_hour(event, end, environment_id)
 
         if session_count_last_hour >= MIN_SESSIONS_TO_FIRE:
             interval_in_minutes = (
                 percent_intervals[self.get_option("interval")][1].total_seconds() // 60
             )
             avg_sessions_in_interval = session_count_last_hour / (60 / interval_in_minutes)
-            issue_count = self.tsdb.get_sums(
-                model=self.tsdb.models.group,
-                keys=[event.group_id],
-                start=start,
-                end=end,
-                environment_id=environment_id,
-                use_cache=True,
-                jitter_value=event.group_id,
-            )[event.group_id]
+            issue_count = self.get_group_total(event, start, end, environment_id)
             if issue_count > avg_sessions_in_interval:
                 # We want to better understand when and why this is happening, so we're logging it for now
                 self.logger.info(
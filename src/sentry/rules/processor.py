@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import logging
-from datetime import timedelta
+from datetime import datetime, timedelta
 from random import randrange
 from typing import Any, Callable, Iterable, List, Mapping, MutableMapping, Sequence, Set, Tuple
 
@@ -12,6 +12,11 @@ from sentry import analytics
 from sentry.eventstore.models import Event
 from sentry.models import GroupRuleStatus, Rule
 from sentry.rules import EventState, history, rules
+from sentry.rules.conditions.event_frequency import (
+    BaseEventFrequencyCondition,
+    EventFrequencyBatch,
+    EventFrequencyQuery,
+)
 from sentry.types.rules import RuleFuture
 from sentry.utils.hashlib import hash_values
 from sentry.utils.safe import safe_execute
@@ -19,6 +24,19 @@ from sentry.utils.safe import safe_execute
 SLOW_CONDITION_MATCHES = ["event_frequency"]
 
 
+class GroupRuleState:
+    """
+    The rules of a project along with their statuses and frequency counts for
+    a group, shared by the rule processors of several events of the group
+    that are post processed together.
+    """
+
+    def __init__(self) -> None:
+        self.rules: Sequence[Rule] | None = None
+        self.rule_statuses: Mapping[int, GroupRuleStatus] = {}
+        self.frequency_batch = EventFrequencyBatch()
+
+
 class RuleProcessor:
     logger = logging.getLogger("sentry.rules")
 
@@ -29,6 +47,7 @@ class RuleProcessor:
         is_regression: bool,
         is_new_group_environment: bool,
         has_reappeared: bool,
+        group_state: GroupRuleState | None = None,
     ) -> None:
         self.event = event
         self.group = event.group
@@ -38,10 +57,12 @@ class RuleProcessor:
         self.is_regression = is_regression
         self.is_new_group_environment = is_new_group_environment
         self.has_reappeared = has_reappeared
+        self.group_state = group_state
 
         self.grouped_futures: MutableMapping[
             str, Tuple[Callable[[Event, Sequence[RuleFuture]], None], List[RuleFuture]]
         ] = {}
+        self.frequency_batch: EventFrequencyBatch | None = None
 
     def get_rules(self) -> Sequence[Rule]:
         """Get all of the rules for this project from the DB (or cache)."""
@@ -118,6 +139,8 @@ class RuleProcessor:
             return None
 
         condition_inst = condition_cls(self.project, data=condition, rule=rule)
+        if isinstance(condition_inst, BaseEventFrequencyCondition):
+            condition_inst.batch = self.frequency_batch
         passes: bool = safe_execute(
             condition_inst.passes, self.event, state, _with_transaction=False
         )
@@ -149,28 +172,71 @@ class RuleProcessor:
             return lambda bool_iter: not any(bool_iter)
         return None
 
-    def apply_rule(self, rule: Rule, status: GroupRuleStatus) -> None:
+    def can_apply_rule(self, rule: Rule, status: GroupRuleStatus, now: datetime) -> bool:
         """
-        If all conditions and filters pass, execute every action.
-
-        :param rule: `Rule` object
-        :return: void
+        Whether the rule applies to the environment of the event and has not
+        fired recently.
         """
-        condition_match = rule.data.get("action_match") or Rule.DEFAULT_CONDITION_MATCH
-        filter_match = rule.data.get("filter_match") or Rule.DEFAULT_FILTER_MATCH
-        rule_condition_list = rule.data.get("conditions", ())
-        frequency = rule.data.get("frequency") or Rule.DEFAULT_FREQUENCY
-
         if (
             rule.environment_id is not None
             and self.event.get_environment().id != rule.environment_id
         ):
-            return
+            return False
 
-        now = timezone.now()
+        frequency = rule.data.get("frequency") or Rule.DEFAULT_FREQUENCY
         freq_offset = now - timedelta(minutes=frequency)
         if status.last_active and status.last_active > freq_offset:
-            return
+            return False
+        return True
+
+    def resolve_frequency_conditions(
+        self,
+        pending: Sequence[Tuple[Rule, Sequence[Mapping[str, Any]]]],
+        batch: EventFrequencyBatch,
+    ) -> None:
+        """
+        Collects the queries of the frequency conditions of the rules that are
+        still undecided after their other conditions, and resolves them at
+        once. Queries already resolved by `batch` are not made again.
+        """
+        queries: List[EventFrequencyQuery] = []
+        for rule, conditions in pending:
+            for condition in conditions:
+                condition_cls = rules.get(condition["id"])
+                if condition_cls is None or not issubclass(
+                    condition_cls, BaseEventFrequencyCondition
+                ):
+                    continue
+
+                condition_inst = condition_cls(self.project, data=condition, rule=rule)
+                queries.extend(
+                    safe_execute(
+                        condition_inst.get_frequency_queries,
+                        self.event,
+                        batch.end,
+                        _with_transaction=False,
+                    )
+                    or ()
+                )
+
+        if queries:
+            safe_execute(batch.resolve, queries, _with_transaction=False)
+
+    def evaluate_rule(
+        self, rule: Rule, status: GroupRuleStatus, now: datetime
+    ) -> Tuple[bool | None, Sequence[Mapping[str, Any]]]:
+        """
+        Evaluates the filters and all but the slow conditions of the rule.
+
+        Returns whether the rule passes, or ``None`` along with the slow
+        conditions if those decide it.
+        """
+        condition_match = rule.data.get("action_match") or Rule.DEFAULT_CONDITION_MATCH
+        filter_match = rule.data.get("filter_match") or Rule.DEFAULT_FILTER_MATCH
+        rule_condition_list = rule.data.get("conditions", ())
+
+        if not self.can_apply_rule(rule, status, now):
+            return False, ()
 
         state = self.get_state()
 
@@ -182,29 +248,65 @@ class RuleProcessor:
             else:
                 filter_list.append(rule_cond)
 
-        # Sort `condition_list` so that most expensive conditions run last.
-        condition_list.sort(
-            key=lambda condition: any(
-                condition_match in condition["id"] for condition_match in SLOW_CONDITION_MATCHES
-            )
-        )
-
         for predicate_list, match, name in (
             (filter_list, filter_match, "filter"),
             (condition_list, condition_match, "condition"),
         ):
             if not predicate_list:
                 continue
-            predicate_iter = (self.condition_matches(f, state, rule) for f in predicate_list)
             predicate_func = self.get_match_function(match)
-            if predicate_func:
-                if not predicate_func(predicate_iter):
-                    return
-            else:
+            if predicate_func is None:
                 self.logger.error(
                     f"Unsupported {name}_match {match!r} for rule {rule.id}", filter_match, rule.id
                 )
-                return
+                return False, ()
+            if name == "filter" and not predicate_func(
+                self.condition_matches(f, state, rule) for f in predicate_list
+            ):
+                return False, ()
+
+        if not condition_list:
+            return True, ()
+
+        # The most expensive conditions are only evaluated if the others
+        # don't decide the rule already.
+        fast_conditions = []
+        slow_conditions = []
+        for condition in condition_list:
+            if any(slow_match in condition["id"] for slow_match in SLOW_CONDITION_MATCHES):
+                slow_conditions.append(condition)
+            else:
+                fast_conditions.append(condition)
+
+        fast_iter = (self.condition_matches(c, state, rule) for c in fast_conditions)
+        if condition_match == "all":
+            if not all(fast_iter):
+                return False, ()
+        elif any(fast_iter):
+            return condition_match == "any", ()
+
+        if not slow_conditions:
+            return condition_match != "any", ()
+        return None, slow_conditions
+
+    def evaluate_slow_conditions(self, rule: Rule, conditions: Sequence[Mapping[str, Any]]) -> bool:
+        condition_match = rule.data.get("action_match") or Rule.DEFAULT_CONDITION_MATCH
+        state = self.get_state()
+        predicate_func = self.get_match_function(condition_match)
+        if predicate_func is None:
+            return False
+        return predicate_func(self.condition_matches(c, state, rule) for c in conditions)
+
+    def apply_rule(self, rule: Rule, status: GroupRuleStatus, now: datetime) -> None:
+        """
+        Execute every action of a rule whose conditions and filters passed.
+
+        :param rule: `Rule` object
+        :return: void
+        """
+        frequency = rule.data.get("frequency") or Rule.DEFAULT_FREQUENCY
+        freq_offset = now - timedelta(minutes=frequency)
+        state = self.get_state()
 
         updated = (
             GroupRuleStatus.objects.filter(id=status.id)
@@ -215,6 +317,9 @@ class RuleProcessor:
         if not updated:
             return
 
+        # Keep statuses shared with the events processed after this one current.
+        status.last_active = now
+
         if randrange(10) == 0:
             analytics.record(
                 "issue_alert.fired",
@@ -255,8 +360,32 @@ class RuleProcessor:
             return {}.values()
 
         self.grouped_futures.clear()
-        rules = self.get_rules()
-        rule_statuses = self.bulk_get_rule_status(rules)
-        for rule in rules:
-            self.apply_rule(rule, rule_statuses[rule.id])
+        if self.group_state is None:
+            rules = self.get_rules()
+            rule_statuses = self.bulk_get_rule_status(rules)
+            self.frequency_batch = EventFrequencyBatch()
+        else:
+            if self.group_state.rules is None:
+                self.group_state.rules = self.get_rules()
+                self.group_state.rule_statuses = self.bulk_get_rule_status(self.group_state.rules)
+            rules = self.group_state.rules
+            rule_statuses = self.group_state.rule_statuses
+            self.frequency_batch = self.group_state.frequency_batch
+
+        # Rules are evaluated in two phases so that the frequency conditions
+        # of all rules that are still undecided after their filters and other
+        # conditions are resolved together.
+        now = timezone.now()
+        evaluated = [
+            (rule, *self.evaluate_rule(rule, rule_statuses[rule.id], now)) for rule in rules
+        ]
+        pending = [(rule, conditions) for rule, passes, conditions in evaluated if passes is None]
+        if pending:
+            self.resolve_frequency_conditions(pending, self.frequency_batch)
+
+        for rule, passes, conditions in evaluated:
+            if passes is None:
+                passes = self.evaluate_slow_conditions(rule, conditions)
+            if passes:
+                self.apply_rule(rule, rule_statuses[rule.id], now)
         return self.grouped_futures.values()
@@ -383,6 +383,7 @@ def setup_services(validate=True):
         analytics,
         buffer,
         digests,
+        eventfrequency,
         newsletter,
         nodestore,
         quotas,
@@ -399,6 +400,7 @@ def setup_services(validate=True):
         analytics,
         buffer,
         digests,
+        eventfrequency,
         newsletter,
         nodestore,
         quotas,
@@ -515,10 +517,16 @@ def bind_cache_to_option_store():
     # continuing to initialize the remainder of the application.
     from django.core.cache import cache as default_cache
 
-    from sentry.options import default_store
+    from sentry.options import default_manager, default_store
 
     default_store.cache = default_cache
 
+    # With polling enabled, options are kept in memory until they change, so
+    # load all of them at once rather than one by one on first use.
+    default_store.poll_interval = settings.SENTRY_OPTIONS_POLL_INTERVAL
+    if default_store.poll_interval:
+        default_store.warm(default_manager.all())
+
 
 def apply_legacy_settings(settings):
     from sentry import options
@@ -84,6 +84,19 @@ local function variadic_argument_parser(argument_parser)
     end
 end
 
+local function counted_argument_parser(argument_parser)
+    -- Parses a count followed by that many arguments.
+    return function (cursor, arguments)
+        local count = tonumber(arguments[cursor])
+        cursor = cursor + 1
+        local results = {}
+        for i = 1, count do
+            cursor, results[i] = argument_parser(cursor, arguments)
+        end
+        return cursor, results
+    end
+end
+
 local function multiple_argument_parser(...)
     local parsers = {...}
     return function (cursor, arguments)
@@ -266,12 +279,7 @@ local function add_record_to_timeline(configuration, timeline_id, record_id, val
     return ready
 end
 
-local function digest_timeline(configuration, timeline_id, timeline_capacity)
-    -- Check to ensure that the timeline is in the correct state.
-    if redis.call('ZSCORE', configuration:get_schedule_ready_key(), timeline_id) == false then
-        error('err(invalid_state): timeline is not in the ready state, cannot be digested')
-    end
-
+local function snapshot_timeline(configuration, timeline_id, timeline_capacity)
     local digest_key = configuration:get_timeline_digest_key(timeline_id)
     local timeline_key = configuration:get_timeline_key(timeline_id)
     if redis.call('EXISTS', timeline_key) == 1 then
@@ -294,6 +302,17 @@ local function digest_timeline(configuration, timeline_id, timeline_capacity)
         redis.call('EXPIRE', digest_key, configuration.ttl)
     end
 
+    return digest_key
+end
+
+local function digest_timeline(configuration, timeline_id, timeline_capacity)
+    -- Check to ensure that the timeline is in the correct state.
+    if redis.call('ZSCORE', configuration:get_schedule_ready_key(), timeline_id) == false then
+        error('err(invalid_state): timeline is not in the ready state, cannot be digested')
+    end
+
+    local digest_key = snapshot_timeline(configuration, timeline_id, timeline_capacity)
+
     local results = {}
     local records = redis.call('ZREVRANGE', digest_key, 0, -1, 'WITHSCORES')
     local i = 0
@@ -338,6 +357,46 @@ local function close_digest(configuration, timeline_id, delay_minimum, record_id
     end
 end
 
+local function claim_timelines(configuration, lock_prefix, lock_id, lock_duration, timeline_capacity, timeline_ids)
+    -- Claims every timeline that is in the ready state and not locked by
+    -- anybody else, using the same lock keys as the single timeline digest
+    -- operations, and moves its contents to the digest set. Returns the
+    -- claimed timelines along with the size of their digest sets.
+    local results = {}
+    local i = 0
+    for _, timeline_id in ipairs(timeline_ids) do
+        local lock_key = lock_prefix .. configuration:get_timeline_key(timeline_id)
+        if redis.call('ZSCORE', configuration:get_schedule_ready_key(), timeline_id) ~= false
+            and redis.call('SET', lock_key, lock_id, 'NX', 'EX', lock_duration) then
+            local digest_key = snapshot_timeline(configuration, timeline_id, timeline_capacity)
+            i = i + 1
+            results[i] = {timeline_id, redis.call('ZCARD', digest_key)}
+        end
+    end
+    return results
+end
+
+local function release_timelines(configuration, lock_prefix, lock_id, timelines)
+    -- Closes the digests of the given timelines (if they provide record IDs)
+    -- and releases their claims. Timelines whose claim has expired, or has
+    -- been taken over by somebody else in the meantime, are left untouched.
+    -- Returns the closed timelines.
+    local results = {}
+    local i = 0
+    for _, timeline in ipairs(timelines) do
+        local lock_key = lock_prefix .. configuration:get_timeline_key(timeline.timeline_id)
+        if redis.call('GET', lock_key) == lock_id then
+            if timeline.close then
+                close_digest(configuration, timeline.timeline_id, timeline.delay_minimum, timeline.record_ids)
+                i = i + 1
+                results[i] = timeline.timeline_id
+            end
+            redis.call('DEL', lock_key)
+        end
+    end
+    return results
+end
+
 local function delete_timeline(configuration, timeline_id)
     truncate_timeline(configuration, timeline_id, 0)
     truncate_digest(configuration, timeline_id, 0)
@@ -448,6 +507,33 @@ local commands = {
         )(cursor, arguments)
         return close_digest(configuration, timeline_id, delay_minimum, record_ids)
     end,
+    DIGEST_CLAIM = function (cursor, arguments)
+        local cursor, configuration, lock_prefix, lock_id, lock_duration, timeline_capacity, timeline_ids = multiple_argument_parser(
+            configuration_argument_parser,
+            argument_parser(),
+            argument_parser(),
+            argument_parser(tonumber),
+            argument_parser(tonumber),
+            variadic_argument_parser(argument_parser())
+        )(cursor, arguments)
+        return claim_timelines(configuration, lock_prefix, lock_id, lock_duration, timeline_capacity, timeline_ids)
+    end,
+    DIGEST_RELEASE = function (cursor, arguments)
+        local cursor, configuration, lock_prefix, lock_id, timelines = multiple_argument_parser(
+            configuration_argument_parser,
+            argument_parser(),
+            argument_parser(),
+            variadic_argument_parser(
+                object_argument_parser({
+                    {"timeline_id", argument_parser()},
+                    {"close", argument_parser(function (value) return value == "1" end)},
+                    {"delay_minimum", argument_parser(tonumber)},
+                    {"record_ids", counted_argument_parser(argument_parser())},
+                })
+            )
+        )(cursor, arguments)
+        return release_timelines(configuration, lock_prefix, lock_id, timelines)
+    end,
 }
 
 local cursor, command = argument_parser(
@@ -1154,8 +1154,8 @@ class QueryBuilder:
             flags=Flags(turbo=self.turbo),
         )
 
-    def run_query(self, referrer: str, use_cache: bool = False) -> Any:
-        return raw_snql_query(self.get_snql_query(), referrer, use_cache)
+    def run_query(self, referrer: str, use_cache: bool = False, stream: bool = False) -> Any:
+        return raw_snql_query(self.get_snql_query(), referrer, use_cache, stream=stream)
 
 
 class UnresolvedQuery(QueryBuilder):
@@ -1,15 +1,18 @@
 from __future__ import annotations
 
 import logging
+import math
 import time
 from abc import ABCMeta, abstractmethod
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import replace
 from datetime import datetime, timedelta
 from hashlib import md5
-from typing import Any, List, Mapping, Sequence, Set, Tuple, cast
+from typing import Any, Callable, List, Mapping, Sequence, Set, Tuple, cast
 
 import sentry_sdk
 from django.utils import timezone
+from sentry_sdk import Hub
 from snuba_sdk import (
     Column,
     Condition,
@@ -38,6 +41,10 @@ from sentry.search.utils import validate_cdc_search_filters
 from sentry.utils import json, metrics, snuba
 from sentry.utils.cursors import Cursor, CursorResult
 
+# Runs the Snuba queries of post-filtered searches, so that the next chunk can
+# be fetched while the current one is post-filtered in Postgres.
+_chunk_query_pool = ThreadPoolExecutor(max_workers=10)
+
 
 def get_search_filter(search_filters: Sequence[SearchFilter], name: str, operator: str) -> Any:
     """
@@ -149,7 +156,56 @@ class AbstractQueryExecutor(metaclass=ABCMeta):
         * a sorted list of (group_id, group_score) tuples sorted descending by score,
         * the count of total results (rows) available for this query.
         """
+        query_kwargs, result_field = self._build_snuba_search(
+            start=start,
+            end=end,
+            project_ids=project_ids,
+            environment_ids=environment_ids,
+            sort_field=sort_field,
+            organization_id=organization_id,
+            cursor=cursor,
+            group_ids=group_ids,
+            limit=limit,
+            offset=offset,
+            get_sample=get_sample,
+            search_filters=search_filters,
+        )
+        return self._parse_snuba_search(
+            snuba.aliased_query(**query_kwargs), result_field, get_sample
+        )
+
+    def deferred_snuba_search(
+        self, **kwargs: Any
+    ) -> Callable[[], Tuple[List[Tuple[int, Any]], int]]:
+        """
+        Like `snuba_search`, but returns a function that runs the search. All
+        database lookups happen before this returns, so the function can be
+        called on another thread.
+        """
+        query_kwargs, result_field = self._build_snuba_search(**kwargs)
+        query = snuba.deferred_aliased_query(**query_kwargs)
+        get_sample = kwargs.get("get_sample", False)
+        return lambda: self._parse_snuba_search(query(), result_field, get_sample)
 
+    def _build_snuba_search(
+        self,
+        start: datetime,
+        end: datetime,
+        project_ids: Sequence[int],
+        environment_ids: Sequence[int],
+        sort_field: str,
+        organization_id: int,
+        cursor: Optional[Cursor] = None,
+        group_ids: Optional[Sequence[int]] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        get_sample: bool = False,
+        search_filters: Optional[Sequence[SearchFilter]] = None,
+    ) -> Tuple[Mapping[str, Any], str]:
+        """
+        Returns the arguments for the snuba query of a search, along with the
+        field holding the score in its results.
+        """
         filters = {"project_id": project_ids}
 
         environments = None
@@ -227,7 +283,7 @@ class AbstractQueryExecutor(metaclass=ABCMeta):
             ]  # ensure stable sort within the same score
             referrer = "search"
 
-        snuba_results = snuba.aliased_query(
+        query_kwargs = dict(
             dataset=self.dataset,
             start=start,
             end=end,
@@ -246,6 +302,11 @@ class AbstractQueryExecutor(metaclass=ABCMeta):
             sample=1,  # Don't use clickhouse sampling, even when in turbo mode.
             condition_resolver=snuba.get_snuba_column_name,
         )
+        return query_kwargs, sort_field
+
+    def _parse_snuba_search(
+        self, snuba_results: Mapping[str, Any], sort_field: str, get_sample: bool
+    ) -> Tuple[List[Tuple[int, Any]], int]:
         rows = snuba_results["data"]
         total = snuba_results["totals"]["total"]
 
@@ -439,11 +500,6 @@ class PostgresSnubaQueryExecutor(AbstractQueryExecutor):
             group_ids = []
 
         sort_field = self.sort_strategies[sort_by]
-        chunk_growth = options.get("snuba.search.chunk-growth-rate")
-        max_chunk_size = options.get("snuba.search.max-chunk-size")
-        chunk_limit = limit
-        offset = 0
-        num_chunks = 0
         hits = self.calculate_hits(
             group_ids,
             too_many_candidates,
@@ -464,92 +520,54 @@ class PostgresSnubaQueryExecutor(AbstractQueryExecutor):
         if count_hits and hits == 0:
             return self.empty_result
 
-        paginator_results = self.empty_result
-        result_groups = []
-        result_group_ids = set()
-
-        max_time = options.get("snuba.search.max-total-chunk-time-seconds")
-        time_start = time.time()
-        more_results = False
-
-        # Do smaller searches in chunks until we have enough results
-        # to answer the query (or hit the end of possible results). We do
-        # this because a common case for search is to return 100 groups
-        # sorted by `last_seen`, and we want to avoid returning all of
-        # a project's groups and then post-sorting them all in Postgres
-        # when typically the first N results will do.
-        while (time.time() - time_start) < max_time:
-            num_chunks += 1
-
-            # grow the chunk size on each iteration to account for huge projects
-            # and weird queries, up to a max size
-            chunk_limit = min(int(chunk_limit * chunk_growth), max_chunk_size)
-            # but if we have group_ids always query for at least that many items
-            chunk_limit = max(chunk_limit, len(group_ids))
+        search_kwargs = dict(
+            start=start,
+            end=end,
+            project_ids=[p.id for p in projects],
+            environment_ids=environments and [environment.id for environment in environments],
+            organization_id=projects[0].organization_id,
+            sort_field=sort_field,
+            cursor=cursor,
+            search_filters=search_filters,
+        )
 
-            # {group_id: group_score, ...}
+        if group_ids:
+            # pre-filtered candidates are passed down to Snuba, so we're
+            # finished with filtering and these are the only results. We
+            # query for at least as many items as there are candidates, so we
+            # get all of them in a single query.
+            chunk_limit = min(
+                int(limit * options.get("snuba.search.chunk-growth-rate")),
+                options.get("snuba.search.max-chunk-size"),
+            )
             snuba_groups, total = self.snuba_search(
-                start=start,
-                end=end,
-                project_ids=[p.id for p in projects],
-                environment_ids=environments and [environment.id for environment in environments],
-                organization_id=projects[0].organization_id,
-                sort_field=sort_field,
-                cursor=cursor,
                 group_ids=group_ids,
-                limit=chunk_limit,
-                offset=offset,
-                search_filters=search_filters,
+                limit=max(chunk_limit, len(group_ids)),
+                offset=0,
+                **search_kwargs,
             )
             metrics.timing("snuba.search.num_snuba_results", len(snuba_groups))
-            count = len(snuba_groups)
-            more_results = count >= limit and (offset + limit) < total
-            offset += len(snuba_groups)
-
-            if not snuba_groups:
-                break
-
-            if group_ids:
-                # pre-filtered candidates were passed down to Snuba, so we're
-                # finished with filtering and these are the only results. Note
-                # that because we set the chunk size to at least the size of
-                # the group_ids, we know we got all of them (ie there are
-                # no more chunks after the first)
-                result_groups = snuba_groups
-                if count_hits and hits is None:
-                    hits = len(snuba_groups)
-            else:
-                # pre-filtered candidates were *not* passed down to Snuba,
-                # so we need to do post-filtering to verify Sentry DB predicates
-                filtered_group_ids = group_queryset.filter(
-                    id__in=[gid for gid, _ in snuba_groups]
-                ).values_list("id", flat=True)
-
-                group_to_score = dict(snuba_groups)
-                for group_id in filtered_group_ids:
-                    if group_id in result_group_ids:
-                        # because we're doing multiple Snuba queries, which
-                        # happen outside of a transaction, there is a small possibility
-                        # of groups moving around in the sort scoring underneath us,
-                        # so we at least want to protect against duplicates
-                        continue
-
-                    group_score = group_to_score[group_id]
-                    result_group_ids.add(group_id)
-                    result_groups.append((group_id, group_score))
-
-            # break the query loop for one of three reasons:
-            # * we started with Postgres candidates and so only do one Snuba query max
-            # * the paginator is returning enough results to satisfy the query (>= the limit)
-            # * there are no more groups in Snuba to post-filter
-            # TODO do we actually have to rebuild this SequencePaginator every time
-            # or can we just make it after we've broken out of the loop?
-            paginator_results = SequencePaginator(
-                [(score, id) for (id, score) in result_groups], reverse=True, **paginator_options
-            ).get_result(limit, cursor, known_hits=hits, max_hits=max_hits)
+            more_results = len(snuba_groups) >= limit and limit < total
+            num_chunks = 1
+            result_groups = snuba_groups or None
+            if result_groups and count_hits and hits is None:
+                hits = len(result_groups)
+        else:
+            # pre-filtered candidates were *not* passed down to Snuba, so we
+            # need to do post-filtering to verify Sentry DB predicates
+            result_groups, more_results, num_chunks = self._post_filtered_search(
+                group_queryset, limit, cursor, search_kwargs
+            )
 
-            if group_ids or len(paginator_results.results) >= limit or not more_results:
-                break
+        if result_groups is None:
+            paginator_results = self.empty_result
+        else:
+            with metrics.timer("snuba.search.paginate"):
+                paginator_results = SequencePaginator(
+                    [(score, id) for (id, score) in result_groups],
+                    reverse=True,
+                    **paginator_options,
+                ).get_result(limit, cursor, known_hits=hits, max_hits=max_hits)
 
         # HACK: We're using the SequencePaginator to mask the complexities of going
         # back and forth between two databases. This causes a problem with pagination
@@ -577,6 +595,131 @@ class PostgresSnubaQueryExecutor(AbstractQueryExecutor):
 
         return paginator_results
 
+    def _post_filtered_search(
+        self,
+        group_queryset: BaseQuerySet,
+        limit: int,
+        cursor: Cursor | None,
+        search_kwargs: Mapping[str, Any],
+    ) -> Tuple[Optional[List[Tuple[int, Any]]], bool, int]:
+        """
+        Searches Snuba in chunks and filters every chunk through
+        `group_queryset` until there are enough results to answer the query
+        (or we hit the end of possible results). We do this because a common
+        case for search is to return 100 groups sorted by `last_seen`, and we
+        want to avoid returning all of a project's groups and then
+        post-sorting them all in Postgres when typically the first N results
+        will do.
+
+        Chunks are sized by the share of Snuba results that survived
+        post-filtering so far. When a chunk is not expected to complete the
+        page, the next chunk is fetched from Snuba while the current one is
+        filtered in Postgres.
+
+        Returns a tuple of:
+        * the unsorted list of (group_id, group_score) results, or ``None`` if
+          Snuba had no results at all,
+        * whether Snuba has more results,
+        * the number of chunks queried.
+        """
+        chunk_growth = options.get("snuba.search.chunk-growth-rate")
+        max_chunk_size = options.get("snuba.search.max-chunk-size")
+        max_time = options.get("snuba.search.max-total-chunk-time-seconds")
+        prefetch = options.get("snuba.search.prefetch-chunks")
+
+        # The paginator skips `cursor.offset` results before the page starts.
+        num_needed = limit + (cursor.offset if cursor is not None else 0)
+
+        def next_chunk_limit(chunk_limit: int, num_missing: float) -> int:
+            if num_passed:
+                chunk_limit = int(math.ceil(num_missing * num_fetched / num_passed))
+            else:
+                # Nothing passed yet, so there is nothing to extrapolate from.
+                chunk_limit = int(chunk_limit * chunk_growth)
+            # Never query for less than a page, as that is what we use to tell
+            # whether Snuba has more results.
+            return max(min(chunk_limit, max_chunk_size), limit)
+
+        result_groups: List[Tuple[int, Any]] = []
+        result_group_ids: Set[int] = set()
+        num_fetched = num_passed = 0
+        offset = 0
+        num_chunks = 0
+        more_results = False
+        time_start = time.time()
+
+        chunk_limit = next_chunk_limit(limit, num_needed)
+        pending = self._fetch_chunk(search_kwargs, chunk_limit, offset)
+        while pending is not None:
+            with metrics.timer("snuba.search.post_filter.snuba_wait"):
+                snuba_groups, total = pending.result()
+            pending = None
+            num_chunks += 1
+
+            count = len(snuba_groups)
+            metrics.timing("snuba.search.num_snuba_results", count)
+            more_results = count >= limit and (offset + limit) < total
+            offset += count
+
+            if not snuba_groups:
+                break
+
+            can_continue = more_results and (time.time() - time_start) < max_time
+            if prefetch and can_continue and num_fetched:
+                expected = len(result_groups) + count * num_passed / num_fetched
+                if expected < num_needed:
+                    chunk_limit = next_chunk_limit(chunk_limit, num_needed - expected)
+                    pending = self._fetch_chunk(search_kwargs, chunk_limit, offset)
+
+            with metrics.timer("snuba.search.post_filter.postgres"):
+                filtered_group_ids = list(
+                    group_queryset.filter(id__in=[gid for gid, _ in snuba_groups]).values_list(
+                        "id", flat=True
+                    )
+                )
+            num_fetched += count
+            num_passed += len(filtered_group_ids)
+
+            group_to_score = dict(snuba_groups)
+            for group_id in filtered_group_ids:
+                if group_id in result_group_ids:
+                    # because we're doing multiple Snuba queries, which
+                    # happen outside of a transaction, there is a small possibility
+                    # of groups moving around in the sort scoring underneath us,
+                    # so we at least want to protect against duplicates
+                    continue
+
+                group_score = group_to_score[group_id]
+                result_group_ids.add(group_id)
+                result_groups.append((group_id, group_score))
+
+            # break the query loop for one of three reasons:
+            # * the paginator is returning enough results to satisfy the query (>= the limit)
+            # * there are no more groups in Snuba to post-filter
+            # * we ran out of time
+            if len(result_groups) >= num_needed or not can_continue:
+                break
+
+            if pending is None:
+                chunk_limit = next_chunk_limit(chunk_limit, num_needed - len(result_groups))
+                pending = self._fetch_chunk(search_kwargs, chunk_limit, offset)
+
+        metrics.timing("snuba.search.post_filter.pass_rate", num_passed / max(num_fetched, 1))
+        return (result_groups if num_fetched else None), more_results, num_chunks
+
+    def _fetch_chunk(
+        self, search_kwargs: Mapping[str, Any], limit: int, offset: int
+    ) -> Future[Tuple[List[Tuple[int, Any]], int]]:
+        metrics.timing("snuba.search.chunk_size", limit)
+        query = self.deferred_snuba_search(limit=limit, offset=offset, **search_kwargs)
+        hub = Hub(Hub.current)
+
+        def run() -> Tuple[List[Tuple[int, Any]], int]:
+            with hub, metrics.timer("snuba.search.post_filter.snuba_query"):
+                return query()
+
+        return _chunk_query_pool.submit(run)
+
     def calculate_hits(
         self,
         group_ids: Sequence[int],
@@ -4,15 +4,34 @@ from typing import Mapping, MutableMapping, Optional, Sequence
 
 from django.conf import settings
 
+from sentry.utils import metrics
 from sentry.utils.cache import cache
 from sentry.utils.hashlib import md5_text
+from sentry.utils.lru import LRUCache
 
 logger = logging.getLogger(__name__)
 
+_INDEXER_CACHE_TIER_METRIC = "sentry_metrics.indexer.cache_tier"
+
 
 class StringIndexerCache:
+    """
+    Two-tier cache for indexer ids: a bounded process-local LRU in front of
+    the shared Django cache. Ids never change once assigned, so both tiers use
+    the same (randomized) ttl and entries are only ever invalidated by an
+    explicit delete.
+    """
+
     def __init__(self, version: int):
         self.version = version
+        local_size = settings.SENTRY_METRICS_INDEXER_LOCAL_CACHE_SIZE
+        self.local: Optional[LRUCache[str, int]] = (
+            LRUCache("sentry_metrics.indexer", max_items=local_size) if local_size else None
+        )
+        # id -> string, used by ``reverse_resolve``.
+        self.local_reverse: Optional[LRUCache[int, str]] = (
+            LRUCache("sentry_metrics.indexer.reverse", max_items=local_size) if local_size else None
+        )
 
     @property
     def randomized_ttl(self) -> int:
@@ -46,36 +65,105 @@ class StringIndexerCache:
 
         return formatted
 
+    def _record_tier(self, tier: str, hits: int, misses: int) -> None:
+        if hits:
+            metrics.incr(
+                _INDEXER_CACHE_TIER_METRIC, tags={"tier": tier, "cache_hit": "true"}, amount=hits
+            )
+        if misses:
+            metrics.incr(
+                _INDEXER_CACHE_TIER_METRIC,
+                tags={"tier": tier, "cache_hit": "false"},
+                amount=misses,
+            )
+
     def get(self, key: str) -> int:
-        result: int = cache.get(self.make_cache_key(key), version=self.version)
+        if self.local is not None:
+            result = self.local.get(key, record_metrics=False)
+            self._record_tier("local", int(result is not None), int(result is None))
+            if result is not None:
+                return result
+
+        result = cache.get(self.make_cache_key(key), version=self.version)
+        self._record_tier("shared", int(result is not None), int(result is None))
+        if result is not None and self.local is not None:
+            self.local.set(key, result, ttl=self.randomized_ttl)
         return result
 
     def set(self, key: str, value: int) -> None:
+        ttl = self.randomized_ttl
         cache.set(
             key=self.make_cache_key(key),
             value=value,
-            timeout=self.randomized_ttl,
+            timeout=ttl,
             version=self.version,
         )
+        if self.local is not None:
+            self.local.set(key, value, ttl=ttl)
 
     def get_many(self, keys: Sequence[str]) -> MutableMapping[str, Optional[int]]:
-        cache_keys = {self.make_cache_key(key): key for key in keys}
+        local_results: Mapping[str, int] = {}
+        if self.local is not None:
+            local_results = self.local.get_many(keys)
+            self._record_tier("local", len(local_results), len(keys) - len(local_results))
+            if len(local_results) == len(keys):
+                return dict(local_results)
+
+        shared_keys = [key for key in keys if key not in local_results]
+        cache_keys = {self.make_cache_key(key): key for key in shared_keys}
         results: Mapping[str, Optional[int]] = cache.get_many(
             cache_keys.keys(), version=self.version
         )
-        return self._format_results(keys, results)
+        formatted = self._format_results(shared_keys, results)
+
+        shared_hits = {key: value for key, value in formatted.items() if value is not None}
+        self._record_tier("shared", len(shared_hits), len(shared_keys) - len(shared_hits))
+        if shared_hits and self.local is not None:
+            self.local.set_many(shared_hits, ttl=self.randomized_ttl)
+
+        formatted.update(local_results)
+        return {key: formatted[key] for key in keys}
 
     def set_many(self, key_values: Mapping[str, int]) -> None:
+        ttl = self.randomized_ttl
         cache_key_values = {self.make_cache_key(k): v for k, v in key_values.items()}
-        cache.set_many(cache_key_values, timeout=self.randomized_ttl, version=self.version)
+        cache.set_many(cache_key_values, timeout=ttl, version=self.version)
+        if self.local is not None:
+            self.local.set_many(key_values, ttl=ttl)
 
     def delete(self, key: str) -> None:
         cache_key = self.make_cache_key(key)
         cache.delete(cache_key, version=self.version)
+        if self.local is not None:
+            self.local.delete(key)
 
     def delete_many(self, keys: Sequence[str]) -> None:
         cache_keys = [self.make_cache_key(key) for key in keys]
         cache.delete_many(cache_keys, version=self.version)
+        if self.local is not None:
+            self.local.delete_many(keys)
+
+    def get_string(self, id: int) -> Optional[str]:
+        """
+        Returns the string for `id` if it is present in the process-local
+        tier. The shared tier for reverse lookups is the model cache, see
+        ``reverse_resolve``.
+        """
+        if self.local_reverse is None:
+            return None
+        result: Optional[str] = self.local_reverse.get(id, record_metrics=False)
+        self._record_tier("local_reverse", int(result is not None), int(result is None))
+        return result
+
+    def set_string(self, id: int, string: str) -> None:
+        if self.local_reverse is not None:
+            self.local_reverse.set(id, string, ttl=self.randomized_ttl)
+
+    def clear_local_cache(self) -> None:
+        if self.local is not None:
+            self.local.clear()
+        if self.local_reverse is not None:
+            self.local_reverse.clear()
 
 
 # todo: dont hard code 1 as the version
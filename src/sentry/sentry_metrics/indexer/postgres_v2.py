@@ -185,11 +185,16 @@ class PGStringIndexerV2(StringIndexer):
 
         Returns None if the entry cannot be found.
         """
+        string = indexer_cache.get_string(id)
+        if string is not None:
+            return string
+
         try:
-            string: str = StringIndexerTable.objects.get_from_cache(id=id, use_replica=True).string
+            string = StringIndexerTable.objects.get_from_cache(id=id, use_replica=True).string
         except StringIndexerTable.DoesNotExist:
             return None
 
+        indexer_cache.set_string(id, string)
         return string
 
 
@@ -1,16 +1,19 @@
 import functools
 import logging
+import multiprocessing
 import time
 from collections import defaultdict, deque
 from concurrent.futures import Future
-from copy import deepcopy
 from dataclasses import dataclass
 from functools import partial
+from multiprocessing.connection import Connection
+from multiprocessing.shared_memory import SharedMemory
 from typing import (
     TYPE_CHECKING,
     Any,
     Callable,
     Deque,
+    Iterable,
     List,
     Mapping,
     MutableMapping,
@@ -18,6 +21,7 @@ from typing import (
     Optional,
     Sequence,
     Set,
+    Tuple,
     Union,
 )
 
@@ -38,9 +42,16 @@ from django.conf import settings
 from sentry.utils import json, kafka_config
 from sentry.utils.batching_kafka_consumer import create_topics
 
+if TYPE_CHECKING:
+    from sentry.sentry_metrics.indexer.base import FetchType
+
 DEFAULT_QUEUED_MAX_MESSAGE_KBYTES = 50000
 DEFAULT_QUEUED_MIN_MESSAGES = 100000
 
+# Size of the shared memory blocks used to pass payloads to and from each
+# transform worker.
+DEFAULT_BLOCK_SIZE = int(32 * 1e6)
+
 MAX_NAME_LENGTH = 200
 MAX_TAG_KEY_LENGTH = 200
 MAX_TAG_VALUE_LENGTH = 200
@@ -358,6 +369,139 @@ def invalid_metric_tags(tags: Mapping[str, str]) -> Sequence[str]:
     return invalid_strs
 
 
+def _parse_payloads(
+    payloads: Iterable[Tuple[int, bytes]],
+    org_strings: MutableMapping[int, Set[str]],
+    skipped_offsets: Set[int],
+) -> MutableMapping[int, json.JSONData]:
+    """
+    Parses and validates the `(offset, value)` payloads of a batch. Collects
+    the strings to index per organization in `org_strings` and the offsets
+    of invalid messages in `skipped_offsets`.
+    """
+    parsed_payloads_by_offset: MutableMapping[int, json.JSONData] = {}
+    for offset, value in payloads:
+        try:
+            # rapidjson decodes the UTF-8 payload itself.
+            parsed_payloads_by_offset[offset] = rapidjson.loads(value)
+        except rapidjson.JSONDecodeError:
+            skipped_offsets.add(offset)
+            logger.error(
+                "process_messages.invalid_json",
+                extra={"payload_value": str(value)},
+                exc_info=True,
+            )
+            continue
+
+    for offset, message in parsed_payloads_by_offset.items():
+        metric_name = message["name"]
+        org_id = message["org_id"]
+        tags = message.get("tags", {})
+
+        if not valid_metric_name(metric_name):
+            logger.error(
+                "process_messages.invalid_metric_name",
+                extra={"org_id": org_id, "metric_name": metric_name, "offset": offset},
+            )
+            skipped_offsets.add(offset)
+            continue
+
+        invalid_strs = invalid_metric_tags(tags)
+
+        if invalid_strs:
+            # sentry doesn't seem to actually capture nested logger.error extra args
+            sentry_sdk.set_extra("all_metric_tags", tags)
+            logger.error(
+                "process_messages.invalid_tags",
+                extra={
+                    "org_id": org_id,
+                    "metric_name": metric_name,
+                    "invalid_tags": invalid_strs,
+                    "offset": offset,
+                },
+            )
+            skipped_offsets.add(offset)
+            continue
+
+        parsed_strings = org_strings[org_id]
+        parsed_strings.add(metric_name)
+        parsed_strings.update(tags.keys())
+        parsed_strings.update(tags.values())
+
+    return parsed_payloads_by_offset
+
+
+def _get_string_meta(
+    bulk_record_meta: Mapping[str, Tuple[int, "FetchType"]]
+) -> Mapping[str, Tuple[str, str]]:
+    """
+    Returns the fetch type and id of every string of a batch, as they appear
+    in the mapping metadata of messages.
+
+    The metadata of a string only depends on the batch, so it is computed
+    once rather than for every message the string appears in. Ids are JSON
+    object keys and hence stringified up front.
+    """
+    return {
+        string: (fetch_type.value, str(int_id))
+        for string, (int_id, fetch_type) in bulk_record_meta.items()
+    }
+
+
+def _rewrite_payload(
+    payload: MutableMapping[str, Any],
+    mapping: Mapping[int, Mapping[str, int]],
+    string_meta: Mapping[str, Tuple[str, str]],
+) -> Optional[Tuple[bytes, bytes]]:
+    """
+    Replaces the strings of a parsed payload with their ids and returns the
+    serialized payload along with its ``mapping_sources`` header, or ``None``
+    if a string was not indexed.
+
+    The parsed payload is not used anywhere else, so it is rewritten in place
+    instead of copied.
+    """
+    metric_name = payload.pop("name")
+    org_id = payload["org_id"]
+    tags = payload.get("tags", {})
+
+    try:
+        org_mapping = mapping[org_id]
+        new_tags = {str(org_mapping[k]): org_mapping[v] for k, v in tags.items()}
+    except KeyError:
+        logger.error("process_messages.key_error", extra={"tags": tags}, exc_info=True)
+        return None
+
+    output_message_meta: MutableMapping[str, MutableMapping[str, str]] = {}
+    for string in (metric_name, *tags.keys(), *tags.values()):
+        meta = string_meta.get(string)
+        if meta is not None:
+            fetch_type_value, int_id = meta
+            output_message_meta.setdefault(fetch_type_value, {})[int_id] = string
+
+    payload["tags"] = new_tags
+    payload["metric_id"] = org_mapping[metric_name]
+    payload["retention_days"] = 90
+    payload["mapping_meta"] = output_message_meta
+
+    return rapidjson.dumps(payload).encode(), "".join(output_message_meta).encode()
+
+
+def _make_message(
+    message: Message[KafkaPayload], value: bytes, mapping_sources: bytes
+) -> Message[KafkaPayload]:
+    return Message(
+        partition=message.partition,
+        offset=message.offset,
+        payload=KafkaPayload(
+            key=message.payload.key,
+            value=value,
+            headers=[*message.payload.headers, ("mapping_sources", mapping_sources)],
+        ),
+        timestamp=message.timestamp,
+    )
+
+
 def process_messages(
     outer_message: Message[MessageBatch],
 ) -> MessageBatch:
@@ -382,135 +526,243 @@ def process_messages(
     indexer = get_indexer()
     metrics = get_metrics()
 
-    org_strings = defaultdict(set)
-    strings = set()
-    skipped_offsets = set()
+    org_strings: MutableMapping[int, Set[str]] = defaultdict(set)
+    skipped_offsets: Set[int] = set()
     with metrics.timer("process_messages.parse_outer_message"):
-        parsed_payloads_by_offset: MutableMapping[int, json.JSONData] = {}
-        for msg in outer_message.payload:
-            try:
-                parsed_payload = json.loads(msg.payload.value.decode("utf-8"), use_rapid_json=True)
-                parsed_payloads_by_offset[msg.offset] = parsed_payload
-            except rapidjson.JSONDecodeError:
-                skipped_offsets.add(msg.offset)
-                logger.error(
-                    "process_messages.invalid_json",
-                    extra={"payload_value": str(msg.payload.value)},
-                    exc_info=True,
-                )
-                continue
-
-        for offset, message in parsed_payloads_by_offset.items():
-            metric_name = message["name"]
-            org_id = message["org_id"]
-            tags = message.get("tags", {})
-
-            if not valid_metric_name(metric_name):
-                logger.error(
-                    "process_messages.invalid_metric_name",
-                    extra={"org_id": org_id, "metric_name": metric_name, "offset": offset},
-                )
-                skipped_offsets.add(offset)
-                continue
-
-            invalid_strs = invalid_metric_tags(tags)
-
-            if invalid_strs:
-                # sentry doesn't seem to actually capture nested logger.error extra args
-                sentry_sdk.set_extra("all_metric_tags", tags)
-                logger.error(
-                    "process_messages.invalid_tags",
-                    extra={
-                        "org_id": org_id,
-                        "metric_name": metric_name,
-                        "invalid_tags": invalid_strs,
-                        "offset": offset,
-                    },
-                )
-                skipped_offsets.add(offset)
-                continue
-
-            parsed_strings = {
-                metric_name,
-                *tags.keys(),
-                *tags.values(),
-            }
-            org_strings[org_id].update(parsed_strings)
-            strings.update(parsed_strings)
+        parsed_payloads_by_offset = _parse_payloads(
+            ((msg.offset, msg.payload.value) for msg in outer_message.payload),
+            org_strings,
+            skipped_offsets,
+        )
 
+    strings = set().union(*org_strings.values())
     metrics.incr("process_messages.total_strings_indexer_lookup", amount=len(strings))
 
     with metrics.timer("metrics_consumer.bulk_record"):
         record_result = indexer.bulk_record(org_strings)
 
     mapping = record_result.get_mapped_results()
-    bulk_record_meta = record_result.get_fetch_metadata()
+    string_meta = _get_string_meta(record_result.get_fetch_metadata())
 
     new_messages: List[Message[KafkaPayload]] = []
 
     with metrics.timer("process_messages.reconstruct_messages"):
         for message in outer_message.payload:
-            used_tags: Set[str] = set()
-            output_message_meta: Mapping[str, MutableMapping[int, str]] = defaultdict(dict)
-
             if message.offset in skipped_offsets:
                 logger.info("process_message.offset_skipped", extra={"offset": message.offset})
                 continue
-            parsed_payload_value = parsed_payloads_by_offset[message.offset]
-            new_payload_value = deepcopy(parsed_payload_value)
-
-            metric_name = parsed_payload_value["name"]
-            org_id = parsed_payload_value["org_id"]
-            tags = parsed_payload_value.get("tags", {})
-            used_tags.add(metric_name)
-
-            new_tags: MutableMapping[int, int] = {}
-            try:
-                for k, v in tags.items():
-                    used_tags.update({k, v})
-                    new_tags[mapping[org_id][k]] = mapping[org_id][v]
-            except KeyError:
-                logger.error("process_messages.key_error", extra={"tags": tags}, exc_info=True)
-                continue
-
-            fetch_types_encountered = set()
-            for tag in used_tags:
-                if tag in bulk_record_meta:
-                    int_id, fetch_type = bulk_record_meta.get(tag)
-                    fetch_types_encountered.add(fetch_type)
-                    output_message_meta[fetch_type.value][int_id] = tag
 
-            mapping_header_content = bytes(
-                "".join([t.value for t in fetch_types_encountered]), "utf-8"
+            rewritten = _rewrite_payload(
+                parsed_payloads_by_offset[message.offset], mapping, string_meta
             )
-            new_payload_value["tags"] = new_tags
-            new_payload_value["metric_id"] = mapping[org_id][metric_name]
-            new_payload_value["retention_days"] = 90
-            new_payload_value["mapping_meta"] = output_message_meta
-
-            del new_payload_value["name"]
-
-            new_payload = KafkaPayload(
-                key=message.payload.key,
-                value=json.dumps(new_payload_value).encode(),
-                headers=[
-                    *message.payload.headers,
-                    ("mapping_sources", mapping_header_content),
-                ],
-            )
-            new_message = Message(
-                partition=message.partition,
-                offset=message.offset,
-                payload=new_payload,
-                timestamp=message.timestamp,
-            )
-            new_messages.append(new_message)
+            if rewritten is not None:
+                new_messages.append(_make_message(message, *rewritten))
 
     metrics.incr("metrics_consumer.process_message.messages_seen", amount=len(new_messages))
 
     return new_messages
 
 
+# A payload in a message sent to or from a transform worker, either as a
+# `(start, end)` span of the worker's shared memory block or, if it did not
+# fit into the block, inline.
+PayloadRef = Union[Tuple[int, int], bytes]
+
+
+def _write_payloads(
+    block: SharedMemory, payloads: Iterable[Tuple[int, bytes]]
+) -> List[Tuple[int, PayloadRef]]:
+    rv: List[Tuple[int, PayloadRef]] = []
+    position = 0
+    for offset, value in payloads:
+        end = position + len(value)
+        if end <= block.size:
+            block.buf[position:end] = value
+            rv.append((offset, (position, end)))
+            position = end
+        else:
+            rv.append((offset, value))
+    return rv
+
+
+def _read_payload(block: SharedMemory, ref: PayloadRef) -> bytes:
+    if isinstance(ref, bytes):
+        return ref
+    start, end = ref
+    return bytes(block.buf[start:end])
+
+
+def _run_transform_worker(conn: Connection, input_name: str, output_name: str) -> None:
+    """
+    Main loop of a transform worker. The worker parses the payloads it is
+    sent, keeps them until the batch has been indexed and then rewrites them.
+    """
+    input_block = SharedMemory(name=input_name)
+    output_block = SharedMemory(name=output_name)
+    try:
+        parsed_payloads_by_offset: MutableMapping[int, json.JSONData] = {}
+        skipped_offsets: Set[int] = set()
+        while True:
+            command, args = conn.recv()
+            if command == "parse":
+                org_strings: MutableMapping[int, Set[str]] = defaultdict(set)
+                skipped_offsets = set()
+                parsed_payloads_by_offset = _parse_payloads(
+                    ((offset, _read_payload(input_block, ref)) for offset, ref in args),
+                    org_strings,
+                    skipped_offsets,
+                )
+                conn.send((dict(org_strings), skipped_offsets))
+            elif command == "rewrite":
+                mapping, string_meta = args
+                results = []
+                for offset, payload in parsed_payloads_by_offset.items():
+                    if offset in skipped_offsets:
+                        continue
+                    rewritten = _rewrite_payload(payload, mapping, string_meta)
+                    if rewritten is not None:
+                        results.append((offset, *rewritten))
+                parsed_payloads_by_offset = {}
+
+                refs = _write_payloads(
+                    output_block, ((offset, value) for offset, value, _ in results)
+                )
+                conn.send(
+                    [(offset, ref, header) for (offset, ref), (_, _, header) in zip(refs, results)]
+                )
+            else:
+                assert command == "close"
+                break
+    finally:
+        input_block.close()
+        output_block.close()
+
+
+class _TransformWorker:
+    def __init__(self, input_block_size: int, output_block_size: int) -> None:
+        self.input_block = SharedMemory(create=True, size=input_block_size)
+        self.output_block = SharedMemory(create=True, size=output_block_size)
+        # Workers are forked so that they inherit the configuration of the
+        # consumer and only ever touch payloads, never the indexer.
+        context = multiprocessing.get_context("fork")
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_run_transform_worker,
+            args=(child_conn, self.input_block.name, self.output_block.name),
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        try:
+            if self.process.is_alive():
+                self.conn.send(("close", None))
+            self.process.join(timeout)
+            if self.process.is_alive():
+                self.process.terminate()
+        finally:
+            self.conn.close()
+            for block in (self.input_block, self.output_block):
+                block.close()
+                block.unlink()
+
+
+class ParallelProcessMessages:
+    """
+    Drop-in replacement for ``process_messages`` that parses and rewrites the
+    messages of a batch in a pool of worker processes.
+
+    Every batch is split into one contiguous shard per worker. Payloads are
+    passed to and from the workers through a shared memory block per worker
+    and direction, falling back to the pipe when a block is full. Indexing
+    the strings of the whole batch remains a single ``bulk_record`` call in
+    this process, and the transformed batch is returned in offset order.
+    """
+
+    def __init__(self, processes: int, input_block_size: int, output_block_size: int) -> None:
+        self.__workers = [
+            _TransformWorker(input_block_size, output_block_size) for _ in range(processes)
+        ]
+
+    def __call__(self, outer_message: Message[MessageBatch]) -> MessageBatch:
+        indexer = get_indexer()
+        metrics = get_metrics()
+
+        messages = outer_message.payload
+        shard_size = -(-len(messages) // len(self.__workers))
+        shards = [
+            (worker, messages[i * shard_size : (i + 1) * shard_size])
+            for i, worker in enumerate(self.__workers)
+        ]
+        shards = [(worker, shard) for worker, shard in shards if shard]
+
+        org_strings: MutableMapping[int, Set[str]] = defaultdict(set)
+        skipped_offsets: Set[int] = set()
+        shard_orgs = []
+        with metrics.timer("process_messages.parse_outer_message"):
+            for worker, shard in shards:
+                refs = _write_payloads(
+                    worker.input_block, ((msg.offset, msg.payload.value) for msg in shard)
+                )
+                worker.conn.send(("parse", refs))
+
+            for worker, _ in shards:
+                worker_org_strings, worker_skipped_offsets = worker.conn.recv()
+                for org_id, strings in worker_org_strings.items():
+                    org_strings[org_id].update(strings)
+                skipped_offsets.update(worker_skipped_offsets)
+                shard_orgs.append(worker_org_strings)
+
+        strings = set().union(*org_strings.values())
+        metrics.incr("process_messages.total_strings_indexer_lookup", amount=len(strings))
+
+        with metrics.timer("metrics_consumer.bulk_record"):
+            record_result = indexer.bulk_record(org_strings)
+
+        mapping = record_result.get_mapped_results()
+        string_meta = _get_string_meta(record_result.get_fetch_metadata())
+
+        for offset in skipped_offsets:
+            logger.info("process_message.offset_skipped", extra={"offset": offset})
+
+        new_messages: List[Message[KafkaPayload]] = []
+
+        with metrics.timer("process_messages.reconstruct_messages"):
+            for (worker, _), worker_org_strings in zip(shards, shard_orgs):
+                # Only send the part of the batch's mapping the shard needs.
+                worker_mapping = {
+                    org_id: mapping[org_id] for org_id in worker_org_strings if org_id in mapping
+                }
+                worker_string_meta = {
+                    string: string_meta[string]
+                    for strings in worker_org_strings.values()
+                    for string in strings
+                    if string in string_meta
+                }
+                worker.conn.send(("rewrite", (worker_mapping, worker_string_meta)))
+
+            for worker, shard in shards:
+                messages_by_offset = {message.offset: message for message in shard}
+                for offset, ref, mapping_sources in worker.conn.recv():
+                    new_messages.append(
+                        _make_message(
+                            messages_by_offset[offset],
+                            _read_payload(worker.output_block, ref),
+                            mapping_sources,
+                        )
+                    )
+
+        metrics.incr("metrics_consumer.process_message.messages_seen", amount=len(new_messages))
+
+        return new_messages
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        workers, self.__workers = self.__workers, []
+        for worker in workers:
+            worker.close(timeout)
+
+
 class MetricsConsumerStrategyFactory(ProcessingStrategyFactory):  # type: ignore
     def __init__(
         self,
@@ -558,12 +810,19 @@ class BatchConsumerStrategyFactory(ProcessingStrategyFactory):  # type: ignore
         max_batch_time: float,
         commit_max_batch_size: int,
         commit_max_batch_time: int,
+        processes: int = 1,
+        input_block_size: int = DEFAULT_BLOCK_SIZE,
+        output_block_size: int = DEFAULT_BLOCK_SIZE,
     ):
         self.__max_batch_time = max_batch_time
         self.__max_batch_size = max_batch_size
         self.__commit_max_batch_time = commit_max_batch_time
         self.__commit_max_batch_size = commit_max_batch_size
 
+        self.__processes = processes
+        self.__input_block_size = input_block_size
+        self.__output_block_size = output_block_size
+
     def create(
         self, commit: Callable[[Mapping[Partition, Position]], None]
     ) -> ProcessingStrategy[KafkaPayload]:
@@ -573,7 +832,10 @@ class BatchConsumerStrategyFactory(ProcessingStrategyFactory):  # type: ignore
                 commit_max_batch_size=self.__commit_max_batch_size,
                 # convert to seconds
                 commit_max_batch_time=self.__commit_max_batch_time / 1000,
-            )
+            ),
+            processes=self.__processes,
+            input_block_size=self.__input_block_size,
+            output_block_size=self.__output_block_size,
         )
         strategy = BatchMessages(transform_step, self.__max_batch_time, self.__max_batch_size)
         return strategy
@@ -587,8 +849,21 @@ class TransformStep(ProcessingStep[MessageBatch]):  # type: ignore
     def __init__(
         self,
         next_step: ProcessingStep[KafkaPayload],
+        processes: int = 1,
+        input_block_size: int = DEFAULT_BLOCK_SIZE,
+        output_block_size: int = DEFAULT_BLOCK_SIZE,
     ) -> None:
-        self.__process_messages = process_messages
+        # Batches are transformed in this process unless several processes
+        # are configured.
+        self.__parallel: Optional[ParallelProcessMessages] = None
+        self.__process_messages: Callable[[Message[MessageBatch]], MessageBatch]
+        if processes > 1:
+            self.__parallel = ParallelProcessMessages(
+                processes, input_block_size, output_block_size
+            )
+            self.__process_messages = self.__parallel
+        else:
+            self.__process_messages = process_messages
         self.__next_step = next_step
         self.__closed = False
         self.__metrics = get_metrics()
@@ -611,10 +886,16 @@ class TransformStep(ProcessingStep[MessageBatch]):  # type: ignore
     def terminate(self) -> None:
         self.__closed = True
 
+        if self.__parallel is not None:
+            self.__parallel.close(timeout=0)
+
         logger.debug("Terminating %r...", self.__next_step)
         self.__next_step.terminate()
 
     def join(self, timeout: Optional[float] = None) -> None:
+        if self.__parallel is not None:
+            self.__parallel.close(timeout)
+
         self.__next_step.close()
         self.__next_step.join(timeout)
 
@@ -781,6 +1062,9 @@ def get_streaming_metrics_consumer(
             max_batch_time=max_batch_time,
             commit_max_batch_size=commit_max_batch_size,
             commit_max_batch_time=commit_max_batch_time,
+            processes=processes,
+            input_block_size=input_block_size,
+            output_block_size=output_block_size,
         )
 
     create_topics([topic])
@@ -52,6 +52,8 @@ class BetterSignal(Signal):
 buffer_incr_complete = BetterSignal(providing_args=["model", "columns", "extra", "result"])
 pending_delete = BetterSignal(providing_args=["instance", "actor"])
 event_processed = BetterSignal(providing_args=["project", "event"])
+# Sent when global, organization or project options are changed
+option_changed = BetterSignal(providing_args=["update_reason"])
 
 # This signal should eventually be removed as we should not send
 # transactions through post processing
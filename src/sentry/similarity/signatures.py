@@ -1,17 +1,45 @@
-import mmh3
+import functools
 
-from sentry.utils.compat import map
+import mmh3
 
 
 class MinHashSignatureBuilder:
-    def __init__(self, columns, rows):
+    """
+    Builds MinHash signatures of ``columns`` values in ``[0, rows)``, where
+    the value of a column is the minimum of ``mmh3.hash(feature, column) %
+    rows`` over all features.
+
+    The per-column hashes of a feature only depend on the feature itself, so
+    they are computed once per feature and kept in a bounded cache. Features
+    such as message shingles and stack trace frames repeat heavily across
+    events, which saves most of the hashing.
+    """
+
+    def __init__(self, columns, rows, cache_size=8192):
         self.columns = columns
         self.rows = rows
+        self.__get_feature_hashes = functools.lru_cache(maxsize=cache_size)(self.__hash_feature)
+
+    def __hash_feature(self, feature):
+        rows = self.rows
+        return tuple(mmh3.hash(feature, column) % rows for column in range(self.columns))
 
     def __call__(self, features):
-        return map(
-            lambda column: min(
-                map(lambda feature: mmh3.hash(feature, column) % self.rows, features)
-            ),
-            range(self.columns),
-        )
+        get_feature_hashes = self.__get_feature_hashes
+        return list(map(min, zip(*map(get_feature_hashes, features))))
+
+    def build_many(self, feature_lists):
+        """
+        Returns the signatures of many feature collections at once, hashing
+        every distinct feature only once across all of them.
+        """
+        get_feature_hashes = self.__get_feature_hashes
+        hashes = {}
+        for features in feature_lists:
+            for feature in features:
+                if feature not in hashes:
+                    hashes[feature] = get_feature_hashes(feature)
+
+        return [
+            list(map(min, zip(*map(hashes.__getitem__, features)))) for features in feature_lists
+        ]
@@ -32,6 +32,7 @@ from sentry.utils.math import nice_int
 from sentry.utils.snuba import (
     Dataset,
     SnubaTSResult,
+    StreamingResult,
     bulk_snql_query,
     get_array_column_alias,
     get_array_column_field,
@@ -155,9 +156,6 @@ def transform_data(result, translated_columns, snuba_filter):
     When getting timeseries results via rollup, this function will
     zerofill the output results.
     """
-    for col in result["meta"]:
-        # Translate back column names that were converted to snuba format
-        col["name"] = translated_columns.get(col["name"], col["name"])
 
     def get_row(row):
         transformed = {}
@@ -173,7 +171,18 @@ def transform_data(result, translated_columns, snuba_filter):
 
         return transformed
 
-    result["data"] = [get_row(row) for row in result["data"]]
+    if isinstance(result, StreamingResult):
+        # Rows are transformed as they are decoded, so the untransformed rows
+        # are never all held in memory.
+        data = [get_row(row) for row in result]
+        result = result.materialize(data=False)
+    else:
+        data = [get_row(row) for row in result["data"]]
+    result["data"] = data
+
+    for col in result["meta"]:
+        # Translate back column names that were converted to snuba format
+        col["name"] = translated_columns.get(col["name"], col["name"])
 
     if snuba_filter and snuba_filter.rollup and snuba_filter.rollup > 0:
         rollup = snuba_filter.rollup
@@ -205,6 +214,7 @@ def query(
     conditions=None,
     functions_acl=None,
     transform_alias_to_input_format=False,
+    stream=False,
 ):
     """
     High-level API for doing arbitrary user queries against events.
@@ -235,6 +245,8 @@ def query(
                     any additional processing.
     transform_alias_to_input_format (bool) Whether aggregate columns should be returned in the originally
                                 requested function format.
+    stream (bool) Whether rows should be transformed as they are decoded from the response, instead of
+                    decoding all of them first. Lowers peak memory for large results.
     """
     if not selected_columns:
         raise InvalidSearchQuery("No columns selected")
@@ -256,11 +268,10 @@ def query(
     )
     if conditions is not None:
         builder.add_conditions(conditions)
-    result = builder.run_query(referrer)
+    result = builder.run_query(referrer, stream=stream)
     with sentry_sdk.start_span(
         op="discover.discover", description="query.transform_results"
     ) as span:
-        span.set_data("result_count", len(result.get("data", [])))
         translated_columns = {}
         function_alias_map = builder.function_alias_map
         if transform_alias_to_input_format:
@@ -280,6 +291,7 @@ def query(
             translated_columns,
             None,
         )
+        span.set_data("result_count", len(result["data"]))
     return result
 
 
@@ -7,12 +7,15 @@ from django.utils import timezone
 
 from sentry.models import Project, Release
 from sentry.stacktraces.functions import set_in_app, trim_function_name
+from sentry.utils import metrics
 from sentry.utils.cache import cache
 from sentry.utils.hashlib import hash_values
 from sentry.utils.safe import get_path, safe_execute
 
 logger = logging.getLogger(__name__)
 
+FRAME_CACHE_TIMEOUT = 3600
+
 StacktraceInfo = namedtuple(
     "StacktraceInfo", ["stacktrace", "container", "platforms", "is_exception"]
 )
@@ -30,6 +33,7 @@ class ProcessableFrame:
         self.data = None
         self.cache_key = None
         self.cache_value = None
+        self.cache_writes = None
         self.processable_frames = processable_frames
 
     def __repr__(self):
@@ -64,7 +68,11 @@ class ProcessableFrame:
 
     def set_cache_value(self, value):
         if self.cache_key is not None:
-            cache.set(self.cache_key, value, 3600)
+            if self.cache_writes is not None:
+                # Written in bulk by `StacktraceProcessingTask.flush_frame_cache`.
+                self.cache_writes[self.cache_key] = value
+            else:
+                store_frame_cache({self.cache_key: value})
             return True
         return False
 
@@ -79,9 +87,16 @@ class ProcessableFrame:
 
 
 class StacktraceProcessingTask:
-    def __init__(self, processable_stacktraces, processors):
+    def __init__(self, processable_stacktraces, processors, frame_cache_writes=None):
         self.processable_stacktraces = processable_stacktraces
         self.processors = processors
+        self.frame_cache_writes = frame_cache_writes if frame_cache_writes is not None else {}
+
+    def flush_frame_cache(self):
+        """Writes all values set on processable frames to the frame cache."""
+        if self.frame_cache_writes:
+            store_frame_cache(self.frame_cache_writes)
+            self.frame_cache_writes.clear()
 
     def close(self):
         for frame in self.iter_processable_frames():
@@ -441,12 +456,29 @@ def get_crash_frame_from_event_data(data, frame_filter=None):
 
 
 def lookup_frame_cache(keys):
-    rv = {}
-    for key in keys:
-        rv[key] = cache.get(key)
+    """Looks up the cached values of processable frames in bulk."""
+    keys = list(keys)
+    if not keys:
+        return {}
+
+    rv = dict.fromkeys(keys)
+    with metrics.timer("stacktraces.frame_cache.lookup"):
+        rv.update((key, value) for key, value in cache.get_many(keys).items() if value is not None)
+
+    metrics.timing("stacktraces.frame_cache.keys", len(keys))
+    metrics.timing(
+        "stacktraces.frame_cache.hit_ratio",
+        sum(value is not None for value in rv.values()) / len(keys),
+    )
     return rv
 
 
+def store_frame_cache(values):
+    """Writes the values of processable frames to the frame cache in bulk."""
+    if values:
+        cache.set_many(values, FRAME_CACHE_TIMEOUT)
+
+
 def get_stacktrace_processing_task(infos, processors):
     """Returns a list of all tasks for the processors.  This can skip over
     processors that seem to not handle any frames.
@@ -458,10 +490,12 @@ def get_stacktrace_processing_task(infos, processors):
     # StacktraceProcessingTask.iter_processable_stacktraces. This is important
     # to guarantee reproducible symbolicator requests.
     by_stacktrace_info = OrderedDict()
+    frame_cache_writes = {}
 
     for info in infos:
         processable_frames = get_processable_frames(info, processors)
         for processable_frame in processable_frames:
+            processable_frame.cache_writes = frame_cache_writes
             processable_frame.processor.preprocess_frame(processable_frame)
             by_processor.setdefault(processable_frame.processor, []).append(processable_frame)
             by_stacktrace_info.setdefault(processable_frame.stacktrace_info, []).append(
@@ -475,7 +509,9 @@ def get_stacktrace_processing_task(infos, processors):
         processable_frame.cache_value = frame_cache.get(cache_key)
 
     return StacktraceProcessingTask(
-        processable_stacktraces=by_stacktrace_info, processors=by_processor
+        processable_stacktraces=by_stacktrace_info,
+        processors=by_processor,
+        frame_cache_writes=frame_cache_writes,
     )
 
 
@@ -563,6 +599,10 @@ def process_stacktraces(data, make_processors=None, set_raw_stacktrace=True):
         data.setdefault("_metrics", {})["flag.processing.error"] = True
         changed = True
     finally:
+        try:
+            processing_task.flush_frame_cache()
+        except Exception:
+            logger.exception("stacktraces.processing.frame_cache_error")
         for processor in processors:
             processor.close()
         processing_task.close()
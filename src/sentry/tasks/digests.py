@@ -1,12 +1,14 @@
 import logging
 import time
 
+from sentry import options
 from sentry.digests import get_option_key
 from sentry.digests.backends.base import InvalidState
 from sentry.digests.notifications import build_digest, split_key
 from sentry.models import Project, ProjectOption
 from sentry.tasks.base import instrumented_task
 from sentry.utils import snuba
+from sentry.utils.iterators import chunked
 
 logger = logging.getLogger(__name__)
 
@@ -28,14 +30,18 @@ def schedule_digests():
     timeout = 300
     digests.maintenance(deadline - timeout)
 
-    for entry in digests.schedule(deadline):
-        deliver_digest.delay(entry.key, entry.timestamp)
+    batch_size = options.get("digests.delivery-batch-size")
+    if batch_size > 0:
+        for entries in chunked(digests.schedule(deadline) or (), batch_size):
+            deliver_digests.delay([entry.key for entry in entries])
+    else:
+        for entry in digests.schedule(deadline):
+            deliver_digest.delay(entry.key, entry.timestamp)
 
 
 @instrumented_task(name="sentry.tasks.digests.deliver_digest", queue="digests.delivery")
 def deliver_digest(key, schedule_timestamp=None):
     from sentry import digests
-    from sentry.mail import mail_adapter
 
     try:
         project, target_type, target_identifier = split_key(key)
@@ -56,15 +62,59 @@ def deliver_digest(key, schedule_timestamp=None):
             logger.info(f"Skipped digest delivery: {error}", exc_info=True)
             return
 
-        if digest:
-            mail_adapter.notify_digest(project, digest, target_type, target_identifier)
-        else:
-            logger.info(
-                "Skipped digest delivery due to empty digest",
-                extra={
-                    "project": project.id,
-                    "target_type": target_type.value,
-                    "target_identifier": target_identifier,
-                    "build_digest_logs": logs,
-                },
-            )
+        _send_digest(project, digest, logs, target_type, target_identifier)
+
+
+@instrumented_task(name="sentry.tasks.digests.deliver_digests", queue="digests.delivery")
+def deliver_digests(keys):
+    """
+    Delivers the digests of many timelines, claiming and reading them in bulk.
+    """
+    from sentry import digests
+
+    targets = {}
+    for key in keys:
+        try:
+            targets[key] = split_key(key)
+        except Project.DoesNotExist as error:
+            logger.info(f"Cannot deliver digest {key} due to error: {error}")
+            digests.delete(key)
+
+    minimum_delays = {
+        key: ProjectOption.objects.get_value(project, get_option_key("mail", "minimum_delay"))
+        for key, (project, _, _) in targets.items()
+    }
+
+    with snuba.options_override({"consistent": True}):
+        built = []
+        with digests.digest_many(list(targets), minimum_delay=minimum_delays) as timelines:
+            for key, records in timelines:
+                project = targets[key][0]
+                built.append((key, *build_digest(project, records)))
+
+        for key, digest, logs in built:
+            if key not in timelines.closed:
+                # The claim expired before the digest could be closed, so it
+                # is left to be delivered again by whoever digests it next.
+                logger.info(f"Skipped digest delivery of {key}: digest was not closed")
+                continue
+
+            project, target_type, target_identifier = targets[key]
+            _send_digest(project, digest, logs, target_type, target_identifier)
+
+
+def _send_digest(project, digest, logs, target_type, target_identifier):
+    from sentry.mail import mail_adapter
+
+    if digest:
+        mail_adapter.notify_digest(project, digest, target_type, target_identifier)
+    else:
+        logger.info(
+            "Skipped digest delivery due to empty digest",
+            extra={
+                "project": project.id,
+                "target_type": target_type.value,
+                "target_identifier": target_identifier,
+                "build_digest_logs": logs,
+            },
+        )
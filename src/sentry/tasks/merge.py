@@ -3,7 +3,7 @@ import logging
 from django.db import DataError, IntegrityError, router, transaction
 from django.db.models import F
 
-from sentry import eventstream, similarity
+from sentry import eventfrequency, eventstream, similarity
 from sentry.app import tsdb
 from sentry.tasks.base import instrumented_task, track_group_async_operation
 
@@ -150,6 +150,8 @@ def merge_groups(
                     else None,
                 )
 
+            eventfrequency.invalidate([new_group.id, group.id])
+
             previous_group_id = group.id
 
             with transaction.atomic():
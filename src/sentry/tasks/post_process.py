@@ -1,6 +1,8 @@
 import logging
+import time
 
 import sentry_sdk
+from celery.exceptions import SoftTimeLimitExceeded
 
 from sentry import analytics, features
 from sentry.app import locks
@@ -16,6 +18,10 @@ from sentry.utils.sdk import bind_organization_context, set_current_event_projec
 
 logger = logging.getLogger("sentry")
 
+# Seconds after which ``post_process_group_batch`` hands the remaining events
+# of its batch to a new task, well before its soft time limit.
+POST_PROCESS_GROUP_BATCH_TIME_BUDGET = 240
+
 
 def _get_service_hooks(project_id):
     from sentry.models import ServiceHook
@@ -225,6 +231,29 @@ def fetch_buffered_group_stats(group):
     group.times_seen_pending = result["times_seen"]
 
 
+class GroupPostProcessState:
+    """
+    The project and group of the events being post processed, loaded once and
+    shared when several events of a group are post processed together.
+    """
+
+    def __init__(self, batched=False):
+        from sentry.rules.processor import GroupRuleState
+
+        self.project = None
+        self.group = None
+        self.snoozes_processed = False
+        # Rule statuses and frequency counts are only worth sharing in batches.
+        self.rule_state = GroupRuleState() if batched else None
+
+    def process_snoozes(self):
+        # Only the first event can take the group out of its snooze.
+        if self.snoozes_processed:
+            return False
+        self.snoozes_processed = True
+        return process_snoozes(self.group)
+
+
 @instrumented_task(
     name="sentry.tasks.post_process.post_process_group",
     time_limit=120,
@@ -236,217 +265,291 @@ def post_process_group(
     """
     Fires post processing hooks for a group.
     """
-    from sentry.eventstore.models import Event
-    from sentry.eventstore.processing import event_processing_store
-    from sentry.reprocessing2 import is_reprocessed_event
     from sentry.utils import snuba
 
-    with snuba.options_override({"consistent": True}):
-        # We use the data being present/missing in the processing store
-        # to ensure that we don't duplicate work should the forwarding consumers
-        # need to rewind history.
-        data = event_processing_store.get(cache_key)
-        if not data:
-            logger.info(
-                "post_process.skipped",
-                extra={"cache_key": cache_key, "reason": "missing_cache"},
-            )
-            return
-        event = Event(
-            project_id=data["project"], event_id=data["event_id"], group_id=group_id, data=data
+    with snuba.options_override({"consistent": True}), features.local_cache():
+        _post_process_event(
+            is_new,
+            is_regression,
+            is_new_group_environment,
+            cache_key,
+            group_id,
+            GroupPostProcessState(),
+            **kwargs,
         )
 
-        set_current_event_project(event.project_id)
 
-        is_transaction_event = not bool(event.group_id)
+@instrumented_task(
+    name="sentry.tasks.post_process.post_process_group_batch",
+    time_limit=300,
+    soft_time_limit=290,
+)
+def post_process_group_batch(group_id, events, **kwargs):
+    """
+    Fires post processing hooks for several events of a group, in order.
 
-        from sentry.models import EventDict, Organization, Project
+    `events` are the keyword arguments of ``post_process_group`` for every
+    event. The project, group and its buffered stats are loaded once, snoozes
+    are processed once and rules are evaluated with shared statuses and
+    frequency counts. Hooks such as service hooks and plugins still run for
+    every event.
+    """
+    from sentry.utils import snuba
 
-        # Re-bind node data to avoid renormalization. We only want to
-        # renormalize when loading old data from the database.
-        event.data = EventDict(event.data, skip_renormalization=True)
+    metrics.timing("tasks.post_process.post_process_group_batch.size", len(events))
 
-        with metrics.timer("tasks.post_process.delete_event_cache"):
-            event_processing_store.delete_by_key(cache_key)
+    start = time.monotonic()
+    with snuba.options_override({"consistent": True}), features.local_cache():
+        state = GroupPostProcessState(batched=True)
+        for i, event_kwargs in enumerate(events):
+            if i and time.monotonic() - start > POST_PROCESS_GROUP_BATCH_TIME_BUDGET:
+                _requeue_post_process_group_batch(group_id, events[i:])
+                return
 
-        # Re-bind Project and Org since we're reading the Event object
-        # from cache which may contain stale parent models.
-        event.project = Project.objects.get_from_cache(id=event.project_id)
-        event.project.set_cached_field_value(
-            "organization", Organization.objects.get_from_cache(id=event.project.organization_id)
-        )
+            try:
+                _post_process_event(group_id=group_id, state=state, **event_kwargs)
+            except SoftTimeLimitExceeded:
+                # The interrupted event is requeued as well, events that were
+                # fully post processed are skipped as their data is gone.
+                _requeue_post_process_group_batch(group_id, events[i:])
+                raise
+            except Exception:
+                logger.exception(
+                    "post_process.batch.failed", extra={"cache_key": event_kwargs.get("cache_key")}
+                )
 
-        # Simplified post processing for transaction events.
-        # This should eventually be completely removed and transactions
-        # will not go through any post processing.
-        if is_transaction_event:
-            transaction_processed.send_robust(
-                sender=post_process_group,
-                project=event.project,
-                event=event,
-            )
 
-            return
+def _requeue_post_process_group_batch(group_id, events):
+    metrics.incr("tasks.post_process.post_process_group_batch.requeued", amount=len(events))
+    if len(events) == 1:
+        post_process_group.delay(group_id=group_id, **events[0])
+    else:
+        post_process_group_batch.delay(group_id=group_id, events=events)
 
-        is_reprocessed = is_reprocessed_event(event.data)
-        sentry_sdk.set_tag("is_reprocessed", is_reprocessed)
 
-        # NOTE: we must pass through the full Event object, and not an
-        # event_id since the Event object may not actually have been stored
-        # in the database due to sampling.
-        from sentry.models import Commit, GroupInboxReason
-        from sentry.models.group import get_group_with_redirect
-        from sentry.models.groupinbox import add_group_to_inbox
-        from sentry.rules.processor import RuleProcessor
-        from sentry.tasks.groupowner import process_suspect_commits
-        from sentry.tasks.servicehooks import process_service_hook
+def _post_process_event(
+    is_new, is_regression, is_new_group_environment, cache_key, group_id, state, **kwargs
+):
+    from sentry.eventstore.models import Event
+    from sentry.eventstore.processing import event_processing_store
+    from sentry.reprocessing2 import is_reprocessed_event
 
-        # Re-bind Group since we're reading the Event object
-        # from cache, which may contain a stale group and project
-        event.group, _ = get_group_with_redirect(event.group_id)
-        event.group_id = event.group.id
-        # We fetch buffered updates to group aggregates here and populate them on the Group. This
-        # helps us avoid problems with processing group ignores and alert rules that rely on these
-        # stats.
-        fetch_buffered_group_stats(event.group)
+    # We use the data being present/missing in the processing store
+    # to ensure that we don't duplicate work should the forwarding consumers
+    # need to rewind history.
+    data = event_processing_store.get(cache_key)
+    if not data:
+        logger.info(
+            "post_process.skipped",
+            extra={"cache_key": cache_key, "reason": "missing_cache"},
+        )
+        return
+    event = Event(
+        project_id=data["project"], event_id=data["event_id"], group_id=group_id, data=data
+    )
 
-        event.group.project = event.project
-        event.group.project.set_cached_field_value("organization", event.project.organization)
+    set_current_event_project(event.project_id)
 
-        bind_organization_context(event.project.organization)
+    is_transaction_event = not bool(event.group_id)
 
-        _capture_stats(event, is_new)
+    from sentry.models import EventDict, Organization, Project
 
-        with sentry_sdk.start_span(op="tasks.post_process_group.add_group_to_inbox"):
-            try:
-                if is_reprocessed and is_new:
-                    add_group_to_inbox(event.group, GroupInboxReason.REPROCESSED)
-            except Exception:
-                logger.exception("Failed to add group to inbox for reprocessed groups")
+    # Re-bind node data to avoid renormalization. We only want to
+    # renormalize when loading old data from the database.
+    event.data = EventDict(event.data, skip_renormalization=True)
 
-        if not is_reprocessed:
-            # we process snoozes before rules as it might create a regression
-            # but not if it's new because you can't immediately snooze a new group
-            has_reappeared = not is_new
-            try:
-                if has_reappeared:
-                    has_reappeared = process_snoozes(event.group)
-            except Exception:
-                logger.exception("Failed to process snoozes for group")
+    with metrics.timer("tasks.post_process.delete_event_cache"):
+        event_processing_store.delete_by_key(cache_key)
 
-            try:
-                if not has_reappeared:  # If true, we added the .UNIGNORED reason already
-                    if is_new:
-                        add_group_to_inbox(event.group, GroupInboxReason.NEW)
-                    elif is_regression:
-                        add_group_to_inbox(event.group, GroupInboxReason.REGRESSION)
-            except Exception:
-                logger.exception("Failed to add group to inbox for non-reprocessed groups")
+    # Re-bind Project and Org since we're reading the Event object
+    # from cache which may contain stale parent models.
+    if state.project is None or state.project.id != event.project_id:
+        state.project = Project.objects.get_from_cache(id=event.project_id)
+        state.project.set_cached_field_value(
+            "organization",
+            Organization.objects.get_from_cache(id=state.project.organization_id),
+        )
+    event.project = state.project
+
+    # Simplified post processing for transaction events.
+    # This should eventually be completely removed and transactions
+    # will not go through any post processing.
+    if is_transaction_event:
+        transaction_processed.send_robust(
+            sender=post_process_group,
+            project=event.project,
+            event=event,
+        )
 
-            with sentry_sdk.start_span(op="tasks.post_process_group.handle_owner_assignment"):
-                try:
-                    handle_owner_assignment(event.project, event.group, event)
-                except Exception:
-                    logger.exception("Failed to handle owner assignments")
+        return
 
-            rp = RuleProcessor(
-                event, is_new, is_regression, is_new_group_environment, has_reappeared
-            )
-            has_alert = False
-            with sentry_sdk.start_span(op="tasks.post_process_group.rule_processor_callbacks"):
-                # TODO(dcramer): ideally this would fanout, but serializing giant
-                # objects back and forth isn't super efficient
-                for callback, futures in rp.apply():
-                    has_alert = True
-                    safe_execute(callback, event, futures, _with_transaction=False)
+    is_reprocessed = is_reprocessed_event(event.data)
+    sentry_sdk.set_tag("is_reprocessed", is_reprocessed)
+
+    # NOTE: we must pass through the full Event object, and not an
+    # event_id since the Event object may not actually have been stored
+    # in the database due to sampling.
+    from sentry.models import Commit, GroupInboxReason
+    from sentry.models.group import get_group_with_redirect
+    from sentry.models.groupinbox import add_group_to_inbox
+    from sentry.rules.processor import RuleProcessor
+    from sentry.tasks.groupowner import process_suspect_commits
+    from sentry.tasks.servicehooks import process_service_hook
+
+    # Re-bind Group since we're reading the Event object
+    # from cache, which may contain a stale group and project
+    if state.group is None:
+        state.group, _ = get_group_with_redirect(event.group_id)
+        # We fetch buffered updates to group aggregates here and populate them on the Group.
+        # This helps us avoid problems with processing group ignores and alert rules that rely
+        # on these stats.
+        fetch_buffered_group_stats(state.group)
+
+        state.group.project = event.project
+        state.group.project.set_cached_field_value("organization", event.project.organization)
+    event.group = state.group
+    event.group_id = event.group.id
+
+    bind_organization_context(event.project.organization)
+
+    _capture_stats(event, is_new)
+
+    with sentry_sdk.start_span(op="tasks.post_process_group.add_group_to_inbox"):
+        try:
+            if is_reprocessed and is_new:
+                add_group_to_inbox(event.group, GroupInboxReason.REPROCESSED)
+        except Exception:
+            logger.exception("Failed to add group to inbox for reprocessed groups")
+
+    if not is_reprocessed:
+        # we process snoozes before rules as it might create a regression
+        # but not if it's new because you can't immediately snooze a new group
+        has_reappeared = not is_new
+        try:
+            if has_reappeared:
+                has_reappeared = state.process_snoozes()
+        except Exception:
+            logger.exception("Failed to process snoozes for group")
 
+        try:
+            if not has_reappeared:  # If true, we added the .UNIGNORED reason already
+                if is_new:
+                    add_group_to_inbox(event.group, GroupInboxReason.NEW)
+                elif is_regression:
+                    add_group_to_inbox(event.group, GroupInboxReason.REGRESSION)
+        except Exception:
+            logger.exception("Failed to add group to inbox for non-reprocessed groups")
+
+        with sentry_sdk.start_span(op="tasks.post_process_group.handle_owner_assignment"):
             try:
-                lock = locks.get(
-                    f"w-o:{event.group_id}-d-l",
-                    duration=10,
-                )
-                with lock.acquire():
-                    has_commit_key = f"w-o:{event.project.organization_id}-h-c"
-                    org_has_commit = cache.get(has_commit_key)
-                    if org_has_commit is None:
-                        org_has_commit = Commit.objects.filter(
-                            organization_id=event.project.organization_id
-                        ).exists()
-                        cache.set(has_commit_key, org_has_commit, 3600)
-
-                    if org_has_commit:
-                        group_cache_key = f"w-o-i:g-{event.group_id}"
-                        if cache.get(group_cache_key):
-                            metrics.incr(
-                                "sentry.tasks.process_suspect_commits.debounce",
-                                tags={"detail": "w-o-i:g debounce"},
-                            )
-                        else:
-                            from sentry.utils.committers import get_frame_paths
-
-                            cache.set(group_cache_key, True, 604800)  # 1 week in seconds
-                            event_frames = get_frame_paths(event.data)
-                            process_suspect_commits.delay(
-                                event_id=event.event_id,
-                                event_platform=event.platform,
-                                event_frames=event_frames,
-                                group_id=event.group_id,
-                                project_id=event.project_id,
-                            )
-            except UnableToAcquireLock:
-                pass
+                handle_owner_assignment(event.project, event.group, event)
             except Exception:
-                logger.exception("Failed to process suspect commits")
-
-            if features.has("projects:servicehooks", project=event.project):
-                allowed_events = {"event.created"}
-                if has_alert:
-                    allowed_events.add("event.alert")
-
-                if allowed_events:
-                    for servicehook_id, events in _get_service_hooks(project_id=event.project_id):
-                        if any(e in allowed_events for e in events):
-                            process_service_hook.delay(servicehook_id=servicehook_id, event=event)
-
-            from sentry.tasks.sentry_apps import process_resource_change_bound
+                logger.exception("Failed to handle owner assignments")
+
+        rule_processor_kwargs = {}
+        if state.rule_state is not None:
+            rule_processor_kwargs["group_state"] = state.rule_state
+        rp = RuleProcessor(
+            event,
+            is_new,
+            is_regression,
+            is_new_group_environment,
+            has_reappeared,
+            **rule_processor_kwargs,
+        )
+        has_alert = False
+        with sentry_sdk.start_span(op="tasks.post_process_group.rule_processor_callbacks"):
+            # TODO(dcramer): ideally this would fanout, but serializing giant
+            # objects back and forth isn't super efficient
+            for callback, futures in rp.apply():
+                has_alert = True
+                safe_execute(callback, event, futures, _with_transaction=False)
 
-            if event.get_event_type() == "error" and _should_send_error_created_hooks(
-                event.project
-            ):
-                process_resource_change_bound.delay(
-                    action="created", sender="Error", instance_id=event.event_id, instance=event
-                )
-            if is_new:
-                process_resource_change_bound.delay(
-                    action="created", sender="Group", instance_id=event.group_id
-                )
+        try:
+            lock = locks.get(
+                f"w-o:{event.group_id}-d-l",
+                duration=10,
+            )
+            with lock.acquire():
+                has_commit_key = f"w-o:{event.project.organization_id}-h-c"
+                org_has_commit = cache.get(has_commit_key)
+                if org_has_commit is None:
+                    org_has_commit = Commit.objects.filter(
+                        organization_id=event.project.organization_id
+                    ).exists()
+                    cache.set(has_commit_key, org_has_commit, 3600)
+
+                if org_has_commit:
+                    group_cache_key = f"w-o-i:g-{event.group_id}"
+                    if cache.get(group_cache_key):
+                        metrics.incr(
+                            "sentry.tasks.process_suspect_commits.debounce",
+                            tags={"detail": "w-o-i:g debounce"},
+                        )
+                    else:
+                        from sentry.utils.committers import get_frame_paths
+
+                        cache.set(group_cache_key, True, 604800)  # 1 week in seconds
+                        event_frames = get_frame_paths(event.data)
+                        process_suspect_commits.delay(
+                            event_id=event.event_id,
+                            event_platform=event.platform,
+                            event_frames=event_frames,
+                            group_id=event.group_id,
+                            project_id=event.project_id,
+                        )
+        except UnableToAcquireLock:
+            pass
+        except Exception:
+            logger.exception("Failed to process suspect commits")
+
+        if features.has("projects:servicehooks", project=event.project):
+            allowed_events = {"event.created"}
+            if has_alert:
+                allowed_events.add("event.alert")
+
+            if allowed_events:
+                for servicehook_id, events in _get_service_hooks(project_id=event.project_id):
+                    if any(e in allowed_events for e in events):
+                        process_service_hook.delay(servicehook_id=servicehook_id, event=event)
+
+        from sentry.tasks.sentry_apps import process_resource_change_bound
+
+        if event.get_event_type() == "error" and _should_send_error_created_hooks(event.project):
+            process_resource_change_bound.delay(
+                action="created", sender="Error", instance_id=event.event_id, instance=event
+            )
+        if is_new:
+            process_resource_change_bound.delay(
+                action="created", sender="Group", instance_id=event.group_id
+            )
 
-            from sentry.plugins.base import plugins
+        from sentry.plugins.base import plugins
 
-            for plugin in plugins.for_project(event.project):
-                plugin_post_process_group(
-                    plugin_slug=plugin.slug, event=event, is_new=is_new, is_regresion=is_regression
-                )
+        for plugin in plugins.for_project(event.project):
+            plugin_post_process_group(
+                plugin_slug=plugin.slug, event=event, is_new=is_new, is_regresion=is_regression
+            )
 
-            from sentry import similarity
+        from sentry import similarity
 
-            with sentry_sdk.start_span(op="tasks.post_process_group.similarity"):
-                safe_execute(similarity.record, event.project, [event], _with_transaction=False)
+        with sentry_sdk.start_span(op="tasks.post_process_group.similarity"):
+            safe_execute(similarity.record, event.project, [event], _with_transaction=False)
 
-        # Patch attachments that were ingested on the standalone path.
-        with sentry_sdk.start_span(op="tasks.post_process_group.update_existing_attachments"):
-            try:
-                update_existing_attachments(event)
-            except Exception:
-                logger.exception("Failed to update existing attachments")
-
-        if not is_reprocessed:
-            event_processed.send_robust(
-                sender=post_process_group,
-                project=event.project,
-                event=event,
-                primary_hash=kwargs.get("primary_hash"),
-            )
+    # Patch attachments that were ingested on the standalone path.
+    with sentry_sdk.start_span(op="tasks.post_process_group.update_existing_attachments"):
+        try:
+            update_existing_attachments(event)
+        except Exception:
+            logger.exception("Failed to update existing attachments")
+
+    if not is_reprocessed:
+        event_processed.send_robust(
+            sender=post_process_group,
+            project=event.project,
+            event=event,
+            primary_hash=kwargs.get("primary_hash"),
+        )
 
 
 def process_snoozes(group):
@@ -10,6 +10,9 @@ from sentry.utils.sdk import set_current_event_project
 
 logger = logging.getLogger(__name__)
 
+#: The maximum number of project configs written to the cache at once.
+CONFIG_CACHE_WRITE_CHUNK_SIZE = 500
+
 
 @instrumented_task(name="sentry.tasks.relay.update_config_cache", queue="relay_config")
 def update_config_cache(
@@ -30,7 +33,7 @@ def update_config_cache(
 
     from sentry.models import Project, ProjectKey, ProjectKeyStatus
     from sentry.relay import projectconfig_cache
-    from sentry.relay.config import get_project_config
+    from sentry.relay.config import get_project_configs
 
     if project_id:
         set_current_event_project(project_id)
@@ -63,6 +66,7 @@ def update_config_cache(
     elif public_key:
         try:
             keys = [ProjectKey.objects.get(public_key=public_key)]
+            projects = [keys[0].project]
         except ProjectKey.DoesNotExist:
             # In this particular case, where a project key got deleted and
             # triggered an update, we at least know the public key that needs
@@ -78,17 +82,20 @@ def update_config_cache(
         assert False
 
     if generate:
+        project_configs = get_project_configs(projects, keys, full_config=True)
         config_cache = {}
         for key in keys:
             if key.status != ProjectKeyStatus.ACTIVE:
-                project_config = {"disabled": True}
+                config_cache[key.public_key] = {"disabled": True}
             else:
-                project_config = get_project_config(
-                    key.project, project_keys=[key], full_config=True
-                ).to_dict()
-            config_cache[key.public_key] = project_config
+                config_cache[key.public_key] = project_configs[key.public_key].to_dict()
+
+            if len(config_cache) >= CONFIG_CACHE_WRITE_CHUNK_SIZE:
+                projectconfig_cache.set_many(config_cache)
+                config_cache = {}
 
-        projectconfig_cache.set_many(config_cache)
+        if config_cache:
+            projectconfig_cache.set_many(config_cache)
     else:
         cache_keys_to_delete = []
         for key in keys:
@@ -4,7 +4,7 @@ import sentry_sdk
 from django.conf import settings
 from django.db import transaction
 
-from sentry import eventstore, eventstream, nodestore
+from sentry import eventfrequency, eventstore, eventstream, nodestore
 from sentry.eventstore.models import Event
 from sentry.reprocessing2 import buffered_delete_old_primary_hash
 from sentry.tasks.base import instrumented_task, retry
@@ -250,6 +250,9 @@ def finish_reprocessing(project_id, group_id):
 
     eventstream.exclude_groups(project_id, [group_id])
 
+    # Remaining events were moved to the new group without being recorded.
+    eventfrequency.invalidate([group_id, new_group_id])
+
     from sentry import similarity
 
     similarity.delete(None, group)
@@ -5,7 +5,7 @@ from typing import Any, Mapping, Optional, Tuple
 
 from django.db import transaction
 
-from sentry import eventstore, similarity
+from sentry import eventfrequency, eventstore, similarity
 from sentry.app import tsdb
 from sentry.constants import DEFAULT_LOGGER_NAME, LOG_LEVELS_MAP
 from sentry.event_manager import generate_culprit
@@ -271,6 +271,8 @@ def truncate_denormalizations(project, group):
         [group.id],
     )
 
+    eventfrequency.invalidate([group.id])
+
     similarity.delete(project, group)
 
 
@@ -426,6 +428,8 @@ def repair_tsdb_data(caches, project, events):
     for timestamp, data in frequencies.items():
         tsdb.record_frequency_multi(data.items(), timestamp)
 
+    eventfrequency.invalidate(sorted({event.group_id for event in events}))
+
 
 def repair_denormalizations(caches, project, events):
     repair_group_environment_data(caches, project, events)
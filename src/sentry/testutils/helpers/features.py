@@ -58,10 +58,10 @@ def Feature(names):
 
     def batch_features_override(_feature_names, projects=None, organization=None, *args, **kwargs):
         if projects:
-            feature_names = {name: True for name in names if name.startswith("project")}
+            feature_names = {name: names[name] for name in names if name.startswith("project")}
             return {f"project:{project.id}": feature_names for project in projects}
         elif organization:
-            feature_names = {name: True for name in names if name.startswith("organization")}
+            feature_names = {name: names[name] for name in names if name.startswith("organization")}
             return {f"organization:{organization.id}": feature_names}
 
     with patch("sentry.features.has") as features_has:
@@ -101,6 +101,7 @@ class BaseTSDB(Service):
         [
             "get_range",
             "get_sums",
+            "get_totals_multi",
             "get_distinct_counts_series",
             "get_distinct_counts_totals",
             "get_distinct_counts_union",
@@ -385,6 +386,28 @@ class BaseTSDB(Service):
         sum_set = {key: sum(p for _, p in points) for (key, points) in range_set.items()}
         return sum_set
 
+    def get_totals_multi(self, requests, use_cache=False):
+        """
+        Fetch the results of many ``get_sums`` and ``get_distinct_counts_totals``
+        calls at once. Each request is a ``(method, model, keys, start, end,
+        environment_id, jitter_value)`` tuple, where ``method`` is the name of
+        either method. Returns the results in the order of the requests.
+
+        Backends may resolve all requests with a single query.
+        """
+        return [
+            getattr(self, method)(
+                model,
+                keys,
+                start,
+                end,
+                environment_id=environment_id,
+                use_cache=use_cache,
+                jitter_value=jitter_value,
+            )
+            for method, model, keys, start, end, environment_id, jitter_value in requests
+        ]
+
     def _add_jitter_to_series(self, series, start, rollup, jitter_value):
         if jitter_value and series:
             jitter = jitter_value % rollup
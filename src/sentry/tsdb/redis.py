@@ -3,6 +3,7 @@ import logging
 import operator
 import random
 import uuid
+from array import array
 from collections import defaultdict, namedtuple
 from functools import reduce
 from hashlib import md5
@@ -23,6 +24,36 @@ SketchParameters = namedtuple("SketchParameters", "depth width capacity")
 
 CountMinScript = SentryScript(None, resource_string("sentry", "scripts/tsdb/cmsketch.lua"))
 
+RangeQuery = namedtuple("RangeQuery", "model keys start end rollup environment_ids")
+RangeQuery.__new__.__defaults__ = (None, None)
+
+
+class RangeResult:
+    """\
+    Counters returned for a single ``RangeQuery``.
+
+    ``timestamps`` is the series of bucket timestamps shared by all keys, and
+    ``values`` maps every requested key to an ``array`` of counts aligned with
+    ``timestamps``. Counters of multiple environments are summed up.
+    """
+
+    __slots__ = ("rollup", "timestamps", "values")
+
+    def __init__(self, rollup, timestamps, values):
+        self.rollup = rollup
+        self.timestamps = timestamps
+        self.values = values
+
+    def sums(self):
+        return {key: sum(counts) for key, counts in self.values.items()}
+
+    def points(self):
+        """\
+        Returns the result in the format of ``get_range``, a mapping of key
+        to a list of ``(timestamp, count)`` pairs.
+        """
+        return {key: list(zip(self.timestamps, counts)) for key, counts in self.values.items()}
+
 
 class SuppressionWrapper:
     """\
@@ -282,32 +313,98 @@ class RedisTSDB(BaseTSDB):
         # redis backend doesn't support multiple envs
         if environment_ids is not None and len(environment_ids) > 1:
             raise NotImplementedError
-        environment_id = environment_ids[0] if environment_ids else None
 
-        self.validate_arguments([model], [environment_id])
+        (result,) = self.get_range_multi(
+            [RangeQuery(model, keys, start, end, rollup, environment_ids)]
+        )
+        return result.points()
 
-        rollup, series = self.get_optimal_rollup_series(start, end, rollup)
-        series = map(to_datetime, series)
+    def get_sums(
+        self,
+        model,
+        keys,
+        start,
+        end,
+        rollup=None,
+        environment_id=None,
+        use_cache=False,
+        jitter_value=None,
+    ):
+        (result,) = self.get_range_multi(
+            [
+                RangeQuery(
+                    model,
+                    keys,
+                    start,
+                    end,
+                    rollup,
+                    [environment_id] if environment_id is not None else None,
+                )
+            ]
+        )
+        return result.sums()
 
-        results = []
-        cluster, _ = self.get_cluster(environment_id)
-        with cluster.map() as client:
-            for key in keys:
-                for timestamp in series:
-                    hash_key, hash_field = self.make_counter_key(
-                        model, rollup, timestamp, key, environment_id
-                    )
-                    results.append(
-                        (to_timestamp(timestamp), key, client.hget(hash_key, hash_field))
-                    )
+    def get_range_multi(self, queries):
+        """\
+        Fetch the counters of many ``RangeQuery`` requests at once, returning
+        a ``RangeResult`` for every query (in the same order).
+
+        Hash fields requested by multiple queries are only read once, fields
+        of the same hash are read with a single ``HMGET`` and all commands for
+        a cluster are sent in one concurrent pipeline per host. Queries with
+        multiple environments return the sum of the environment counters.
 
-        results_by_key = defaultdict(dict)
-        for epoch, key, count in results:
-            results_by_key[key][epoch] = int(count.value or 0)
+        >>> now = timezone.now()
+        >>> get_range_multi([
+        >>>     RangeQuery(TimeSeriesModel.group, [1, 2, 3], now - timedelta(days=1), now),
+        >>>     RangeQuery(TimeSeriesModel.project, [1], now - timedelta(days=1), now, environment_ids=[2]),
+        >>> ])
+        """
+        # cluster -> hash key -> hash field -> count
+        requested = defaultdict(lambda: defaultdict(dict))
+        plans = []
+
+        for query in queries:
+            environment_ids = query.environment_ids or [None]
+            self.validate_arguments([query.model], environment_ids)
+            rollup, series = self.get_optimal_rollup_series(query.start, query.end, query.rollup)
+            series = map(to_datetime, series)
+
+            # key -> [(bucket index, cluster, hash key, hash field)]
+            lookups = {}
+            for key in query.keys:
+                lookups[key] = key_lookups = []
+                for environment_id in environment_ids:
+                    cluster, _ = self.get_cluster(environment_id)
+                    for index, timestamp in enumerate(series):
+                        hash_key, hash_field = self.make_counter_key(
+                            query.model, rollup, timestamp, key, environment_id
+                        )
+                        requested[cluster][hash_key][hash_field] = None
+                        key_lookups.append((index, cluster, hash_key, hash_field))
 
-        for key, points in results_by_key.items():
-            results_by_key[key] = sorted(points.items())
-        return dict(results_by_key)
+            plans.append((rollup, [to_timestamp(timestamp) for timestamp in series], lookups))
+
+        for cluster, hashes in requested.items():
+            with cluster.map() as client:
+                promises = [
+                    (fields, client.hmget(hash_key, list(fields)))
+                    for hash_key, fields in hashes.items()
+                ]
+            for fields, promise in promises:
+                for hash_field, count in zip(list(fields), promise.value):
+                    fields[hash_field] = int(count or 0)
+
+        results = []
+        for rollup, timestamps, lookups in plans:
+            values = {}
+            if timestamps:
+                for key, key_lookups in lookups.items():
+                    counts = values[key] = array("q", bytes(8 * len(timestamps)))
+                    for index, cluster, hash_key, hash_field in key_lookups:
+                        counts[index] += requested[cluster][hash_key][hash_field]
+            results.append(RangeResult(rollup, timestamps, values))
+        return results
 
     def merge(self, model, destination, sources, timestamp=None, environment_ids=None):
         environment_ids = (set(environment_ids) if environment_ids is not None else set()).union(
@@ -26,6 +26,7 @@ method_specifications = {
     # method: (type, function(callargs) -> set[model])
     "get_range": (READ, single_model_argument),
     "get_sums": (READ, single_model_argument),
+    "get_totals_multi": (READ, lambda callargs: {request[1] for request in callargs["requests"]}),
     "get_distinct_counts_series": (READ, single_model_argument),
     "get_distinct_counts_totals": (READ, single_model_argument),
     "get_distinct_counts_union": (READ, single_model_argument),
@@ -175,6 +175,41 @@ class SnubaTSDB(BaseTSDB):
         `group_on_time`: whether to add a GROUP BY clause on the 'time' field.
         `group_on_model`: whether to add a GROUP BY clause on the primary model.
         """
+        query, finish = self._prepare_data_query(
+            model,
+            keys,
+            start,
+            end,
+            rollup,
+            environment_ids,
+            aggregation,
+            group_on_model,
+            group_on_time,
+            conditions,
+            jitter_value,
+        )
+        result = snuba.query(use_cache=use_cache, **query) if query is not None else {}
+        return finish(result)
+
+    def _prepare_data_query(
+        self,
+        model,
+        keys,
+        start,
+        end,
+        rollup=None,
+        environment_ids=None,
+        aggregation="count()",
+        group_on_model=True,
+        group_on_time=False,
+        conditions=None,
+        jitter_value=None,
+    ):
+        """
+        Normalizes all the TSDB parameters for `get_data`. Returns the kwargs
+        of the snuba query (``None`` if there is nothing to query) and a
+        function that turns its result into the result of `get_data`.
+        """
         # XXX: to counteract the hack in project_key_stats.py
         if model in [
             TSDBModel.key_total_received,
@@ -241,8 +276,9 @@ class SnubaTSDB(BaseTSDB):
         if group_on_model and model_group is not None:
             orderby.append(model_group)
 
+        query = None
         if keys:
-            result = snuba.query(
+            query = dict(
                 dataset=model_dataset,
                 start=start,
                 end=end,
@@ -255,18 +291,18 @@ class SnubaTSDB(BaseTSDB):
                 orderby=orderby,
                 referrer=f"tsdb-modelid:{model.value}",
                 is_grouprelease=(model == TSDBModel.frequent_releases_by_group),
-                use_cache=use_cache,
             )
-        else:
-            result = {}
 
-        if group_on_time:
-            keys_map["time"] = series
+        def finish(result):
+            if group_on_time:
+                keys_map["time"] = series
 
-        self.zerofill(result, groupby, keys_map)
-        self.trim(result, groupby, keys)
+            self.zerofill(result, groupby, keys_map)
+            self.trim(result, groupby, keys)
 
-        return result
+            return result
+
+        return query, finish
 
     def zerofill(self, result, groups, flat_keys):
         """
@@ -317,14 +353,6 @@ class SnubaTSDB(BaseTSDB):
         use_cache=False,
         jitter_value=None,
     ):
-        model_query_settings = self.model_query_settings.get(model)
-        assert model_query_settings is not None, f"Unsupported TSDBModel: {model.name}"
-
-        if model_query_settings.dataset == snuba.Dataset.Outcomes:
-            aggregate_function = "sum"
-        else:
-            aggregate_function = "count()"
-
         result = self.get_data(
             model,
             keys,
@@ -332,7 +360,7 @@ class SnubaTSDB(BaseTSDB):
             end,
             rollup,
             environment_ids,
-            aggregation=aggregate_function,
+            aggregation=self._get_range_aggregation(model),
             group_on_time=True,
             conditions=conditions,
             use_cache=use_cache,
@@ -344,6 +372,60 @@ class SnubaTSDB(BaseTSDB):
         #    {group: [(timestamp, count), ...]}
         return {k: sorted(result[k].items()) for k in result}
 
+    def _get_range_aggregation(self, model):
+        model_query_settings = self.model_query_settings.get(model)
+        assert model_query_settings is not None, f"Unsupported TSDBModel: {model.name}"
+
+        if model_query_settings.dataset == snuba.Dataset.Outcomes:
+            return "sum"
+        else:
+            return "count()"
+
+    def get_totals_multi(self, requests, use_cache=False):
+        queries = []
+        for method, model, keys, start, end, environment_id, jitter_value in requests:
+            environment_ids = [environment_id] if environment_id is not None else None
+            if method == "get_sums":
+                query, finish = self._prepare_data_query(
+                    model,
+                    keys,
+                    start,
+                    end,
+                    environment_ids=environment_ids,
+                    aggregation=self._get_range_aggregation(model),
+                    group_on_time=True,
+                    jitter_value=jitter_value,
+                )
+            elif method == "get_distinct_counts_totals":
+                query, finish = self._prepare_data_query(
+                    model,
+                    keys,
+                    start,
+                    end,
+                    environment_ids=environment_ids,
+                    aggregation="uniq",
+                    jitter_value=jitter_value,
+                )
+            else:
+                raise ValueError(f"Unsupported method: {method}")
+            queries.append((method, query, finish))
+
+        results = iter(
+            snuba.bulk_query(
+                [query for _, query, _ in queries if query is not None],
+                referrer="tsdb.get_totals_multi",
+                use_cache=use_cache,
+            )
+        )
+
+        rv = []
+        for method, query, finish in queries:
+            result = finish(next(results) if query is not None else {})
+            if method == "get_sums":
+                result = {key: sum(points.values()) for key, points in result.items()}
+            rv.append(result)
+        return rv
+
     def get_distinct_counts_series(
         self, model, keys, start, end=None, rollup=None, environment_id=None
     ):
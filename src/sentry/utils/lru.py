@@ -0,0 +1,142 @@
+import threading
+from collections import OrderedDict
+from time import monotonic
+from typing import Any, Callable, Generic, Hashable, Iterable, MutableMapping, Optional, TypeVar
+
+from sentry.utils import metrics
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+_MISSING = object()
+
+
+class LRUCache(Generic[K, V]):
+    """
+    A bounded, thread-safe, process-local least recently used cache.
+
+    The cache is bounded by the number of items and optionally by the total
+    weight of its values, where the weight of a value is computed by `weigher`
+    (for example ``len`` for byte strings). Items can additionally expire
+    after `ttl` seconds. Hits, misses and evictions are reported as metrics
+    tagged with the `name` of the cache.
+
+    >>> cache = LRUCache("example", max_items=2)
+    >>> cache.set("a", 1)
+    >>> cache.get("a")
+    1
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_items: int = 1000,
+        max_weight: Optional[int] = None,
+        weigher: Optional[Callable[[V], int]] = None,
+        ttl: Optional[float] = None,
+    ) -> None:
+        assert max_items > 0
+        assert max_weight is None or weigher is not None
+        self.name = name
+        self.max_items = max_items
+        self.max_weight = max_weight
+        self.weigher = weigher
+        self.ttl = ttl
+        self.weight = 0
+        # key -> (value, weight, expires_at)
+        self.__items: MutableMapping[K, Any] = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.__items)
+
+    def __contains__(self, key: K) -> bool:
+        return self.get(key, _MISSING, record_metrics=False) is not _MISSING
+
+    def __get(self, key: K, now: float) -> Any:
+        item = self.__items.get(key)
+        if item is None:
+            return _MISSING
+        value, weight, expires_at = item
+        if expires_at is not None and expires_at <= now:
+            del self.__items[key]
+            self.weight -= weight
+            return _MISSING
+        self.__items.move_to_end(key)
+        return value
+
+    def get(self, key: K, default: Any = None, record_metrics: bool = True) -> Any:
+        with self.__lock:
+            value = self.__get(key, monotonic())
+        if record_metrics:
+            self.__record(hits=int(value is not _MISSING), misses=int(value is _MISSING))
+        return default if value is _MISSING else value
+
+    def get_many(self, keys: Iterable[K]) -> MutableMapping[K, V]:
+        """
+        Returns a mapping of all `keys` that are present in the cache.
+        """
+        rv = {}
+        misses = 0
+        with self.__lock:
+            now = monotonic()
+            for key in keys:
+                value = self.__get(key, now)
+                if value is _MISSING:
+                    misses += 1
+                else:
+                    rv[key] = value
+        self.__record(hits=len(rv), misses=misses)
+        return rv
+
+    def set(self, key: K, value: V, ttl: Optional[float] = None) -> None:
+        weight = self.weigher(value) if self.weigher is not None else 0
+        if self.max_weight is not None and weight > self.max_weight:
+            # Never cache values that would evict everything else.
+            self.delete(key)
+            return
+
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = monotonic() + ttl if ttl is not None else None
+        evictions = 0
+        with self.__lock:
+            previous = self.__items.pop(key, None)
+            if previous is not None:
+                self.weight -= previous[1]
+            self.__items[key] = (value, weight, expires_at)
+            self.weight += weight
+
+            while len(self.__items) > self.max_items or (
+                self.max_weight is not None and self.weight > self.max_weight
+            ):
+                _, (_, evicted_weight, _) = self.__items.popitem(last=False)
+                self.weight -= evicted_weight
+                evictions += 1
+
+        if evictions:
+            metrics.incr("lru_cache.eviction", amount=evictions, tags={"cache": self.name})
+
+    def set_many(self, items: MutableMapping[K, V], ttl: Optional[float] = None) -> None:
+        for key, value in items.items():
+            self.set(key, value, ttl=ttl)
+
+    def delete(self, key: K) -> None:
+        with self.__lock:
+            item = self.__items.pop(key, None)
+            if item is not None:
+                self.weight -= item[1]
+
+    def delete_many(self, keys: Iterable[K]) -> None:
+        for key in keys:
+            self.delete(key)
+
+    def clear(self) -> None:
+        with self.__lock:
+            self.__items.clear()
+            self.weight = 0
+
+    def __record(self, hits: int, misses: int) -> None:
+        if hits:
+            metrics.incr("lru_cache.hit", amount=hits, tags={"cache": self.name})
+        if misses:
+            metrics.incr("lru_cache.miss", amount=misses, tags={"cache": self.name})
@@ -264,6 +264,10 @@ def pytest_runtest_teardown(item):
     for model in (OrganizationOption, ProjectOption, UserOption):
         model.objects.clear_local_cache()
 
+    from sentry.sentry_metrics.indexer.cache import indexer_cache
+
+    indexer_cache.clear_local_cache()
+
     Hub.main.bind_client(None)
 
 
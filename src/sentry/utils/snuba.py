@@ -1,3 +1,4 @@
+import codecs
 import functools
 import logging
 import os
@@ -11,7 +12,18 @@ from copy import deepcopy
 from datetime import datetime, timedelta
 from hashlib import sha1
 from operator import itemgetter
-from typing import Any, Callable, List, Mapping, MutableMapping, Optional, Sequence, Tuple, Union
+from typing import (
+    Any,
+    Callable,
+    Iterator,
+    List,
+    Mapping,
+    MutableMapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 from urllib.parse import urlparse
 
 import pytz
@@ -650,11 +662,12 @@ def raw_query(
     referrer=None,
     is_grouprelease=False,
     use_cache=False,
+    stream=False,
     **kwargs,
 ) -> Mapping[str, Any]:
     """
     Sends a query to snuba.  See `SnubaQueryParams` docstring for param
-    descriptions.
+    descriptions. With `stream`, a ``StreamingResult`` is returned.
     """
     snuba_params = SnubaQueryParams(
         dataset=dataset,
@@ -669,7 +682,50 @@ def raw_query(
         **kwargs,
     )
 
-    return bulk_raw_query([snuba_params], referrer=referrer, use_cache=use_cache)[0]
+    return bulk_raw_query([snuba_params], referrer=referrer, use_cache=use_cache, stream=stream)[0]
+
+
+def deferred_raw_query(
+    dataset=None,
+    start=None,
+    end=None,
+    groupby=None,
+    conditions=None,
+    filter_keys=None,
+    aggregations=None,
+    rollup=None,
+    referrer=None,
+    is_grouprelease=False,
+    use_cache=False,
+    stream=False,
+    **kwargs,
+) -> Callable[[], Mapping[str, Any]]:
+    """
+    Prepares a query like `raw_query`, but returns a function that sends it to
+    snuba instead of sending it right away. All model lookups the query needs
+    happen on the calling thread, so the returned function can safely be
+    called on another thread.
+    """
+    snuba_params = SnubaQueryParams(
+        dataset=dataset,
+        start=start,
+        end=end,
+        groupby=groupby,
+        conditions=conditions,
+        filter_keys=filter_keys,
+        aggregations=aggregations,
+        rollup=rollup,
+        is_grouprelease=is_grouprelease,
+        **kwargs,
+    )
+    query_params = [_prepare_query_params(snuba_params)]
+
+    def query() -> Mapping[str, Any]:
+        return _apply_cache_and_build_results(
+            query_params, referrer=referrer, use_cache=use_cache, stream=stream
+        )[0]
+
+    return query
 
 
 SnubaQuery = Union[Request, MutableMapping[str, Any]]
@@ -677,18 +733,209 @@ Translator = Callable[[Any], Any]
 SnubaQueryBody = Tuple[SnubaQuery, Translator, Translator]
 ResultSet = List[Mapping[str, Any]]  # TODO: Would be nice to make this a concrete structure
 
+_JSON_WHITESPACE_RE = re.compile(r"[ \t\n\r]*")
+
+
+class _JsonReader:
+    """
+    Reads the values of a UTF-8 encoded JSON body one at a time. Only a
+    window of the body is decoded to text at any time: it is decoded in
+    chunks as values are read, and text that has been read is dropped.
+    """
+
+    chunk_size = 64 * 1024
+
+    def __init__(self, raw: bytes) -> None:
+        self.__raw = memoryview(raw)
+        self.__offset = 0
+        self.__decoder = codecs.getincrementaldecoder("utf-8")()
+        self.__text = ""
+        self.__idx = 0
+
+    def __fill(self, size: int) -> bool:
+        """
+        Decodes the next `size` bytes of the body, returns ``False`` if all
+        of it has been decoded already.
+        """
+        if self.__offset >= len(self.__raw):
+            return False
+        chunk = self.__raw[self.__offset : self.__offset + size]
+        self.__offset += len(chunk)
+        text = self.__decoder.decode(chunk, final=self.__offset >= len(self.__raw))
+        self.__text = self.__text[self.__idx :] + text
+        self.__idx = 0
+        return True
+
+    def peek(self) -> str:
+        """
+        Skips whitespace and returns the next character, or an empty string
+        at the end of the body.
+        """
+        while True:
+            self.__idx = _JSON_WHITESPACE_RE.match(self.__text, self.__idx).end()
+            if self.__idx < len(self.__text) or not self.__fill(self.chunk_size):
+                return self.__text[self.__idx : self.__idx + 1]
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise ValueError(f"Expected {char!r} near byte {self.__offset}")
+        self.__idx += 1
+
+    def read(self) -> Any:
+        """
+        Decodes the next value, decoding more of the body until the value is
+        complete.
+        """
+        self.peek()
+        size = self.chunk_size
+        while True:
+            try:
+                value, end = json.raw_decode(self.__text, self.__idx)
+            except ValueError as e:
+                error: Optional[ValueError] = e
+            else:
+                error = None
+                # A value that ends with the decoded text (a number) may
+                # continue in the next chunk.
+                if end < len(self.__text):
+                    self.__idx = end
+                    return value
+
+            if not self.__fill(size):
+                if error is not None:
+                    raise error
+                self.__idx = end
+                return value
+            # Grow the window geometrically, so that large values are not
+            # decoded over and over again.
+            size = max(size, len(self.__text))
+
+
+class StreamingResult:
+    """
+    A Snuba query result whose rows are decoded lazily from the raw response
+    body, one at a time, with the reverse translation applied to each row as
+    it is produced. Only the raw body is held in memory, never the full list
+    of rows, and the raw body is what gets written to the query cache.
+
+    All top level keys other than ``data`` are available through item access.
+    Keys that Snuba sends after ``data`` (``totals``, ``timing``, ...) are
+    parsed when the rows have been consumed, or on first access. Use
+    ``materialize`` to get the same mapping a regular query returns.
+    """
+
+    def __init__(self, raw: bytes, reverse: Translator = lambda x: x) -> None:
+        self.raw = raw
+        self.reverse = reverse
+        self.__values: MutableMapping[str, Any] = {}
+        # Set once all top level members have been parsed.
+        self.__complete = False
+        self.__has_data = self.__parse_members(self.__open())
+
+    def __open(self) -> _JsonReader:
+        reader = _JsonReader(self.raw)
+        reader.expect("{")
+        return reader
+
+    def __parse_members(self, reader: _JsonReader) -> bool:
+        """
+        Parses top level members up to the ``data`` member or the end of the
+        object. Returns whether it stopped at ``data``.
+        """
+        if reader.peek() == "}":
+            self.__complete = True
+            return False
+
+        while True:
+            key = reader.read()
+            reader.expect(":")
+            if key == "data":
+                return True
+
+            self.__values[key] = reader.read()
+            if reader.peek() == "}":
+                self.__complete = True
+                return False
+            reader.expect(",")
+
+    def __iter_data(self) -> Iterator[Any]:
+        if not self.__has_data:
+            return
+
+        # Members before ``data`` are small, they are parsed again to find it.
+        reader = self.__open()
+        self.__parse_members(reader)
+        reader.expect("[")
+        if reader.peek() != "]":
+            while True:
+                yield reader.read()
+                if reader.peek() == "]":
+                    break
+                reader.expect(",")
+        reader.expect("]")
+
+        if not self.__complete:
+            if reader.peek() == "}":
+                self.__complete = True
+            else:
+                reader.expect(",")
+                self.__parse_members(reader)
+
+    def __iter__(self) -> Iterator[Any]:
+        """
+        Yields the translated rows. Can be iterated more than once, each
+        iteration decodes the rows again.
+        """
+        for row in self.__iter_data():
+            yield self.reverse(row)
+
+    def __ensure_complete(self) -> None:
+        if not self.__complete:
+            for _ in self.__iter_data():
+                pass
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "data":
+            return list(self)
+        if key not in self.__values:
+            self.__ensure_complete()
+        return self.__values[key]
+
+    def __contains__(self, key: str) -> bool:
+        if key == "data":
+            return self.__has_data
+        self.__ensure_complete()
+        return key in self.__values
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self[key] if key in self else default
+
+    def materialize(self, data: bool = True) -> MutableMapping[str, Any]:
+        """
+        Returns the result as a regular mapping, with ``data`` as a list.
+        Without `data`, only the other members are returned.
+        """
+        self.__ensure_complete()
+        body = dict(self.__values)
+        if data and self.__has_data:
+            body["data"] = list(self)
+        return body
+
 
 def raw_snql_query(
     request: Request,
     referrer: Optional[str] = None,
     use_cache: bool = False,
+    stream: bool = False,
 ) -> Mapping[str, Any]:
     # XXX (evanh): This function does none of the extra processing that the
     # other functions do here. It does not add any automatic conditions, format
     # results, nothing. Use at your own risk.
     metrics.incr("snql.sdk.api", tags={"referrer": referrer or "unknown"})
     params: SnubaQueryBody = (request, lambda x: x, lambda x: x)
-    return _apply_cache_and_build_results([params], referrer=referrer, use_cache=use_cache)[0]
+    return _apply_cache_and_build_results(
+        [params], referrer=referrer, use_cache=use_cache, stream=stream
+    )[0]
 
 
 def bulk_snql_query(
@@ -704,30 +951,41 @@ def bulk_snql_query(
     return _apply_cache_and_build_results(params, referrer=referrer, use_cache=use_cache)
 
 
-def get_cache_key(query: SnubaQuery) -> str:
+def get_cache_key(query: SnubaQuery, stream: bool = False) -> str:
     if isinstance(query, Request):
         hashable = str(query)
     else:
         hashable = json.dumps(query, sort_keys=True)
 
-    # sqc - Snuba Query Cache
-    return f"sqc:{sha1(hashable.encode('utf-8')).hexdigest()}"
+    # sqc - Snuba Query Cache, sqr - raw response bodies of streamed results,
+    # which are stored before the reverse translation is applied.
+    prefix = "sqr" if stream else "sqc"
+    return f"{prefix}:{sha1(hashable.encode('utf-8')).hexdigest()}"
 
 
 def bulk_raw_query(
     snuba_param_list: Sequence[SnubaQueryParams],
     referrer: Optional[str] = None,
     use_cache: Optional[bool] = False,
+    stream: bool = False,
 ) -> ResultSet:
     params = map(_prepare_query_params, snuba_param_list)
-    return _apply_cache_and_build_results(params, referrer=referrer, use_cache=use_cache)
+    return _apply_cache_and_build_results(
+        params, referrer=referrer, use_cache=use_cache, stream=stream
+    )
 
 
 def _apply_cache_and_build_results(
     snuba_param_list: Sequence[SnubaQueryBody],
     referrer: Optional[str] = None,
     use_cache: Optional[bool] = False,
+    stream: bool = False,
 ) -> ResultSet:
+    """
+    Runs the queries, serving them from the query cache where possible. With
+    `stream`, every result is a ``StreamingResult`` and the raw response body
+    is cached instead of a re-encoded result.
+    """
     headers = {}
     if referrer:
         headers["referer"] = referrer
@@ -738,7 +996,9 @@ def _apply_cache_and_build_results(
     results = []
 
     if use_cache:
-        cache_keys = [get_cache_key(query_params[0]) for _, query_params in query_param_list]
+        cache_keys = [
+            get_cache_key(query_params[0], stream=stream) for _, query_params in query_param_list
+        ]
         cache_data = cache.get_many(cache_keys)
         to_query: List[Tuple[int, SnubaQueryBody, Optional[str]]] = []
         for (query_pos, query_params), cache_key in zip(query_param_list, cache_keys):
@@ -749,14 +1009,19 @@ def _apply_cache_and_build_results(
                 to_query.append((query_pos, query_params, cache_key))
             else:
                 metrics.incr("snuba.query_cache.hit", tags=metric_tags)
-                results.append((query_pos, json.loads(cached_result)))
+                if stream:
+                    results.append((query_pos, StreamingResult(cached_result, query_params[2])))
+                else:
+                    results.append((query_pos, json.loads(cached_result)))
     else:
         to_query = [(query_pos, query_params, None) for query_pos, query_params in query_param_list]
 
     if to_query:
-        query_results = _bulk_snuba_query(map(itemgetter(1), to_query), headers)
+        query_results = _bulk_snuba_query(map(itemgetter(1), to_query), headers, stream=stream)
         for result, (query_pos, _, cache_key) in zip(query_results, to_query):
-            if cache_key:
+            if cache_key and stream:
+                cache.set(cache_key, result.raw, settings.SENTRY_SNUBA_CACHE_TTL_SECONDS)
+            elif cache_key:
                 cache.set(cache_key, json.dumps(result), settings.SENTRY_SNUBA_CACHE_TTL_SECONDS)
             results.append((query_pos, result))
 
@@ -769,6 +1034,7 @@ def _apply_cache_and_build_results(
 def _bulk_snuba_query(
     snuba_param_list: Sequence[SnubaQueryBody],
     headers: Mapping[str, str],
+    stream: bool = False,
 ) -> ResultSet:
     query_referrer = headers.get("referer", "<unknown>")
 
@@ -822,6 +1088,13 @@ def _bulk_snuba_query(
 
     results = []
     for response, _, reverse in query_results:
+        if stream and response.status == 200:
+            try:
+                results.append(StreamingResult(response.data, reverse))
+            except ValueError:
+                raise UnexpectedResponseError(f"Could not decode JSON response: {response.data}")
+            continue
+
         try:
             body = json.loads(response.data)
             if SNUBA_INFO:
@@ -952,6 +1225,43 @@ def query(
         else:
             return OrderedDict()
 
+    return _nest_query_result(body, groupby, aggregations, selected_columns, totals)
+
+
+def bulk_query(query_list, referrer=None, use_cache=False):
+    """
+    Like `query`, but sends many queries (given as a list of `query` kwargs
+    without totals) to snuba at once. Queries outside of retention have empty
+    results.
+    """
+    results = [OrderedDict() for _ in query_list]
+    to_query = []
+    for index, kwargs in enumerate(query_list):
+        kwargs = dict(kwargs)
+        kwargs["aggregations"] = kwargs.get("aggregations") or [["count()", "", "aggregate"]]
+        kwargs["filter_keys"] = kwargs.get("filter_keys") or {}
+        kwargs["selected_columns"] = kwargs.get("selected_columns") or []
+        kwargs["groupby"] = kwargs.get("groupby") or []
+        try:
+            query_params = _prepare_query_params(SnubaQueryParams(**kwargs))
+        except (QueryOutsideRetentionError, QueryOutsideGroupActivityError):
+            continue
+        to_query.append((index, kwargs, query_params))
+
+    if to_query:
+        bodies = _apply_cache_and_build_results(
+            [query_params for _, _, query_params in to_query],
+            referrer=referrer,
+            use_cache=use_cache,
+        )
+        for (index, kwargs, _), body in zip(to_query, bodies):
+            results[index] = _nest_query_result(
+                body, kwargs["groupby"], kwargs["aggregations"], kwargs["selected_columns"]
+            )
+    return results
+
+
+def _nest_query_result(body, groupby, aggregations, selected_columns, totals=None):
     # Validate and scrub response, and translate snuba keys back to IDs
     aggregate_names = [a[2] for a in aggregations]
     selected_names = [c[2] if isinstance(c, (list, tuple)) else c for c in selected_columns]
@@ -1100,10 +1410,19 @@ def aliased_query(**kwargs):
     sentry.tagstore, or sentry.snuba.discover instead when reading data.
     """
     with sentry_sdk.start_span(op="sentry.snuba.aliased_query"):
-        return _aliased_query_impl(**kwargs)
+        return raw_query(**_resolve_aliased_query(**kwargs))
+
+
+def deferred_aliased_query(**kwargs):
+    """
+    Like `aliased_query`, but returns a function that sends the query to
+    snuba. See `deferred_raw_query`.
+    """
+    with sentry_sdk.start_span(op="sentry.snuba.deferred_aliased_query"):
+        return deferred_raw_query(**_resolve_aliased_query(**kwargs))
 
 
-def _aliased_query_impl(
+def _resolve_aliased_query(
     start=None,
     end=None,
     groupby=None,
@@ -1156,7 +1475,7 @@ def _aliased_query_impl(
             updated_order.append("{}{}".format("-" if order.startswith("-") else "", order_field))
         orderby = updated_order
 
-    return raw_query(
+    return dict(
         start=start,
         end=end,
         groupby=groupby,
@@ -10,6 +10,7 @@ from freezegun import freeze_time
 from sentry.api.event_search import (
     AggregateFilter,
     AggregateKey,
+    ParenExpression,
     SearchConfig,
     SearchFilter,
     SearchKey,
@@ -456,6 +457,59 @@ class ParseSearchQueryBackendTest(SimpleTestCase):
         # the slash should be removed in the final value
         assert search_filter.value.value == 'a"b'
 
+    def test_cached_results_are_not_shared(self):
+        query = "user.email:[a@example.com, b@example.com] (transaction:foo OR bar)"
+        result = parse_search_query(query)
+        expected = [
+            SearchFilter(
+                key=SearchKey(name="user.email"),
+                operator="IN",
+                value=SearchValue(raw_value=["a@example.com", "b@example.com"]),
+            ),
+            ParenExpression(
+                children=[
+                    SearchFilter(
+                        key=SearchKey(name="transaction"), operator="=", value=SearchValue("foo")
+                    ),
+                    "OR",
+                    SearchFilter(
+                        key=SearchKey(name="message"), operator="=", value=SearchValue("bar")
+                    ),
+                ]
+            ),
+        ]
+        assert result == expected
+
+        result[0].value.raw_value.append("c@example.com")
+        result[1].children.pop()
+        result.append(result[0])
+
+        cached = parse_search_query(query)
+        assert cached == expected
+        assert isinstance(cached[0].value.raw_value, list)
+        assert isinstance(cached[1].children, list)
+
+    def test_cached_results_depend_on_config(self):
+        config = SearchConfig(key_mappings={"target_value": ["someValue"]})
+        assert parse_search_query("someValue:123") == [
+            SearchFilter(key=SearchKey(name="someValue"), operator="=", value=SearchValue("123"))
+        ]
+        assert parse_search_query("someValue:123", config=config) == [
+            SearchFilter(key=SearchKey(name="target_value"), operator="=", value=SearchValue("123"))
+        ]
+
+        config.key_mappings["target_value"] = []
+        assert parse_search_query("someValue:123", config=config) == [
+            SearchFilter(key=SearchKey(name="someValue"), operator="=", value=SearchValue("123"))
+        ]
+
+    def test_relative_dates_are_not_cached(self):
+        now = timezone.now()
+        with freeze_time(now):
+            assert parse_search_query("time:-2w")[0].value.raw_value == now - timedelta(days=14)
+        with freeze_time(now + timedelta(days=1)):
+            assert parse_search_query("time:-2w")[0].value.raw_value == now - timedelta(days=13)
+
 
 @pytest.mark.parametrize(
     "raw,result",
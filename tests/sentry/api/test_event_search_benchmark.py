@@ -0,0 +1,82 @@
+import os
+
+import pytest
+
+from sentry.api import event_search
+from sentry.api.event_search import parse_search_query
+from sentry.api.issue_search import parse_search_query as parse_issue_query
+from sentry.constants import MODULE_ROOT
+from sentry.exceptions import InvalidSearchQuery
+from sentry.utils import json
+
+# Shared with the frontend parser tests
+FIXTURES_PATH = os.path.join(MODULE_ROOT, os.pardir, os.pardir, "tests/fixtures/search-syntax")
+
+# Queries as sent by the issue stream, dashboards and alert rules.
+ISSUE_QUERIES = [
+    "is:unresolved",
+    "is:unresolved is:for_review assigned_or_suggested:[me, none]",
+    "is:unresolved !has:assigned firstSeen:-24h level:error",
+    "is:unresolved times_seen:>100 release:[backend@1.2.3, backend@1.2.4] os.name:Windows",
+]
+EVENT_QUERIES = [
+    "event.type:transaction transaction.op:pageload",
+    "event.type:transaction transaction:/api/0/organizations/{organization_slug}/issues/ "
+    "transaction.duration:>500ms http.method:GET",
+    'event.type:error !message:"Failed to fetch" browser.name:[Chrome, Firefox, Safari]',
+    "event.type:error (environment:production OR environment:staging) release:backend@1.2.3",
+    "p95(transaction.duration):>1s count():>100 failure_rate():>0.05",
+    "user.email:*@example.com os.name:Windows stack.filename:*/node_modules/*",
+    "tags[customer_tier]:enterprise measurements.lcp:>2500 measurements.cls:>0.1",
+]
+
+
+def benchmark_available():
+    try:
+        import pytest_benchmark  # NOQA
+    except ModuleNotFoundError:
+        return False
+    else:
+        return True
+
+
+def load_corpus():
+    queries = [(parse_issue_query, query) for query in ISSUE_QUERIES]
+    queries.extend((parse_search_query, query) for query in EVENT_QUERIES)
+    for file in sorted(os.listdir(FIXTURES_PATH)):
+        with open(os.path.join(FIXTURES_PATH, file)) as fp:
+            queries.extend((parse_search_query, case["query"]) for case in json.load(fp))
+
+    corpus = []
+    for parse, query in queries:
+        try:
+            parse(query)
+        except InvalidSearchQuery:
+            continue
+        corpus.append((parse, query))
+    return corpus
+
+
+def clear_caches():
+    event_search._tree_cache.clear()
+    event_search._result_cache.clear()
+
+
+def parse_corpus(corpus):
+    for parse, query in corpus:
+        parse(query)
+
+
+@pytest.mark.skipif(not benchmark_available(), reason="requires pytest-benchmark")
+@pytest.mark.parametrize("cached", [False, True], ids=["uncached", "cached"])
+def test_benchmark_parse_search_query(cached, benchmark):
+    corpus = load_corpus()
+
+    def setup():
+        clear_caches()
+        if cached:
+            parse_corpus(corpus)
+        return (corpus,), {}
+
+    benchmark.extra_info["queries"] = len(corpus)
+    benchmark.pedantic(parse_corpus, setup=setup, rounds=20)
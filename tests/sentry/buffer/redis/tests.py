@@ -2,12 +2,13 @@ import pickle
 from datetime import datetime
 from unittest import mock
 
+from celery.signals import task_postrun
 from django.utils import timezone
 from django.utils.encoding import force_text
 from freezegun import freeze_time
 
 from sentry.buffer.redis import RedisBuffer
-from sentry.models import Group, Project
+from sentry.models import Group, Project, ProjectOption
 from sentry.testutils import TestCase
 
 
@@ -211,6 +212,125 @@ class RedisBufferTest(TestCase):
         self.buf.process("foo")
         process.assert_called_once_with(mock.Mock, {"times_seen": 1}, {"pk": 1}, {}, True)
 
+    @freeze_time()
+    def test_process_pending_bulk(self):
+        self.buf.bulk_flush = True
+        self.buf.flush_chunk_size = 1
+        other_group = self.create_group(project=self.project)
+        orig_times_seen = Group.objects.get_from_cache(id=self.group.id).times_seen
+        last_seen = timezone.now().replace(microsecond=0)
+        self.buf.incr(Group, {"times_seen": 3}, {"id": self.group.id}, {"last_seen": last_seen})
+        self.buf.incr(Group, {"times_seen": 2}, {"id": self.group.id}, {"last_seen": last_seen})
+        self.buf.incr(Group, {"times_seen": 1}, {"id": other_group.id}, {"last_seen": last_seen})
+
+        with mock.patch("sentry.buffer.redis.process_incr") as process_incr:
+            self.buf.process_pending()
+        assert not process_incr.apply_async.called
+
+        group = Group.objects.get_from_cache(id=self.group.id)
+        assert group.times_seen == orig_times_seen + 5
+        assert group.last_seen == last_seen
+        assert group.score == Group.calculate_score(group.times_seen, last_seen)
+        assert Group.objects.get(id=other_group.id).times_seen == other_group.times_seen + 1
+
+        client = self.buf.cluster.get_routing_client()
+        assert client.zrange("b:p", 0, -1) == []
+        assert client.hgetall(self.buf._make_key(Group, {"id": self.group.id})) == {}
+
+    @mock.patch("sentry.buffer.base.Buffer.process")
+    def test_process_pending_bulk_falls_back(self, process):
+        self.buf.bulk_flush = True
+        self.buf.incr(
+            ProjectOption,
+            columns={},
+            filters={"project": self.project, "key": "foo"},
+            signal_only=True,
+        )
+        self.buf.process_pending()
+        process.assert_called_once_with(
+            ProjectOption, {}, {"project": self.project, "key": "foo"}, {}, True
+        )
+
+    @mock.patch("sentry.buffer.base.buffer_incr_complete")
+    def test_process_batch_sends_signal(self, buffer_incr_complete):
+        filters = {"id": self.group.id}
+        self.buf.process_batch([(Group, {"times_seen": 1}, filters, {}, None)])
+        buffer_incr_complete.send_robust.assert_called_once_with(
+            model=Group,
+            columns={"times_seen": 1},
+            filters=filters,
+            extra={},
+            created=False,
+            sender=Group,
+        )
+
+    def test_incr_coalesced(self):
+        self.buf.incr_coalesce_window = 60
+        client = self.buf.cluster.get_routing_client()
+        model = mock.Mock()
+        model.__name__ = "Mock"
+        filters = {"pk": 1}
+        key = self.buf._make_key(model, filters=filters)
+
+        self.buf.incr(model, {"times_seen": 1}, filters, extra={"foo": "bar"})
+        self.buf.incr(model, {"times_seen": 2}, filters, extra={"foo": "baz"}, signal_only=True)
+        self.buf.incr(model, {"times_seen": 3}, filters)
+        assert client.hgetall(key) == {}
+
+        self.buf.flush_incrs()
+        result = {force_text(k): v for k, v in client.hgetall(key).items()}
+        assert pickle.loads(result.pop("f")) == filters
+        assert pickle.loads(result.pop("e+foo")) == "baz"
+        assert result == {"i+times_seen": b"6", "m": b"unittest.mock.Mock", "s": b"1"}
+        assert client.zrange("b:p", 0, -1) == [key.encode("utf-8")]
+
+        # Nothing left to write
+        client.delete(key)
+        self.buf.flush_incrs()
+        assert client.hgetall(key) == {}
+
+    def test_incr_coalesced_flushes_on_batch_size(self):
+        self.buf.incr_coalesce_window = 60
+        self.buf.incr_coalesce_batch_size = 2
+        model = mock.Mock()
+        model.__name__ = "Mock"
+
+        self.buf.incr(model, {"times_seen": 1}, {"pk": 1})
+        assert self.buf.get(model, ["times_seen"], filters={"pk": 1}) == {"times_seen": 0}
+        self.buf.incr(model, {"times_seen": 1}, {"pk": 2})
+        assert self.buf.get(model, ["times_seen"], filters={"pk": 1}) == {"times_seen": 1}
+        assert self.buf.get(model, ["times_seen"], filters={"pk": 2}) == {"times_seen": 1}
+
+    def test_incr_coalesced_flushes_after_task(self):
+        buf = RedisBuffer(incr_coalesce_window=60)
+        model = mock.Mock()
+        model.__name__ = "Mock"
+
+        buf.incr(model, {"times_seen": 1}, {"pk": 1})
+        assert buf.get(model, ["times_seen"], filters={"pk": 1}) == {"times_seen": 0}
+
+        task_postrun.send(sender=None)
+        assert buf.get(model, ["times_seen"], filters={"pk": 1}) == {"times_seen": 1}
+
+    def test_incr_coalesced_flush_failure(self):
+        self.buf.incr_coalesce_window = 60
+        model = mock.Mock()
+        model.__name__ = "Mock"
+
+        self.buf.incr(model, {"times_seen": 1}, {"pk": 1}, extra={"foo": "bar"})
+        with mock.patch.object(self.buf.cluster, "get_local_client", side_effect=Exception("boom")):
+            self.buf.flush_incrs()
+        assert self.buf.get(model, ["times_seen"], filters={"pk": 1}) == {"times_seen": 0}
+
+        # The failed increments are merged with the ones coalesced since, and
+        # written by the next flush.
+        self.buf.incr(model, {"times_seen": 2}, {"pk": 1}, extra={"foo": "baz"})
+        self.buf.flush_incrs()
+        assert self.buf.get(model, ["times_seen"], filters={"pk": 1}) == {"times_seen": 3}
+        key = self.buf._make_key(model, filters={"pk": 1})
+        client = self.buf.cluster.get_routing_client()
+        assert pickle.loads(client.hget(key, "e+foo")) == "baz"
+
 
 #    @mock.patch("sentry.buffer.redis.RedisBuffer._make_key", mock.Mock(return_value="foo"))
 #    def test_incr_uses_signal_only(self):
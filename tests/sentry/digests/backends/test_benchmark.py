@@ -0,0 +1,55 @@
+import time
+
+import pytest
+
+from sentry.digests import Record
+from sentry.digests.backends.redis import RedisBackend
+
+
+def benchmark_available():
+    try:
+        import pytest_benchmark  # NOQA
+    except ModuleNotFoundError:
+        return False
+    else:
+        return True
+
+
+TIMELINES = 500
+RECORDS = 5
+
+
+def digest_one_by_one(backend, keys):
+    count = 0
+    for key in keys:
+        with backend.digest(key, 0) as records:
+            count += len(records)
+    return count
+
+
+def digest_many(backend, keys):
+    count = 0
+    with backend.digest_many(keys, 0) as digests:
+        for _, records in digests:
+            count += len(records)
+    return count
+
+
+@pytest.mark.skipif(not benchmark_available(), reason="requires pytest-benchmark")
+@pytest.mark.parametrize("digest", [digest_one_by_one, digest_many], ids=["single", "many"])
+def test_benchmark_digest(digest, benchmark):
+    backend = RedisBackend(namespace="bench")
+    keys = [f"mail:p:{i}" for i in range(TIMELINES)]
+
+    def setup():
+        for host in backend.cluster.hosts:
+            backend.cluster.get_local_client(host).flushdb()
+        for key in keys:
+            for i in range(RECORDS):
+                backend.add(key, Record(f"record:{i}", {"value": i}, time.time()))
+        return (backend, keys), {}
+
+    benchmark.extra_info["timelines"] = TIMELINES
+    benchmark.extra_info["records"] = TIMELINES * RECORDS
+    count = benchmark.pedantic(digest, setup=setup, rounds=5)
+    assert count == TIMELINES * RECORDS
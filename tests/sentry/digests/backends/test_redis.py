@@ -6,6 +6,7 @@ from sentry.digests import Record
 from sentry.digests.backends.base import InvalidState
 from sentry.digests.backends.redis import RedisBackend
 from sentry.testutils import TestCase
+from sentry.utils.locking import UnableToAcquireLock
 
 
 class RedisBackendTestCase(TestCase):
@@ -151,3 +152,113 @@ class RedisBackendTestCase(TestCase):
 
         with backend.digest("timeline", 0) as records:
             assert len(set(records)) == n
+
+    def test_digest_many(self):
+        backend = RedisBackend(digest_batch_size=2)
+
+        timelines = {f"timeline:{i}": Record(f"record:{i}", f"{i}", time.time()) for i in range(5)}
+        for key, record in timelines.items():
+            backend.add(key, record)
+
+        # Not in the ready state, so it cannot be digested.
+        backend.add("waiting", Record("record", "value", time.time()))
+        with backend.digest("waiting", 0):
+            pass
+        backend.add(
+            "waiting", Record("record", "value", time.time()), increment_delay=0, maximum_delay=0
+        )
+
+        with backend.digest_many([*timelines, "waiting", "missing"], 0) as digests:
+            assert {key: set(records) for key, records in digests} == {
+                key: {record} for key, record in timelines.items()
+            }
+        assert digests.closed == set(timelines)
+
+        # All timelines were closed and moved to the waiting state.
+        assert {entry.key for entry in backend.schedule(time.time())} == {*timelines, "waiting"}
+        with backend.digest_many(list(timelines), 0) as digests:
+            assert {key: list(records) for key, records in digests} == {
+                key: [] for key in timelines
+            }
+
+    def test_digest_many_failure_recovery(self):
+        backend = RedisBackend()
+
+        record_1 = Record("record:1", "value", time.time())
+        record_2 = Record("record:2", "value", time.time())
+        backend.add("timeline:1", record_1)
+        backend.add("timeline:2", record_2)
+
+        try:
+            with backend.digest_many(["timeline:1", "timeline:2"], 0) as digests:
+                for _ in digests:
+                    raise Exception("This causes the digests to not be closed.")
+        except Exception:
+            pass
+
+        # The claims have been released and the timelines are still ready.
+        with backend.digest("timeline:1", 0) as records:
+            assert set(records) == {record_1}
+
+        # Timelines that were not iterated are not closed.
+        with backend.digest_many(["timeline:2"], 0):
+            pass
+        with backend.digest("timeline:2", 0) as records:
+            assert set(records) == {record_2}
+
+    def test_digest_many_claimed(self):
+        backend = RedisBackend()
+
+        record = Record("record:1", "value", time.time())
+        backend.add("timeline", record)
+
+        with backend.digest("timeline", 0):
+            with backend.digest_many(["timeline"], 0) as digests:
+                assert list(digests) == []
+
+        backend.add(
+            "timeline", Record("record:2", "value", time.time()), increment_delay=0, maximum_delay=0
+        )
+        assert {entry.key for entry in backend.schedule(time.time())} == {"timeline"}
+
+        with backend.digest_many(["timeline"], 0) as digests:
+            assert [key for key, _ in digests] == ["timeline"]
+            with pytest.raises(UnableToAcquireLock):
+                with backend.digest("timeline", 0):
+                    pass
+
+    def test_digest_many_claim_expired(self):
+        backend = RedisBackend()
+
+        records = {f"timeline:{i}": Record(f"record:{i}", "value", time.time()) for i in range(3)}
+        for key, record in records.items():
+            backend.add(key, record)
+
+        def get_lock_client(key):
+            lock_key = f"{backend.namespace}:t:{key}"
+            return backend.locks.backend.get_client(lock_key, routing_key=lock_key)
+
+        with backend.digest_many(list(records), 0) as digests:
+            for key, _ in digests:
+                lock_key = backend.locks.backend.prefix_key(f"{backend.namespace}:t:{key}")
+                if key == "timeline:1":
+                    # The claim expires while the batch is being processed.
+                    get_lock_client(key).delete(lock_key)
+                elif key == "timeline:2":
+                    # The claim expires and is taken over by another worker.
+                    get_lock_client(key).set(lock_key, "other")
+
+        assert digests.closed == {"timeline:0"}
+
+        # The claim taken over by the other worker is left untouched.
+        lock_key = backend.locks.backend.prefix_key(f"{backend.namespace}:t:timeline:2")
+        assert get_lock_client("timeline:2").get(lock_key) == b"other"
+        get_lock_client("timeline:2").delete(lock_key)
+
+        # Timelines whose claim expired are not closed, and are still ready.
+        for key in ("timeline:1", "timeline:2"):
+            with backend.digest(key, 0) as digest:
+                assert set(digest) == {records[key]}
+        with pytest.raises(InvalidState):
+            with backend.digest("timeline:0", 0):
+                pass
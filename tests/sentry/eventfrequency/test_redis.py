@@ -0,0 +1,98 @@
+from datetime import timedelta
+
+from django.utils import timezone
+from freezegun import freeze_time
+
+from sentry.eventfrequency.redis import RedisFrequencyCounter
+from sentry.testutils import TestCase
+from sentry.tsdb.base import TSDBModel
+
+
+@freeze_time("2022-01-01 12:00:00")
+class RedisFrequencyCounterTest(TestCase):
+    def setUp(self):
+        self.backend = RedisFrequencyCounter()
+        self.now = timezone.now()
+
+    def record(self, group_id, is_new, users=("a", "b", "a", None), environment_id=1):
+        self.backend.record_multi(
+            [
+                (group_id, environment_id, self.now - timedelta(seconds=i), user, is_new)
+                for i, user in enumerate(users)
+            ]
+        )
+
+    def test_new_group(self):
+        group_id = self.create_group().id
+        self.record(group_id, True)
+        self.record(group_id, False, users=("c",), environment_id=2)
+
+        start = self.now - timedelta(minutes=5)
+        assert self.backend.get_totals(
+            [
+                (TSDBModel.group, group_id, start, self.now, None),
+                (TSDBModel.group, group_id, start, self.now, 1),
+                (TSDBModel.group, group_id, start, self.now, 2),
+                (TSDBModel.users_affected_by_group, group_id, start, self.now, None),
+                (TSDBModel.users_affected_by_group, group_id, start, self.now, 1),
+                (TSDBModel.project, group_id, start, self.now, None),
+            ]
+        ) == [5, 4, 1, 3, 2, None]
+
+    def test_existing_group(self):
+        group_id = self.create_group().id
+        self.record(group_id, False)
+
+        # earlier events of the group were not recorded
+        start = self.now - timedelta(minutes=5)
+        assert self.backend.get_totals([(TSDBModel.group, group_id, start, self.now, None)]) == [
+            None
+        ]
+
+        with freeze_time(self.now + timedelta(minutes=10)):
+            end = timezone.now()
+            assert self.backend.get_totals(
+                [(TSDBModel.group, group_id, end - timedelta(minutes=5), end, None)]
+            ) == [0]
+
+    def test_invalidate(self):
+        group_id = self.create_group().id
+        self.record(group_id, True)
+        self.backend.invalidate([group_id])
+
+        # e.g. the counts of a group merged into this one are missing
+        start = self.now - timedelta(minutes=5)
+        assert self.backend.get_totals([(TSDBModel.group, group_id, start, self.now, None)]) == [
+            None
+        ]
+
+        with freeze_time(self.now + timedelta(minutes=10)):
+            end = timezone.now()
+            self.backend.record_multi([(group_id, 1, end, "a", False)])
+            assert self.backend.get_totals(
+                [(TSDBModel.group, group_id, end - timedelta(minutes=5), end, None)]
+            ) == [None]
+            assert self.backend.get_totals([(TSDBModel.group, group_id, end, end, None)]) == [1]
+
+    def test_retention_window(self):
+        group_id = self.create_group().id
+        self.record(group_id, True)
+
+        # The window was taken a little before the query, as rules do.
+        end = self.now
+        with freeze_time(self.now + timedelta(seconds=5)):
+            assert self.backend.get_totals(
+                [(TSDBModel.group, group_id, end - timedelta(hours=1), end, None)]
+            ) == [4]
+
+    def test_outside_retention(self):
+        group_id = self.create_group().id
+        self.record(group_id, True)
+
+        end = self.now - timedelta(days=1)
+        assert self.backend.get_totals(
+            [(TSDBModel.group, group_id, end - timedelta(minutes=5), end, None)]
+        ) == [None]
+        assert self.backend.get_totals(
+            [(TSDBModel.group, group_id, self.now - timedelta(days=1), self.now, None)]
+        ) == [None]
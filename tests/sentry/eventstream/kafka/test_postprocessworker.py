@@ -4,13 +4,16 @@ import pytest
 
 from sentry import options
 from sentry.eventstream.kafka.postprocessworker import (
+    _BATCH_BY_GROUP_OPTION,
     _CONCURRENCY_OPTION,
+    _MAX_GROUP_BATCH_SIZE_OPTION,
     ErrorsPostProcessForwarderWorker,
     PostProcessForwarderWorker,
     TransactionsPostProcessForwarderWorker,
 )
 from sentry.eventstream.kafka.protocol import InvalidVersion
 from sentry.utils import json
+from sentry.utils.cache import cache_key_for_event
 
 
 @pytest.fixture
@@ -160,6 +163,86 @@ def test_post_process_forwarder_concurrency(kafka_message_payload):
     forwarder.shutdown()
 
 
+@pytest.mark.django_db
+@patch("sentry.eventstream.kafka.postprocessworker.post_process_group_batch")
+@patch("sentry.eventstream.kafka.postprocessworker.dispatch_post_process_group_task")
+def test_post_process_forwarder_batch_by_group(
+    dispatch_post_process_group_task, post_process_group_batch, kafka_message_payload
+):
+    """
+    Tests that events of the same group in a batch are post processed by a single task.
+    """
+    forwarder = PostProcessForwarderWorker(concurrency=1)
+    options.set(_BATCH_BY_GROUP_OPTION, True)
+
+    futures = []
+    for group_id, event_id in ((43, "a" * 32), (44, "b" * 32), (43, "c" * 32)):
+        kafka_message_payload[2] = {
+            **kafka_message_payload[2],
+            "group_id": group_id,
+            "event_id": event_id,
+        }
+        mock_message = Mock()
+        mock_message.value = MagicMock(return_value=json.dumps(kafka_message_payload))
+        mock_message.partition = MagicMock("1")
+        futures.append(forwarder.process_message(mock_message))
+
+    forwarder.flush_batch(futures)
+
+    dispatch_post_process_group_task.assert_called_once_with(
+        event_id="b" * 32,
+        project_id=1,
+        group_id=44,
+        primary_hash="311ee66a5b8e697929804ceb1c456ffe",
+        is_new=False,
+        is_regression=None,
+        is_new_group_environment=False,
+    )
+    assert post_process_group_batch.delay.call_count == 1
+    batch_kwargs = post_process_group_batch.delay.call_args[1]
+    assert batch_kwargs["group_id"] == 43
+    assert [event["cache_key"] for event in batch_kwargs["events"]] == [
+        cache_key_for_event({"project": 1, "event_id": event_id})
+        for event_id in ("a" * 32, "c" * 32)
+    ]
+
+    forwarder.shutdown()
+
+
+@pytest.mark.django_db
+@patch("sentry.eventstream.kafka.postprocessworker.post_process_group_batch")
+def test_post_process_forwarder_max_group_batch_size(
+    post_process_group_batch, kafka_message_payload
+):
+    """
+    Tests that the events of a group are split into tasks of the configured size.
+    """
+    forwarder = PostProcessForwarderWorker(concurrency=1)
+    options.set(_BATCH_BY_GROUP_OPTION, True)
+    options.set(_MAX_GROUP_BATCH_SIZE_OPTION, 2)
+
+    futures = []
+    for event_id in ("a" * 32, "b" * 32, "c" * 32):
+        kafka_message_payload[2] = {
+            **kafka_message_payload[2],
+            "group_id": 43,
+            "event_id": event_id,
+        }
+        mock_message = Mock()
+        mock_message.value = MagicMock(return_value=json.dumps(kafka_message_payload))
+        mock_message.partition = MagicMock("1")
+        futures.append(forwarder.process_message(mock_message))
+
+    forwarder.flush_batch(futures)
+
+    assert [len(call[1]["events"]) for call in post_process_group_batch.delay.call_args_list] == [
+        2,
+        1,
+    ]
+
+    forwarder.shutdown()
+
+
 @pytest.mark.django_db
 @patch("sentry.eventstream.kafka.postprocessworker.dispatch_post_process_group_task")
 def test_errors_post_process_forwarder_missing_headers(
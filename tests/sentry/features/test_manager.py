@@ -209,3 +209,56 @@ class FeatureManagerTest(TestCase):
         assert manager.has("organizations:feature", actor=self.user, organization=self.organization)
         assert manager.has("projects:feature", actor=self.user, project=self.project)
         assert manager.has("auth:register", actor=self.user)
+
+    def test_local_cache(self):
+        handler = mock.Mock(return_value=True)
+        handler.features = ["organizations:feature", "projects:feature"]
+        manager = features.FeatureManager()
+        manager.add("organizations:feature", features.OrganizationFeature)
+        manager.add("projects:feature", features.ProjectFeature)
+        manager.add_handler(handler)
+
+        # Checks are not cached outside of a scope by default.
+        assert manager.has("organizations:feature", self.organization)
+        assert manager.has("organizations:feature", self.organization)
+        assert len(handler.mock_calls) == 2
+
+        with mock.patch("sentry.features.cache.metrics.timing") as timing:
+            with manager.local_cache():
+                assert manager.has("organizations:feature", self.organization)
+                assert manager.has("organizations:feature", self.organization)
+                assert manager.has("projects:feature", self.project)
+                assert manager.has("projects:feature", self.project)
+                assert manager.has("organizations:feature", self.organization, actor=self.user)
+                assert len(handler.mock_calls) == 5
+
+                with manager.local_cache():
+                    assert manager.has("projects:feature", self.project)
+                    assert len(handler.mock_calls) == 5
+
+                # Changing options invalidates the scope.
+                self.organization.update_option("sentry:foo", "bar")
+                assert manager.has("organizations:feature", self.organization)
+                assert len(handler.mock_calls) == 6
+
+        timing.assert_called_once_with("features.local_cache.saved_checks", 3)
+
+        assert manager.has("organizations:feature", self.organization)
+        assert len(handler.mock_calls) == 7
+
+    def test_process_cache(self):
+        handler = mock.Mock(return_value=True)
+        handler.features = ["organizations:feature"]
+        manager = features.FeatureManager()
+        manager.add("organizations:feature", features.OrganizationFeature)
+        manager.add_handler(handler)
+
+        with self.settings(SENTRY_FEATURES_LOCAL_CACHE_TTL=60):
+            assert manager.has("organizations:feature", self.organization)
+            assert manager.has("organizations:feature", self.organization)
+            assert len(handler.mock_calls) == 1
+
+            # Registering handlers invalidates the cache.
+            manager.add_handler(mock.Mock(return_value=None, features=[]))
+            assert manager.has("organizations:feature", self.organization)
+            assert len(handler.mock_calls) == 2
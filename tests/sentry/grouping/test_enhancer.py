@@ -1,7 +1,17 @@
+from copy import deepcopy
+from itertools import chain
+
 import pytest
 
 from sentry.grouping.component import GroupingComponent
-from sentry.grouping.enhancer import Enhancements, InvalidEnhancerConfig, create_match_frame
+from sentry.grouping.enhancer import (
+    ENHANCEMENT_BASES,
+    Enhancements,
+    InvalidEnhancerConfig,
+    create_match_frame,
+)
+from sentry.utils.safe import get_path
+from tests.sentry.grouping import grouping_input as grouping_inputs
 
 
 def dump_obj(obj):
@@ -412,3 +422,103 @@ def test_sentinel_and_prefix(action, type):
     actions[0][1].update_frame_components_contributions([component], frames, 0)
     expected = action == "+"
     assert getattr(component, f"is_{type}_frame") is expected
+
+
+def _iter_frame_lists(data):
+    for container in chain(
+        get_path(data, "exception", "values", filter=True) or (),
+        get_path(data, "threads", "values", filter=True) or (),
+        [data],
+    ):
+        frames = get_path(container, "stacktrace", "frames", filter=True)
+        if frames:
+            yield frames, container if container is not data else None
+
+
+def _apply_rules_naive(rules, frames, platform, exception_data, modify):
+    """Checks every rule against every frame, in rule order."""
+    match_frames = [create_match_frame(frame, platform) for frame in frames]
+    cache = {}
+    rv = []
+    for rule in rules:
+        for idx, action in rule.get_matching_frame_actions(
+            match_frames, platform, exception_data, cache
+        ):
+            rv.append((rule, idx, action))
+            if modify:
+                action.apply_modifications_to_frame(frames, match_frames, idx, rule=rule)
+    return rv, match_frames
+
+
+def _apply_rules_indexed(index, frames, platform, exception_data, modify):
+    match_frames = [create_match_frame(frame, platform) for frame in frames]
+    rv = []
+    for rule, idx, action in index.iter_matching_frame_actions(
+        match_frames, platform, exception_data, {}
+    ):
+        rv.append((rule, idx, action))
+        if modify:
+            action.apply_modifications_to_frame(frames, match_frames, idx, rule=rule)
+    return rv, match_frames
+
+
+@pytest.mark.parametrize("base_id", sorted(ENHANCEMENT_BASES))
+def test_rule_index_matches_naive_matching(base_id):
+    """
+    The rule index must produce exactly the matches of checking every rule
+    against every frame, for the built-in configs and all grouping inputs.
+    """
+    enhancements = ENHANCEMENT_BASES[base_id]
+
+    for grouping_input in grouping_inputs:
+        data = grouping_input.data
+        platform = data.get("platform")
+        for frames, exception_data in _iter_frame_lists(data):
+            for index, modify in (
+                (enhancements._modifier_rules, True),
+                (enhancements._updater_rules, False),
+            ):
+                naive_frames = deepcopy(frames)
+                indexed_frames = deepcopy(frames)
+                expected = _apply_rules_naive(
+                    index.rules, naive_frames, platform, exception_data, modify
+                )
+                actual = _apply_rules_indexed(
+                    index, indexed_frames, platform, exception_data, modify
+                )
+                assert actual == expected, grouping_input.filename
+                assert indexed_frames == naive_frames, grouping_input.filename
+
+
+def test_rule_index_literal_prefixes():
+    enhancements = Enhancements.from_config_string(
+        """
+        function:std::*                   -group
+        function:main                     -group
+        family:javascript function:main   +app
+        module:foo.bar                    +group
+        !function:main                    +group
+        function:ma?n                     -app
+        """
+    )
+    index = enhancements._updater_rules
+    assert [rule._index_key for rule in index] == [
+        ("function", b"std::", False),
+        ("function", b"main", True),
+        ("function", b"main", True),
+        ("module", b"foo.bar", True),
+        None,
+        ("function", b"ma", False),
+    ]
+
+    match_frames = [
+        create_match_frame({"function": "main", "platform": "native"}, "native"),
+        create_match_frame({"function": "std::foo", "module": "foo.bar"}, "native"),
+    ]
+    candidates = index._get_candidate_frames(match_frames)
+    assert list(candidates[0]) == [1]
+    assert list(candidates[1]) == [0]
+    assert 2 not in candidates
+    assert list(candidates[3]) == [1]
+    assert list(candidates[4]) == [0, 1]
+    assert list(candidates[5]) == [0]
@@ -0,0 +1,63 @@
+import time
+
+import msgpack
+import pytest
+
+from sentry.event_manager import EventManager
+from sentry.ingest.ingest_consumer import IngestConsumerWorker
+from sentry.testutils.helpers.options import override_options
+from sentry.utils import json
+from sentry.utils.samples import load_data
+
+BATCH_SIZE = 100
+
+
+def benchmark_available():
+    try:
+        import pytest_benchmark  # NOQA
+    except ModuleNotFoundError:
+        return False
+    else:
+        return True
+
+
+def build_batch(project):
+    """
+    Records a batch of transaction messages in the wire format of the ingest
+    topic.
+    """
+    batch = []
+    for _ in range(BATCH_SIZE):
+        manager = EventManager(load_data("transaction"), project=project)
+        manager.normalize()
+        payload = dict(manager.get_data())
+        batch.append(
+            msgpack.packb(
+                {
+                    "type": "event",
+                    "payload": json.dumps(payload),
+                    "start_time": time.time(),
+                    "event_id": payload["event_id"],
+                    "project_id": project.id,
+                    "remote_addr": "127.0.0.1",
+                }
+            )
+        )
+    return batch
+
+
+@pytest.mark.skipif(not benchmark_available(), reason="requires pytest-benchmark")
+@pytest.mark.django_db
+@pytest.mark.parametrize("batched", [False, True], ids=["per_event", "batched"])
+def test_benchmark_flush_batch(default_project, task_runner, batched, benchmark):
+    worker = IngestConsumerWorker()
+
+    def setup():
+        # Every round needs new event ids to get past deduplication.
+        messages = [
+            msgpack.unpackb(value, use_list=False) for value in build_batch(default_project)
+        ]
+        return (messages,), {}
+
+    with override_options({"store.save-transactions-ingest-consumer-batch": batched}):
+        benchmark.pedantic(worker.flush_batch, setup=setup, rounds=10)
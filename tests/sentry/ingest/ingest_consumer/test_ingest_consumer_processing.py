@@ -5,14 +5,19 @@ from unittest.mock import Mock
 
 import pytest
 
+from sentry import event_manager, nodestore
 from sentry.event_manager import EventManager
+from sentry.eventstore.models import Event
+from sentry.eventstore.processing import event_processing_store
 from sentry.ingest.ingest_consumer import (
+    IngestConsumerWorker,
     process_attachment_chunk,
     process_event,
     process_individual_attachment,
     process_userreport,
 )
 from sentry.models import EventAttachment, EventUser, File, UserReport
+from sentry.testutils.helpers.options import override_options
 from sentry.utils import json
 
 
@@ -118,6 +123,118 @@ def test_transactions_spawn_save_event_transaction(
     )
 
 
+def get_transaction_message(project, start_time):
+    now = datetime.datetime.now()
+    payload = get_normalized_event(
+        {
+            "type": "transaction",
+            "timestamp": now.isoformat(),
+            "start_timestamp": now.isoformat(),
+            "spans": [],
+            "contexts": {
+                "trace": {
+                    "type": "trace",
+                    "op": "foobar",
+                    "trace_id": uuid.uuid4().hex,
+                    "span_id": uuid.uuid4().hex[:16],
+                    "status": "ok",
+                }
+            },
+        },
+        project,
+    )
+    return {
+        "type": "event",
+        "payload": json.dumps(payload),
+        "start_time": start_time,
+        "event_id": payload["event_id"],
+        "project_id": project.id,
+        "remote_addr": "127.0.0.1",
+    }
+
+
+@pytest.mark.django_db
+def test_transaction_batch_saved_inline(
+    default_project, task_runner, preprocess_event, save_event_transaction
+):
+    start_time = time.time() - 3600
+    messages = [get_transaction_message(default_project, start_time) for _ in range(3)]
+    error_payload = get_normalized_event({"message": "hello world"}, default_project)
+    messages.append(
+        {
+            "type": "event",
+            "payload": json.dumps(error_payload),
+            "start_time": start_time,
+            "event_id": error_payload["event_id"],
+            "project_id": default_project.id,
+            "remote_addr": "127.0.0.1",
+        }
+    )
+
+    with override_options({"store.save-transactions-ingest-consumer-batch": True}):
+        IngestConsumerWorker().flush_batch(messages)
+
+    assert not save_event_transaction.delay.called
+    (kwargs,) = preprocess_event
+    assert kwargs["event_id"] == error_payload["event_id"]
+
+    for message in messages[:3]:
+        event_id = message["event_id"]
+        assert nodestore.get(Event.generate_node_id(default_project.id, event_id))
+        data = event_processing_store.get(f"e:{event_id}:{default_project.id}")
+        assert data["event_id"] == event_id
+        assert data["type"] == "transaction"
+
+
+@pytest.mark.django_db
+def test_transaction_batch_falls_back_to_tasks(
+    default_project, task_runner, preprocess_event, save_event_transaction, monkeypatch
+):
+    start_time = time.time() - 3600
+    messages = [get_transaction_message(default_project, start_time) for _ in range(3)]
+    bad_event_id = messages[1]["event_id"]
+
+    def prepare_transaction_events(jobs, projects):
+        if any(job["data"]["event_id"] == bad_event_id for job in jobs):
+            raise Exception("boom")
+        return event_manager.prepare_transaction_events(jobs, projects)
+
+    monkeypatch.setattr(
+        "sentry.ingest.ingest_consumer.prepare_transaction_events", prepare_transaction_events
+    )
+
+    with override_options({"store.save-transactions-ingest-consumer-batch": True}):
+        IngestConsumerWorker().flush_batch(messages)
+
+    # Only the event that cannot be prepared is handed to the task
+    assert not preprocess_event
+    assert [call[1]["event_id"] for call in save_event_transaction.delay.call_args_list] == [
+        bad_event_id
+    ]
+    for message in (messages[0], messages[2]):
+        assert nodestore.get(Event.generate_node_id(default_project.id, message["event_id"]))
+
+
+@pytest.mark.django_db
+def test_transaction_batch_not_saved_again_after_commit_failure(
+    default_project, task_runner, preprocess_event, save_event_transaction, monkeypatch
+):
+    def broken_commit(jobs):
+        raise Exception("boom")
+
+    monkeypatch.setattr("sentry.ingest.ingest_consumer.commit_transaction_events", broken_commit)
+
+    start_time = time.time() - 3600
+    messages = [get_transaction_message(default_project, start_time) for _ in range(2)]
+
+    with override_options({"store.save-transactions-ingest-consumer-batch": True}):
+        IngestConsumerWorker().flush_batch(messages)
+
+    # Counters may have been recorded already, so the events are not saved again
+    assert not preprocess_event
+    assert not save_event_transaction.delay.called
+
+
 @pytest.mark.django_db
 @pytest.mark.parametrize("missing_chunks", (True, False))
 def test_with_attachments(default_project, task_runner, missing_chunks, monkeypatch):
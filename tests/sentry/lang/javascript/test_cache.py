@@ -1,6 +1,9 @@
 from unittest import TestCase
 
-from sentry.lang.javascript.cache import SourceCache
+from symbolic import SourceView
+
+from sentry.lang.javascript.cache import ParsedArtifactCache, SourceCache
+from sentry.testutils.helpers.options import override_options
 
 
 class BasicCacheTest(TestCase):
@@ -37,3 +40,44 @@ class BasicCacheTest(TestCase):
         # fall back to utf-8
         cache.add(url, "foobar".encode("utf-32"), encoding="utf-32")
         assert cache.get(url)[0] == "foobar"
+
+
+class ParsedArtifactCacheTest(TestCase):
+    def setUp(self):
+        self.cache = ParsedArtifactCache()
+        self.parsed = []
+
+    def parse(self, body):
+        def parse():
+            self.parsed.append(body)
+            return SourceView.from_bytes(body)
+
+        return parse
+
+    @override_options(
+        {"sourcemaps.local-cache.max-bytes": 1024, "sourcemaps.local-cache.ttl": 60.0}
+    )
+    def test_reuses_parsed_artifacts(self):
+        cache_key = "release:foo.js"
+        assert self.cache.get(cache_key) is None
+
+        view = self.cache.get_or_parse(cache_key, b"foo\nbar", self.parse(b"foo\nbar"))
+        assert view[0] == "foo"
+        assert self.cache.get(cache_key) is view
+
+        # same contents are not parsed again
+        assert self.cache.get_or_parse(cache_key, b"foo\nbar", self.parse(b"foo\nbar")) is view
+        assert self.parsed == [b"foo\nbar"]
+
+        # changed contents are
+        view = self.cache.get_or_parse(cache_key, b"baz", self.parse(b"baz"))
+        assert view[0] == "baz"
+        assert self.cache.get(cache_key) is view
+        assert self.parsed == [b"foo\nbar", b"baz"]
+
+    @override_options({"sourcemaps.local-cache.max-bytes": 10, "sourcemaps.local-cache.ttl": 60.0})
+    def test_max_bytes(self):
+        self.cache.get_or_parse("a.js", b"a" * 8, self.parse(b"a" * 8))
+        self.cache.get_or_parse("b.js", b"b" * 8, self.parse(b"b" * 8))
+        assert self.cache.get("a.js") is None
+        assert self.cache.get("b.js") is not None
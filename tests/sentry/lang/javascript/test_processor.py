@@ -1372,3 +1372,90 @@ class CacheSourceTest(TestCase):
         # now we have an error
         assert len(processor.cache.get_errors(abs_path)) == 1
         assert processor.cache.get_errors(abs_path)[0] == {"url": map_url, "type": "js_no_source"}
+
+    @responses.activate
+    def test_parsed_artifacts_respect_allow_scraping(self):
+        url = "http://example.com/shared.js"
+        responses.add(responses.GET, url, body="foo", content_type="application/javascript")
+
+        project = self.create_project()
+        other_project = self.create_project()
+        other_project.update_option("sentry:scrape_javascript", False)
+
+        with override_options({"sourcemaps.local-cache.max-bytes": 1024}):
+            processor = JavaScriptStacktraceProcessor(
+                data={}, stacktrace_infos=None, project=project
+            )
+            processor.cache_source(url)
+            assert processor.cache.get(url)[0] == "foo"
+
+            # the file parsed for the first project must not be served to a
+            # project that is not allowed to scrape it
+            processor = JavaScriptStacktraceProcessor(
+                data={}, stacktrace_infos=None, project=other_project
+            )
+            processor.cache_source(url)
+
+        assert processor.cache.get(url) is None
+        assert processor.cache.get_errors(url) == [
+            {"type": EventError.JS_MISSING_SOURCE, "url": url}
+        ]
+        assert len(responses.calls) == 1
+
+    @patch("sentry.lang.javascript.processor.fetch_file")
+    def test_populate_source_cache_concurrently(self, mock_fetch_file):
+        sourcemap = b'{"version": 3, "sources": ["a.ts"], "names": [], "mappings": "AAAA"}'
+        files = {
+            "app:///a.js": b"a\n//# sourceMappingURL=a.js.map",
+            "app:///a.js.map": sourcemap,
+            "app:///b.js": b"b\n//# sourceMappingURL=broken.js.map",
+        }
+
+        def fetch_file(url, **kwargs):
+            if url not in files:
+                raise http.BadSource({"type": EventError.JS_MISSING_SOURCE, "url": url})
+            return http.UrlResult(url, {}, files[url], 200, None)
+
+        mock_fetch_file.side_effect = fetch_file
+
+        project = self.create_project()
+        processor = JavaScriptStacktraceProcessor(data={}, stacktrace_infos=None, project=project)
+        frames = [{"abs_path": url} for url in ("app:///a.js", "app:///b.js", "app:///c.js")]
+
+        with override_options({"sourcemaps.concurrent-fetches": True}):
+            processor.populate_source_cache(frames)
+
+        assert processor.cache.get("app:///a.js")[0] == "a"
+        assert processor.sourcemaps.get_link("app:///a.js")[0] == "app:///a.js.map"
+        assert processor.cache.get_errors("app:///a.js") == []
+
+        assert processor.cache.get("app:///b.js")[0] == "b"
+        assert processor.cache.get_errors("app:///b.js") == [
+            {"type": EventError.JS_MISSING_SOURCE, "url": "app:///broken.js.map"}
+        ]
+
+        assert processor.cache.get("app:///c.js") is None
+        assert processor.cache.get_errors("app:///c.js") == [
+            {"type": EventError.JS_MISSING_SOURCE, "url": "app:///c.js"}
+        ]
+        assert processor.fetch_count == 3
+
+    @patch("sentry.lang.javascript.processor.fetch_file")
+    def test_populate_source_cache_concurrently_max_fetches(self, mock_fetch_file):
+        mock_fetch_file.side_effect = lambda url, **kwargs: http.UrlResult(
+            url, {}, b"foo", 200, None
+        )
+
+        project = self.create_project()
+        processor = JavaScriptStacktraceProcessor(data={}, stacktrace_infos=None, project=project)
+        processor.max_fetches = 1
+        frames = [{"abs_path": "app:///a.js"}, {"abs_path": "app:///b.js"}]
+
+        with override_options({"sourcemaps.concurrent-fetches": True}):
+            processor.populate_source_cache(frames)
+
+        assert mock_fetch_file.call_count == 1
+        errors = processor.cache.get_errors("app:///a.js") + processor.cache.get_errors(
+            "app:///b.js"
+        )
+        assert errors == [{"type": EventError.JS_TOO_MANY_REMOTE_SOURCES}]
@@ -1,10 +1,21 @@
 import copy
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
 
 import pytest
 
+from sentry.cache import default_cache
 from sentry.lang.native import symbolicator
-from sentry.lang.native.symbolicator import get_sources_for_project, redact_internal_sources
+from sentry.lang.native.symbolicator import (
+    Symbolicator,
+    get_sources_for_project,
+    redact_internal_sources,
+)
+from sentry.tasks.symbolication import RetrySymbolication
 from sentry.testutils.helpers import Feature
+from sentry.testutils.helpers.options import override_options
+from sentry.utils import json
 
 CUSTOM_SOURCE_CONFIG = """
 [{
@@ -104,6 +115,88 @@ def test_sources_custom_disabled(default_project):
     assert source_ids == ["sentry:project"]
 
 
+class FakeSymbolicator(BaseHTTPRequestHandler):
+    """Answers every task with ``pending`` until it has been polled `polls` times."""
+
+    def log_message(self, *args):
+        pass
+
+    def respond(self, status):
+        body = json.dumps({"status": status, "request_id": "req-1", "retry_after": 1}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        self.server.requests.append(("POST", urlparse(self.path).path, None))
+        self.respond("pending")
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        timeout = parse_qs(url.query)["timeout"][0]
+        self.server.requests.append(("GET", url.path, timeout))
+        polls = sum(1 for method, _, _ in self.server.requests if method == "GET")
+        self.respond("completed" if polls >= self.server.polls else "pending")
+
+
+@pytest.fixture
+def fake_symbolicator():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeSymbolicator)
+    server.requests = []
+    server.polls = 2
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        with override_options(
+            {"symbolicator.options": {"url": "http://127.0.0.1:%s" % server.server_port}}
+        ):
+            yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.mark.django_db
+def test_long_poll(default_project, fake_symbolicator, settings):
+    settings.SYMBOLICATOR_POLL_TIMEOUT = 1
+
+    with override_options({"symbolicator.long-poll": True}):
+        response = Symbolicator(default_project, "a" * 32).process_payload([], [])
+
+    assert response["status"] == "completed"
+    assert fake_symbolicator.requests == [
+        ("POST", "/symbolicate", None),
+        ("GET", "/requests/req-1", "1"),
+        ("GET", "/requests/req-1", "1"),
+    ]
+    assert (
+        default_cache.get(symbolicator._task_id_cache_key_for_event(default_project.id, "a" * 32))
+        is None
+    )
+
+
+@pytest.mark.django_db
+def test_long_poll_falls_back_to_retry(default_project, fake_symbolicator):
+    task_id_cache_key = symbolicator._task_id_cache_key_for_event(default_project.id, "a" * 32)
+
+    with override_options(
+        {"symbolicator.long-poll": True, "symbolicator.long-poll.max-wait": 0.0}
+    ), pytest.raises(RetrySymbolication):
+        Symbolicator(default_project, "a" * 32).process_payload([], [])
+
+    assert default_cache.get(task_id_cache_key) == "req-1"
+
+    # A new attempt resumes polling the same task.
+    with override_options({"symbolicator.long-poll": True}):
+        response = Symbolicator(default_project, "a" * 32).process_payload([], [])
+
+    assert response["status"] == "completed"
+    assert [method for method, _, _ in fake_symbolicator.requests] == ["POST", "GET", "GET"]
+
+
 class TestInternalSourcesRedaction:
     def test_custom_untouched(self):
         debug_id = "451a38b5-0679-79d2-0738-22a5ceb24c4b"
@@ -1,13 +1,16 @@
+import base64
 import pickle
+import zlib
 from datetime import timedelta
 from unittest import mock
 
 import pytest
 from django.utils import timezone
 
-from sentry.nodestore.base import json_dumps
+from sentry.nodestore.base import BINARY_MAGIC, json_dumps
 from sentry.nodestore.django.backend import DjangoNodeStorage
 from sentry.nodestore.django.models import Node
+from sentry.testutils.helpers.options import override_options
 from sentry.utils.strings import compress
 
 
@@ -51,6 +54,25 @@ class TestDjangoNodeStorage:
             b'{"foo":"bar"}'
         )
 
+    def test_set_binary_format(self):
+        with override_options({"nodestore.binary-format": True}):
+            self.ns.set("d2502ebbd7df41ceba8d3275595cac33", {"foo": "bar"})
+
+        # Binary nodes without compressed subkeys are compressed as a whole
+        data = Node.objects.get(id="d2502ebbd7df41ceba8d3275595cac33").data
+        value = zlib.decompress(base64.b64decode(data))
+        assert value.startswith(BINARY_MAGIC)
+        assert self.ns.get("d2502ebbd7df41ceba8d3275595cac33") == {"foo": "bar"}
+
+        with override_options(
+            {"nodestore.binary-format": True, "nodestore.binary-format-zstd": True}
+        ):
+            self.ns.set("5394aa025b8e401ca6bc3ddee3130edc", {"foo": "baz"})
+
+        data = Node.objects.get(id="5394aa025b8e401ca6bc3ddee3130edc").data
+        assert base64.b64decode(data).startswith(BINARY_MAGIC)
+        assert self.ns.get("5394aa025b8e401ca6bc3ddee3130edc") == {"foo": "baz"}
+
     def test_delete(self):
         node = Node.objects.create(id="d2502ebbd7df41ceba8d3275595cac33", data=b'{"foo": "bar"}')
 
@@ -0,0 +1,63 @@
+import copy
+import tracemalloc
+
+import pytest
+
+from sentry.nodestore.base import NodeStorage
+from sentry.utils import json
+from sentry.utils.samples import load_data
+
+
+def benchmark_available():
+    try:
+        import pytest_benchmark  # NOQA
+    except ModuleNotFoundError:
+        return False
+    else:
+        return True
+
+
+def make_native_payload(num_threads=50):
+    """
+    Builds a large native crash by replicating the threads and debug images
+    of the native sample event.
+    """
+    data = load_data("native")
+    threads = data.get("threads", {}).get("values") or []
+    data["threads"] = {
+        "values": [
+            dict(copy.deepcopy(thread), id=i) for i in range(num_threads) for thread in threads
+        ]
+    }
+    data["debug_meta"]["images"] = data["debug_meta"]["images"] * num_threads
+    return data
+
+
+def encode_node(fmt):
+    payload = make_native_payload()
+    data = {None: payload, "unprocessed": payload}
+    ns = NodeStorage()
+    if fmt == "lines":
+        return ns._encode(data)
+    return ns._encode_binary(data, compress=fmt == "binary-zstd")
+
+
+FORMATS = ["lines", "binary", "binary-zstd"]
+
+
+@pytest.mark.skipif(not benchmark_available(), reason="requires pytest-benchmark")
+@pytest.mark.parametrize("fmt", FORMATS)
+@pytest.mark.parametrize("subkey", [None, "unprocessed"], ids=["default", "unprocessed"])
+def test_benchmark_decode(fmt, subkey, benchmark):
+    ns = NodeStorage()
+    value = encode_node(fmt)
+
+    tracemalloc.start()
+    expected = ns._decode(value, subkey=subkey)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    benchmark.extra_info["bytes"] = len(value)
+    benchmark.extra_info["peak_memory"] = peak
+    result = benchmark(ns._decode, value, subkey)
+    assert json.dumps(result) == json.dumps(expected)
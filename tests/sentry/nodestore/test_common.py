@@ -7,6 +7,7 @@ from contextlib import contextmanager
 import pytest
 
 from sentry.nodestore.django.backend import DjangoNodeStorage
+from sentry.testutils.helpers.options import override_options
 from tests.sentry.nodestore.bigtable.backend.tests import (
     MockedBigtableNodeStorage,
     get_temporary_bigtable_nodestorage,
@@ -97,3 +98,20 @@ def test_set_subkeys(ns):
     ns.delete("node_1")
     assert ns.get("node_1") is None
     assert ns.get("node_1", subkey="other") is None
+
+
+@pytest.mark.parametrize("compress", [False, True], ids=["raw", "zstd"])
+def test_set_subkeys_binary_format(ns, compress):
+    with override_options(
+        {"nodestore.binary-format": True, "nodestore.binary-format-zstd": compress}
+    ):
+        ns.set_subkeys("node_1", {None: {"foo": "a"}, "other": {"foo": "b"}})
+
+    assert ns.get("node_1") == {"foo": "a"}
+    assert ns.get("node_1", subkey="other") == {"foo": "b"}
+    assert ns.get("node_1", subkey="missing") is None
+    assert ns.get_multi(["node_1"], subkey="other") == {"node_1": {"foo": "b"}}
+
+    # Nodes written in the old format are still read after switching over
+    ns.set_subkeys("node_2", {None: {"foo": "c"}, "other": {"foo": "d"}})
+    assert ns.get("node_2", subkey="other") == {"foo": "d"}
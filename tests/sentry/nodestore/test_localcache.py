@@ -0,0 +1,116 @@
+import threading
+from unittest import mock
+
+import pytest
+
+from sentry.nodestore.localcache import NodeLocalCache
+from sentry.testutils.helpers.options import override_options
+
+OPTIONS = {
+    "nodestore.local-cache.max-bytes": 1024 * 1024,
+    "nodestore.local-cache.ttl": 60.0,
+    "nodestore.local-cache.negative-ttl": 60.0,
+}
+
+
+@pytest.fixture
+def local_cache():
+    with override_options(OPTIONS):
+        yield NodeLocalCache()
+
+
+def test_read_through(local_cache):
+    fetch = mock.Mock(return_value={"a": b"{}", "b": None})
+    assert local_cache.enabled
+    assert local_cache.get_many(["a", "b"], fetch) == {"a": b"{}", "b": None}
+    fetch.assert_called_once_with(["a", "b"])
+
+    # Both the hit and the miss are served from memory now
+    assert local_cache.get_many(["a", "b"], fetch) == {"a": b"{}", "b": None}
+    assert fetch.call_count == 1
+
+    local_cache.invalidate(["a"])
+    local_cache.get_many(["a", "b"], fetch)
+    assert fetch.call_count == 2
+    assert fetch.call_args == mock.call(["a"])
+
+
+def test_disabled():
+    with override_options({"nodestore.local-cache.max-bytes": 0}):
+        assert not NodeLocalCache().enabled
+
+
+def test_fetch_error(local_cache):
+    fetch = mock.Mock(side_effect=ValueError)
+    with pytest.raises(ValueError):
+        local_cache.get_many(["a"], fetch)
+
+    fetch = mock.Mock(return_value={"a": b"{}"})
+    assert local_cache.get_many(["a"], fetch) == {"a": b"{}"}
+
+
+def test_fetch_base_exception(local_cache):
+    fetch = mock.Mock(side_effect=KeyboardInterrupt)
+    with pytest.raises(KeyboardInterrupt):
+        local_cache.get_many(["a"], fetch)
+
+    # Later reads are not left waiting for the aborted one
+    fetch = mock.Mock(return_value={"a": b"{}"})
+    assert local_cache.get_many(["a"], fetch) == {"a": b"{}"}
+
+
+def test_store_error(local_cache):
+    fetch = mock.Mock(return_value={"a": b"{}"})
+    with mock.patch.object(local_cache.lru, "set", side_effect=ValueError):
+        with pytest.raises(ValueError):
+            local_cache.get_many(["a"], fetch)
+
+    assert local_cache.get_many(["a"], fetch) == {"a": b"{}"}
+    assert fetch.call_count == 2
+
+
+def test_invalidated_during_read(local_cache):
+    def fetch(id_list):
+        # The node is written while its old contents are being read
+        local_cache.invalidate(["a"])
+        return {"a": b"old"}
+
+    assert local_cache.get_many(["a"], fetch) == {"a": b"old"}
+
+    fetch = mock.Mock(return_value={"a": b"new"})
+    assert local_cache.get_many(["a"], fetch) == {"a": b"new"}
+    assert fetch.call_count == 1
+
+
+def test_batches_concurrent_reads(local_cache):
+    reading = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def fetch(id_list):
+        calls.append(sorted(id_list))
+        if len(calls) == 1:
+            reading.set()
+            release.wait()
+        return {id: id.encode("utf-8") for id in id_list}
+
+    results = {}
+
+    def read(id_list):
+        results.update(local_cache.get_many(id_list, fetch))
+
+    leader = threading.Thread(target=read, args=(["a"],))
+    leader.start()
+    reading.wait()
+
+    # Requested while the first read is in flight, these are read together.
+    followers = [threading.Thread(target=read, args=([id],)) for id in ("a", "b", "c")]
+    for thread in followers:
+        thread.start()
+    release.set()
+    for thread in [leader] + followers:
+        thread.join()
+
+    assert results == {"a": b"a", "b": b"b", "c": b"c"}
+    assert calls[0] == ["a"]
+    assert sorted(id for batch in calls[1:] for id in batch) == ["b", "c"]
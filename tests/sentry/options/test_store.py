@@ -149,3 +149,66 @@ class OptionsStoreTest(TestCase):
         mocked_time.return_value = 26
         store.clean_local_cache()
         assert not store._local_cache
+
+    @patch("sentry.options.store.time")
+    def test_poll_drops_changed_keys(self, mocked_time):
+        store = self.store
+        mocked_time.return_value = 0
+        key1, key2 = self.make_key(10, 0), self.make_key(10, 0)
+        store.set(key1, "foo")
+        store.set(key2, "bar")
+
+        worker = OptionsStore(cache=store.cache, poll_interval=5)
+        worker.warm([key1, key2])
+        assert worker._version == 2
+
+        store.set(key1, "baz")
+
+        with patch.object(Option.objects, "get_queryset", side_effect=RuntimeError()):
+            with patch.object(store.cache, "get_many", side_effect=RuntimeError()):
+                # Not polled yet
+                mocked_time.return_value = 4
+                assert worker.get(key1) == "foo"
+
+        # Values are kept beyond their TTL until they change.
+        mocked_time.return_value = 60
+        assert worker.get(key1) == "baz"
+        assert worker._version == 3
+
+        with patch.object(Option.objects, "get_queryset", side_effect=RuntimeError()):
+            with patch.object(store.cache, "get", side_effect=RuntimeError()):
+                assert worker.get(key2) == "bar"
+
+    @patch("sentry.options.store.time")
+    def test_poll_flushes_on_missing_changes(self, mocked_time):
+        store = self.store
+        mocked_time.return_value = 0
+        key1, key2 = self.make_key(), self.make_key()
+        store.set(key1, "foo")
+        store.set(key2, "bar")
+
+        worker = OptionsStore(cache=store.cache, poll_interval=5)
+        worker.warm([key1, key2])
+
+        store.set(key1, "baz")
+        store.cache.delete("o:change:3")
+
+        mocked_time.return_value = 5
+        worker.poll()
+        assert not worker._local_cache
+
+    def test_warm(self):
+        store = self.store
+        key1, key2, key3 = self.make_key(), self.make_key(), self.make_key()
+        store.set(key1, "foo")
+        store.set(key2, "bar")
+        store.cache.delete(key2.cache_key)
+        store.flush_local_cache()
+
+        with self.assertNumQueries(1):
+            store.warm([key1, key2, key3])
+
+        assert store._local_cache[key1.cache_key][0] == "foo"
+        assert store._local_cache[key2.cache_key][0] == "bar"
+        assert key3.cache_key not in store._local_cache
+        assert store.cache.get(key2.cache_key) == "bar"
@@ -1,8 +1,11 @@
+from unittest import mock
+
 import pytest
 
-from sentry.models import ProjectKey
+from sentry import features
+from sentry.models import ProjectKey, ProjectKeyStatus
 from sentry.models.transaction_threshold import TransactionMetric
-from sentry.relay.config import get_project_config
+from sentry.relay.config import get_project_config, get_project_configs
 from sentry.testutils.helpers import Feature
 from sentry.utils.safe import get_path
 
@@ -171,3 +174,83 @@ def test_project_config_with_span_attributes(default_project, insta_snapshot):
 
     cfg = cfg.to_dict()
     insta_snapshot(cfg["config"]["spanAttributes"])
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("has_custom_filters", [False, True])
+def test_get_project_configs(factories, default_project, has_custom_filters):
+    other_project = factories.create_project(organization=default_project.organization)
+    other_project.update_option("sentry:error_messages", ["some_error"])
+    other_project.update_option("sentry:relay_pii_config", PII_CONFIG)
+    default_project.organization.update_option(
+        "sentry:trusted-relays", [{"public_key": "abc"}, None]
+    )
+    inactive_key = ProjectKey.objects.create(
+        project=other_project, status=ProjectKeyStatus.INACTIVE
+    )
+
+    projects = [default_project, other_project]
+    keys = list(ProjectKey.objects.filter(project__in=projects))
+
+    with Feature(
+        {
+            "organizations:filters-and-sampling": True,
+            "projects:custom-inbound-filters": has_custom_filters,
+        }
+    ):
+        configs = get_project_configs(projects, keys, full_config=True)
+        expected = {
+            key.public_key: get_project_config(key.project, project_keys=[key]).to_dict()
+            for key in keys
+            if key.status == ProjectKeyStatus.ACTIVE
+        }
+
+    assert inactive_key.public_key not in configs
+    assert configs.keys() == expected.keys()
+    for public_key, cfg in configs.items():
+        cfg = cfg.to_dict()
+        for key in ("lastFetch", "lastChange", "rev"):
+            cfg.pop(key)
+            expected[public_key].pop(key)
+        assert cfg == expected[public_key]
+        assert cfg["config"]["trustedRelays"] == ["abc"]
+
+
+@pytest.mark.django_db
+def test_get_project_configs_feature_handlers(factories, default_project):
+    feature = "projects:custom-inbound-filters"
+    other_project = factories.create_project(organization=default_project.organization)
+    for project in (default_project, other_project):
+        project.update_option("sentry:error_messages", ["some_error"])
+
+    class EntityHandler(features.FeatureHandler):
+        features = {feature}
+
+        def has(self, feature, actor):
+            return True
+
+        def batch_has(self, feature_names, actor, projects=None, organization=None, batch=True):
+            return {f"project:{project.id}": {feature: True} for project in projects}
+
+    class ProjectHandler(features.FeatureHandler):
+        features = {feature}
+
+        def has(self, feature, actor):
+            return False if feature.project.id == other_project.id else None
+
+    manager = features.default_manager
+    with mock.patch.dict(
+        manager._handler_registry, {feature: [ProjectHandler()]}
+    ), mock.patch.object(manager, "_entity_handler", EntityHandler()):
+        projects = [default_project, other_project]
+        keys = list(ProjectKey.objects.filter(project__in=projects))
+        configs = get_project_configs(projects, keys, full_config=True)
+        expected = {
+            key.public_key: get_project_config(key.project, project_keys=[key]).to_dict()
+            for key in keys
+        }
+
+    for key in keys:
+        filter_settings = configs[key.public_key].to_dict()["config"]["filterSettings"]
+        assert filter_settings == expected[key.public_key]["config"]["filterSettings"]
+        assert ("errorMessages" in filter_settings) == (key.project.id == default_project.id)
@@ -12,7 +12,7 @@ from sentry.notifications.types import ActionTargetType
 from sentry.rules import init_registry
 from sentry.rules.conditions import EventCondition
 from sentry.rules.filters.base import EventFilter
-from sentry.rules.processor import RuleProcessor
+from sentry.rules.processor import GroupRuleState, RuleProcessor
 from sentry.testutils import TestCase
 
 EMAIL_ACTION_DATA = {
@@ -204,6 +204,128 @@ class RuleProcessorTest(TestCase):
         # mock condition first.
         assert passes.call_count == 0
 
+    @patch(
+        "sentry.constants._SENTRY_RULES",
+        [
+            "sentry.mail.actions.NotifyEmailAction",
+            "sentry.rules.conditions.event_frequency.EventFrequencyCondition",
+        ],
+    )
+    def test_frequency_conditions_are_batched(self):
+        condition = {
+            "id": "sentry.rules.conditions.event_frequency.EventFrequencyCondition",
+            "interval": "1h",
+            "value": 10,
+        }
+        self.rule.update(data={"conditions": [condition], "actions": [EMAIL_ACTION_DATA]})
+        Rule.objects.create(
+            project=self.event.project,
+            data={
+                "conditions": [condition, {**condition, "interval": "1d", "value": 1}],
+                "action_match": "any",
+                "actions": [EMAIL_ACTION_DATA],
+            },
+        )
+
+        def get_totals_multi(requests, use_cache=False):
+            return [{self.event.group_id: 5} for _ in requests]
+
+        with patch("sentry.rules.processor.rules", init_registry()), patch(
+            "sentry.tsdb.get_totals_multi", side_effect=get_totals_multi
+        ) as mock_get_totals_multi, patch("sentry.tsdb.get_sums") as mock_get_sums:
+            rp = RuleProcessor(
+                self.event,
+                is_new=True,
+                is_regression=True,
+                is_new_group_environment=True,
+                has_reappeared=True,
+            )
+            results = list(rp.apply())
+
+        # The identical hourly queries of both rules are only made once, and all queries are
+        # resolved together before evaluating the rules.
+        assert mock_get_totals_multi.call_count == 1
+        assert len(mock_get_totals_multi.call_args[0][0]) == 2
+        assert mock_get_sums.call_count == 0
+        assert len(results) == 1
+
+    @patch(
+        "sentry.constants._SENTRY_RULES",
+        [
+            "sentry.mail.actions.NotifyEmailAction",
+            "sentry.rules.conditions.event_frequency.EventFrequencyCondition",
+            "sentry.rules.conditions.first_seen_event.FirstSeenEventCondition",
+            "tests.sentry.rules.test_processor.MockFilterFalse",
+        ],
+    )
+    def test_frequency_conditions_of_decided_rules_are_skipped(self):
+        condition = {
+            "id": "sentry.rules.conditions.event_frequency.EventFrequencyCondition",
+            "interval": "1h",
+            "value": 10,
+        }
+        # The filter of the rule fails.
+        self.rule.update(
+            data={
+                "conditions": [
+                    condition,
+                    {"id": "tests.sentry.rules.test_processor.MockFilterFalse"},
+                ],
+                "actions": [EMAIL_ACTION_DATA],
+            }
+        )
+        # The event is not the first of its issue.
+        Rule.objects.create(
+            project=self.event.project,
+            data={
+                "conditions": [
+                    condition,
+                    {"id": "sentry.rules.conditions.first_seen_event.FirstSeenEventCondition"},
+                ],
+                "action_match": "all",
+                "actions": [EMAIL_ACTION_DATA],
+            },
+        )
+
+        with patch("sentry.rules.processor.rules", init_registry()), patch(
+            "sentry.rules.processor.EventFrequencyBatch.resolve"
+        ) as mock_resolve, patch("sentry.tsdb.get_sums") as mock_get_sums:
+            rp = RuleProcessor(
+                self.event,
+                is_new=False,
+                is_regression=True,
+                is_new_group_environment=True,
+                has_reappeared=True,
+            )
+            results = list(rp.apply())
+
+        assert mock_resolve.call_count == 0
+        assert mock_get_sums.call_count == 0
+        assert results == []
+
+    def test_group_state_is_shared(self):
+        group_state = GroupRuleState()
+        with patch(
+            "sentry.rules.processor.Rule.get_for_project", wraps=Rule.get_for_project
+        ) as mock_get_for_project:
+            results = []
+            for _ in range(2):
+                rp = RuleProcessor(
+                    self.event,
+                    is_new=True,
+                    is_regression=True,
+                    is_new_group_environment=True,
+                    has_reappeared=True,
+                    group_state=group_state,
+                )
+                results.extend(rp.apply())
+
+        # The rules are only loaded once, and the rule only fires for the first event since
+        # the second one sees the status updated by the first.
+        assert mock_get_for_project.call_count == 1
+        assert len(results) == 1
+        assert group_state.rule_statuses[self.rule.id].last_active is not None
+
 
 class MockFilterTrue(EventFilter):
     id = "tests.sentry.rules.test_processor.MockFilterTrue"
@@ -24,6 +24,33 @@ def test_cache_many() -> None:
     assert indexer_cache.get_many(list(values.keys())) == {"hello": None, "bye": None}
 
 
+def test_local_cache() -> None:
+    cache.clear()
+    indexer_cache.set_many({"hello": 2, "bye": 3})
+
+    # The shared tier is gone but the process-local tier still has the ids.
+    cache.clear()
+    assert indexer_cache.get_many(["hello", "bye", "missing"]) == {
+        "hello": 2,
+        "bye": 3,
+        "missing": None,
+    }
+    assert indexer_cache.get("hello") == 2
+
+    indexer_cache.clear_local_cache()
+    assert indexer_cache.get_many(["hello", "bye"]) == {"hello": None, "bye": None}
+
+
+def test_local_cache_filled_from_shared_cache() -> None:
+    cache.clear()
+    indexer_cache.set("hello", 2)
+    indexer_cache.clear_local_cache()
+
+    assert indexer_cache.get_many(["hello"]) == {"hello": 2}
+    assert indexer_cache.local.get("hello") == 2
+    indexer_cache.delete("hello")
+
+
 def test_make_cache_key() -> None:
     key = indexer_cache.make_cache_key("blah")
     assert key == f"indexer:org:str:{md5_text('blah').hexdigest()}"
@@ -0,0 +1,81 @@
+from datetime import datetime
+from unittest.mock import patch
+
+import pytest
+from arroyo.backends.kafka import KafkaPayload
+from arroyo.types import Message, Partition, Topic
+
+from sentry.sentry_metrics.indexer.mock import MockIndexer
+from sentry.sentry_metrics.multiprocess import ParallelProcessMessages, process_messages
+from sentry.snuba.metrics.naming_layer.mri import SessionMRI, TransactionMRI
+from sentry.utils import json
+
+BATCH_SIZE = 10000
+
+
+def benchmark_available():
+    try:
+        import pytest_benchmark  # NOQA
+    except ModuleNotFoundError:
+        return False
+    else:
+        return True
+
+
+def make_outer_message():
+    """Builds a batch of metrics spread over a few organizations and releases."""
+    partition = Partition(Topic("ingest-metrics"), 0)
+    timestamp = datetime.now()
+    names = [SessionMRI.SESSION.value, SessionMRI.USER.value, TransactionMRI.DURATION.value]
+
+    messages = []
+    for i in range(BATCH_SIZE):
+        payload = {
+            "name": names[i % len(names)],
+            "tags": {
+                "environment": "production" if i % 3 else "staging",
+                "release": "backend@1.%s.0" % (i % 50),
+                "session.status": "init",
+                "transaction": "/api/0/organizations/{organization_slug}/issues/",
+            },
+            "timestamp": 1650000000 + i,
+            "type": "d",
+            "value": [4.0, 5.0, 6.0],
+            "org_id": i % 10,
+            "project_id": i % 100,
+        }
+        messages.append(
+            Message(partition, i, KafkaPayload(None, json.dumps(payload).encode(), []), timestamp)
+        )
+
+    return Message(partition, BATCH_SIZE - 1, messages, timestamp)
+
+
+@pytest.mark.skipif(not benchmark_available(), reason="requires pytest-benchmark")
+def test_benchmark_process_messages(benchmark):
+    outer_message = make_outer_message()
+
+    with patch("sentry.sentry_metrics.multiprocess.get_indexer", return_value=MockIndexer()):
+        new_messages = benchmark(process_messages, outer_message)
+
+    assert len(new_messages) == BATCH_SIZE
+    benchmark.extra_info["messages"] = BATCH_SIZE
+
+
+@pytest.mark.skipif(not benchmark_available(), reason="requires pytest-benchmark")
+@pytest.mark.parametrize("processes", [2, 4, 8])
+def test_benchmark_parallel_process_messages(processes, benchmark):
+    outer_message = make_outer_message()
+    parallel_process_messages = ParallelProcessMessages(
+        processes, input_block_size=int(32 * 1e6), output_block_size=int(32 * 1e6)
+    )
+
+    try:
+        with patch("sentry.sentry_metrics.multiprocess.get_indexer", return_value=MockIndexer()):
+            new_messages = benchmark(parallel_process_messages, outer_message)
+    finally:
+        parallel_process_messages.close()
+
+    assert len(new_messages) == BATCH_SIZE
+    benchmark.extra_info["messages"] = BATCH_SIZE
+    benchmark.extra_info["processes"] = processes
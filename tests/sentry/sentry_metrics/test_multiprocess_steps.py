@@ -13,11 +13,13 @@ from arroyo.processing.strategies import MessageRejected
 from arroyo.types import Message, Partition, Position, Topic
 from arroyo.utils.clock import TestingClock as Clock
 
+from sentry.sentry_metrics.indexer.base import FetchType, KeyResult, KeyResults
 from sentry.sentry_metrics.indexer.mock import MockIndexer
 from sentry.sentry_metrics.multiprocess import (
     BatchMessages,
     DuplicateMessage,
     MetricsBatchBuilder,
+    ParallelProcessMessages,
     ProduceStep,
     invalid_metric_tags,
     process_messages,
@@ -286,6 +288,82 @@ def test_process_messages(mock_indexer) -> None:
     compare_message_batches_ignoring_metadata(new_batch, expected_new_batch)
 
 
+def test_process_messages_mapping_meta() -> None:
+    key_results = KeyResults()
+    key_results.add_key_results(
+        [KeyResult(1, SessionMRI.SESSION.value, 1), KeyResult(1, "production", 2)],
+        FetchType.CACHE_HIT,
+    )
+    key_results.add_key_results(
+        [KeyResult(1, "environment", 3), KeyResult(1, "session.status", 4)],
+        FetchType.FIRST_SEEN,
+    )
+    key_results.add_key_result(KeyResult(1, "init", 5))
+
+    message = Message(
+        Partition(Topic("topic"), 0),
+        1,
+        KafkaPayload(None, json.dumps(counter_payload).encode("utf-8"), [("h", b"v")]),
+        datetime.now(),
+    )
+    outer_message = Message(message.partition, message.offset, [message], message.timestamp)
+
+    indexer = Mock(bulk_record=Mock(return_value=key_results))
+    with patch("sentry.sentry_metrics.multiprocess.get_indexer", return_value=indexer):
+        (new_message,) = process_messages(outer_message=outer_message)
+
+    assert dict(new_message.payload.headers) == {"h": b"v", "mapping_sources": b"cf"}
+    assert json.loads(new_message.payload.value) == {
+        "tags": {"3": 2, "4": 5},
+        "timestamp": ts,
+        "type": "c",
+        "value": 1.0,
+        "org_id": 1,
+        "project_id": 3,
+        "metric_id": 1,
+        "retention_days": 90,
+        "mapping_meta": {
+            "c": {"1": SessionMRI.SESSION.value, "2": "production"},
+            "f": {"3": "environment", "4": "session.status"},
+        },
+    }
+
+
+@patch("sentry.sentry_metrics.multiprocess.get_indexer", return_value=MockIndexer())
+def test_parallel_process_messages(mock_indexer) -> None:
+    message_payloads = [counter_payload, distribution_payload, set_payload] * 5
+    message_batch = [
+        Message(
+            Partition(Topic("topic"), 0),
+            i + 1,
+            KafkaPayload(None, json.dumps(payload).encode("utf-8"), [("h", b"v")]),
+            datetime.now(),
+        )
+        for i, payload in enumerate(message_payloads)
+    ]
+    message_batch.insert(
+        3,
+        Message(Partition(Topic("topic"), 0), 100, KafkaPayload(None, b"{", []), datetime.now()),
+    )
+    last = message_batch[-1]
+    outer_message = Message(last.partition, last.offset, message_batch, last.timestamp)
+
+    expected_new_batch = process_messages(outer_message=outer_message)
+    # Small enough blocks that some payloads are passed inline.
+    parallel_process_messages = ParallelProcessMessages(
+        processes=4, input_block_size=512, output_block_size=512
+    )
+    try:
+        for _ in range(2):
+            new_batch = parallel_process_messages(outer_message)
+            assert [m.offset for m in new_batch] == [m.offset for m in expected_new_batch]
+            for actual, expected in zip(new_batch, expected_new_batch):
+                assert actual.payload.headers == expected.payload.headers
+                assert json.loads(actual.payload.value) == json.loads(expected.payload.value)
+    finally:
+        parallel_process_messages.close()
+
+
 invalid_payloads = [
     (
         {
@@ -234,6 +234,18 @@ class PostgresIndexerV2Test(TestCase):
         assert indexer_cache.get(string.id) is None
         assert indexer_cache.get(key) is None
 
+    def test_reverse_resolve_local_cache(self) -> None:
+        obj = StringIndexer.objects.create(organization_id=123, string="oop")
+        assert self.indexer.reverse_resolve(obj.id) == "oop"
+
+        # Served from the process-local tier from now on.
+        StringIndexer.objects.filter(id=obj.id).delete()
+        cache.clear()
+        assert self.indexer.reverse_resolve(obj.id) == "oop"
+
+        indexer_cache.clear_local_cache()
+        assert self.indexer.reverse_resolve(obj.id) is None
+
 
 class KeyCollectionTest(TestCase):
     def test_no_data(self) -> None:
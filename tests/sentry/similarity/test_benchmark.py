@@ -0,0 +1,60 @@
+import random
+import string
+
+import mmh3
+import pytest
+
+from sentry.similarity.signatures import MinHashSignatureBuilder
+
+
+def benchmark_available():
+    try:
+        import pytest_benchmark  # NOQA
+    except ModuleNotFoundError:
+        return False
+    else:
+        return True
+
+
+def reference_signature(columns, rows, features):
+    return [
+        min(mmh3.hash(feature, column) % rows for feature in features) for column in range(columns)
+    ]
+
+
+def make_events(num_events=100, num_features=300, vocabulary_size=5000):
+    # Stack trace and message shingles of real events overlap heavily, model
+    # this by drawing the features of every event from a shared vocabulary.
+    rng = random.Random(42)
+    vocabulary = [
+        "".join(rng.choice(string.ascii_letters) for _ in range(24)) for _ in range(vocabulary_size)
+    ]
+    return [rng.sample(vocabulary, num_features) for _ in range(num_events)]
+
+
+EVENTS = make_events()
+
+
+@pytest.mark.skipif(not benchmark_available(), reason="requires pytest-benchmark")
+@pytest.mark.parametrize("implementation", ["reference", "builder", "build_many"])
+def test_benchmark_signatures(implementation, benchmark):
+    columns, rows = 16, 0xFFFF
+
+    if implementation == "reference":
+
+        def run():
+            return [reference_signature(columns, rows, features) for features in EVENTS]
+
+    elif implementation == "builder":
+
+        def run():
+            builder = MinHashSignatureBuilder(columns, rows)
+            return [builder(features) for features in EVENTS]
+
+    else:
+
+        def run():
+            return MinHashSignatureBuilder(columns, rows).build_many(EVENTS)
+
+    result = benchmark(run)
+    assert result == [reference_signature(columns, rows, features) for features in EVENTS]
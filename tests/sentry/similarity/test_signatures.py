@@ -1,9 +1,17 @@
 from collections import Counter
 from unittest import TestCase
 
+import mmh3
+
 from sentry.similarity.signatures import MinHashSignatureBuilder
 
 
+def reference_signature(columns, rows, features):
+    return [
+        min(mmh3.hash(feature, column) % rows for feature in features) for column in range(columns)
+    ]
+
+
 class MinHashSignatureBuilderTestCase(TestCase):
     def test_signatures(self):
         n = 32
@@ -28,3 +36,16 @@ class MinHashSignatureBuilderTestCase(TestCase):
         self.assertAlmostEqual(
             similarity, estimation, delta=0.1  # totally made up constant, seems reasonable
         )
+
+    def test_compatible_with_reference(self):
+        get_signature = MinHashSignatureBuilder(16, 0xFFFF, cache_size=2)
+        feature_lists = [
+            ["foo", "bar", "baz"],
+            ["bar", "qux", "\u2603"],
+            ["foo"],
+            set("the quick brown fox jumps over the lazy dog".split()),
+        ]
+        expected = [reference_signature(16, 0xFFFF, features) for features in feature_lists]
+
+        assert [get_signature(features) for features in feature_lists] == expected
+        assert get_signature.build_many(feature_lists) == expected
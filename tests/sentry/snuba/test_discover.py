@@ -1,3 +1,5 @@
+import unittest
+from copy import deepcopy
 from datetime import datetime
 from unittest.mock import patch
 
@@ -16,7 +18,8 @@ from sentry.search.events.constants import (
 from sentry.snuba import discover
 from sentry.testutils import TestCase
 from sentry.testutils.helpers.datetime import before_now
-from sentry.utils.snuba import Dataset, get_array_column_alias
+from sentry.utils import json
+from sentry.utils.snuba import Dataset, StreamingResult, get_array_column_alias
 
 ARRAY_COLUMNS = ["measurements", "span_op_breakdowns"]
 
@@ -2478,3 +2481,21 @@ def test_zerofill():
 
     assert results[0]["time"] == 1546387200
     assert results[7]["time"] == 1546992000
+
+
+class TransformDataTest(unittest.TestCase):
+    body = {
+        "meta": [{"name": "count_id", "type": "UInt64"}, {"name": "avg", "type": "Float64"}],
+        "data": [{"count_id": 1, "avg": 0.5}, {"count_id": 2, "avg": 1.5}],
+        "totals": {"count_id": 3},
+    }
+
+    def test_streaming_result(self):
+        translated_columns = {"count_id": "count(id)"}
+        raw = json.dumps(self.body).encode("utf-8")
+        result = discover.transform_data(StreamingResult(raw), translated_columns, None)
+
+        # Streamed results are transformed like regular ones
+        assert result == discover.transform_data(deepcopy(self.body), translated_columns, None)
+        assert result["data"] == [{"count(id)": 1, "avg": 0.5}, {"count(id)": 2, "avg": 1.5}]
+        assert result["meta"][0]["name"] == "count(id)"
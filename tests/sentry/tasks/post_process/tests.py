@@ -2,6 +2,8 @@ from datetime import timedelta
 from unittest import mock
 from unittest.mock import ANY, Mock, patch
 
+import pytest
+from celery.exceptions import SoftTimeLimitExceeded
 from django.test import override_settings
 from django.utils import timezone
 
@@ -21,10 +23,11 @@ from sentry.models import (
     ProjectOwnership,
     ProjectTeam,
 )
+from sentry.models.group import get_group_with_redirect
 from sentry.ownership.grammar import Matcher, Owner, Rule, dump_schema
 from sentry.rules import init_registry
 from sentry.tasks.merge import merge_groups
-from sentry.tasks.post_process import post_process_group
+from sentry.tasks.post_process import post_process_group, post_process_group_batch
 from sentry.testutils import TestCase
 from sentry.testutils.helpers import with_feature
 from sentry.testutils.helpers.datetime import before_now, iso_format
@@ -646,6 +649,110 @@ class PostProcessGroupTest(TestCase):
             )
 
 
+class PostProcessGroupBatchTest(TestCase):
+    def store_events(self, count):
+        return [
+            self.store_event(
+                data={"message": "testing", "fingerprint": ["group-1"]}, project_id=self.project.id
+            )
+            for _ in range(count)
+        ]
+
+    @patch("sentry.rules.processor.RuleProcessor")
+    def test_group_loaded_once(self, mock_processor):
+        events = self.store_events(2)
+        cache_keys = [write_event_to_cache(event) for event in events]
+
+        with patch(
+            "sentry.models.group.get_group_with_redirect", wraps=get_group_with_redirect
+        ) as mock_get_group_with_redirect:
+            post_process_group_batch(
+                group_id=events[0].group_id,
+                events=[
+                    {
+                        "is_new": False,
+                        "is_regression": False,
+                        "is_new_group_environment": False,
+                        "cache_key": cache_key,
+                    }
+                    for cache_key in cache_keys
+                ],
+            )
+
+        assert mock_get_group_with_redirect.call_count == 1
+        assert mock_processor.call_count == 2
+        first_call, second_call = mock_processor.call_args_list
+        assert EventMatcher(events[0]) == first_call[0][0]
+        assert EventMatcher(events[1]) == second_call[0][0]
+        assert first_call[1]["group_state"] is not None
+        assert first_call[1]["group_state"] is second_call[1]["group_state"]
+        for cache_key in cache_keys:
+            assert event_processing_store.get(cache_key) is None
+
+    @patch("sentry.signals.issue_unignored.send_robust")
+    @patch("sentry.rules.processor.RuleProcessor")
+    def test_invalidates_snooze_once(self, mock_processor, send_robust):
+        events = self.store_events(2)
+        group = events[0].group
+        snooze = GroupSnooze.objects.create(group=group, until=timezone.now() - timedelta(hours=1))
+
+        post_process_group_batch(
+            group_id=group.id,
+            events=[
+                {
+                    "is_new": False,
+                    "is_regression": False,
+                    "is_new_group_environment": False,
+                    "cache_key": write_event_to_cache(event),
+                }
+                for event in events
+            ],
+        )
+
+        # Only the first event of the batch takes the group out of its snooze.
+        assert [call[0][4] for call in mock_processor.call_args_list] == [True, False]
+        assert not GroupSnooze.objects.filter(id=snooze.id).exists()
+        assert Group.objects.get(id=group.id).status == GroupStatus.UNRESOLVED
+        assert send_robust.call_count == 1
+
+    def make_batch_events(self, count):
+        return [
+            {
+                "is_new": False,
+                "is_regression": False,
+                "is_new_group_environment": False,
+                "cache_key": f"e:{i}",
+            }
+            for i in range(count)
+        ]
+
+    @patch("sentry.tasks.post_process.post_process_group_batch.delay")
+    @patch("sentry.tasks.post_process._post_process_event")
+    def test_soft_time_limit(self, mock_post_process_event, mock_delay):
+        mock_post_process_event.side_effect = [Exception("boom"), SoftTimeLimitExceeded(), None]
+        events = self.make_batch_events(4)
+
+        # Errors of single events are logged, but the time limit ends the batch and the
+        # interrupted and remaining events are requeued.
+        with pytest.raises(SoftTimeLimitExceeded):
+            post_process_group_batch(group_id=1, events=events)
+        assert mock_post_process_event.call_count == 2
+        mock_delay.assert_called_once_with(group_id=1, events=events[1:])
+
+    @patch("sentry.tasks.post_process.POST_PROCESS_GROUP_BATCH_TIME_BUDGET", 10)
+    @patch("sentry.tasks.post_process.time")
+    @patch("sentry.tasks.post_process.post_process_group.delay")
+    @patch("sentry.tasks.post_process._post_process_event")
+    def test_time_budget(self, mock_post_process_event, mock_delay, mock_time):
+        mock_time.monotonic.side_effect = [0, 5, 15]
+        events = self.make_batch_events(3)
+
+        post_process_group_batch(group_id=1, events=events)
+
+        assert mock_post_process_event.call_count == 2
+        mock_delay.assert_called_once_with(group_id=1, **events[2])
+
+
 class PostProcessGroupAssignmentTest(TestCase):
     def make_ownership(self, extra_rules=None):
         self.user_2 = self.create_user()
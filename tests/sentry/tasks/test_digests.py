@@ -6,17 +6,18 @@ import sentry
 from sentry.digests.backends.redis import RedisBackend
 from sentry.digests.notifications import event_to_record
 from sentry.models.rule import Rule
-from sentry.tasks.digests import deliver_digest
+from sentry.tasks.digests import deliver_digest, deliver_digests
 from sentry.testutils import TestCase
 from sentry.testutils.helpers.datetime import before_now, iso_format
 
 
 class DeliverDigestTest(TestCase):
     @patch.object(sentry, "digests")
-    def run_test(self, key: str, digests):
+    def run_test(self, key: str, digests, bulk: bool = False):
         """Simple integration test to make sure that digests are firing as expected."""
         backend = RedisBackend()
         digests.digest = backend.digest
+        digests.digest_many = backend.digest_many
 
         rule = Rule.objects.create(project=self.project, label="Test Rule", data={})
         event = self.store_event(
@@ -30,7 +31,10 @@ class DeliverDigestTest(TestCase):
         backend.add(key, event_to_record(event, [rule]), increment_delay=0, maximum_delay=0)
         backend.add(key, event_to_record(event_2, [rule]), increment_delay=0, maximum_delay=0)
         with self.tasks():
-            deliver_digest(key)
+            if bulk:
+                deliver_digests([key])
+            else:
+                deliver_digest(key)
         assert "2 new alerts since" in mail.outbox[0].subject
 
     def test_old_key(self):
@@ -42,6 +46,9 @@ class DeliverDigestTest(TestCase):
     def test_member_key(self):
         self.run_test(f"mail:p:{self.project.id}:Member:{self.user.id}")
 
+    def test_bulk(self):
+        self.run_test(f"mail:p:{self.project.id}:IssueOwners:", bulk=True)
+
     def test_no_records(self):
         # This shouldn't error if no records are present
         deliver_digest(f"mail:p:{self.project.id}:IssueOwners:")
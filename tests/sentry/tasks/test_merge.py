@@ -26,6 +26,16 @@ class MergeGroupTest(TestCase):
 
         mock_eventstream.end_merge.assert_called_once_with(eventstream_state)
 
+    @patch("sentry.tasks.merge.eventfrequency")
+    def test_merge_invalidates_event_frequencies(self, mock_eventfrequency):
+        group1 = self.create_group(self.project)
+        group2 = self.create_group(self.project)
+
+        with self.tasks():
+            merge_groups([group1.id], group2.id)
+
+        mock_eventfrequency.invalidate.assert_called_once_with([group2.id, group1.id])
+
     def test_merge_group_environments(self):
         group1 = self.create_group(self.project)
 
@@ -222,3 +222,31 @@ def test_projectkeys(default_project, task_runner, redis_cache):
 
     for key in ProjectKey.objects.filter(project_id=default_project.id):
         assert not redis_cache.get(key.public_key)
+
+
+@pytest.mark.django_db
+def test_generate_in_chunks(
+    monkeypatch, factories, default_project, default_organization, task_runner, redis_cache
+):
+    other_project = factories.create_project(organization=default_organization)
+    chunks = []
+    set_many = redis_cache.set_many
+
+    def record_set_many(configs):
+        chunks.append(sorted(configs))
+        set_many(configs)
+
+    monkeypatch.setattr("sentry.relay.projectconfig_cache.set_many", record_set_many)
+    monkeypatch.setattr("sentry.tasks.relay.CONFIG_CACHE_WRITE_CHUNK_SIZE", 1)
+
+    with task_runner():
+        schedule_update_config_cache(generate=True, organization_id=default_organization.id)
+
+    public_keys = [
+        *_cache_keys_for_project(default_project),
+        *_cache_keys_for_project(other_project),
+    ]
+    assert sorted(chunks) == sorted([public_key] for public_key in public_keys)
+    for project in (default_project, other_project):
+        for public_key in _cache_keys_for_project(project):
+            assert redis_cache.get(public_key)["projectId"] == project.id
@@ -1,12 +1,18 @@
+from unittest.mock import patch
+
 import pytest
 
 from sentry.grouping.api import get_default_grouping_config_dict, load_grouping_config
+from sentry.stacktraces import processing
 from sentry.stacktraces.processing import (
+    StacktraceProcessor,
     find_stacktraces_in_data,
     get_crash_frame_from_event_data,
     normalize_stacktraces_for_grouping,
+    process_stacktraces,
 )
 from sentry.testutils import TestCase
+from sentry.utils.cache import cache
 
 
 class FindStacktracesTest(TestCase):
@@ -405,6 +411,56 @@ class NormalizeInApptest(TestCase):
         )
 
 
+class SymbolProcessor(StacktraceProcessor):
+    def handles_frame(self, frame, stacktrace_info):
+        return "instruction_addr" in frame
+
+    def preprocess_frame(self, processable_frame):
+        processable_frame.set_cache_key_from_values((processable_frame["instruction_addr"],))
+
+    def process_frame(self, processable_frame, processing_task):
+        function = processable_frame.cache_value
+        if function is None:
+            function = "sym_%s" % processable_frame["instruction_addr"]
+            processable_frame.set_cache_value(function)
+        return [dict(processable_frame.frame, function=function)], None, None
+
+
+class FrameCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def process(self, addrs):
+        data = {
+            "project": self.project.id,
+            "platform": "native",
+            "stacktrace": {"frames": [{"instruction_addr": addr} for addr in addrs]},
+        }
+
+        def make_processors(data, infos):
+            return [SymbolProcessor(data, infos, project=self.project)]
+
+        process_stacktraces(data, make_processors=make_processors)
+        return [frame["function"] for frame in data["stacktrace"]["frames"]]
+
+    def test_bulk_lookup_and_store(self):
+        with patch.object(cache, "get_many", wraps=cache.get_many) as get_many, patch.object(
+            cache, "set_many", wraps=cache.set_many
+        ) as set_many:
+            assert self.process(["0x1", "0x2", "0x1"]) == ["sym_0x1", "sym_0x2", "sym_0x1"]
+            assert get_many.call_count == 1
+            assert set_many.call_count == 1
+            assert len(set_many.call_args[0][0]) == 2
+
+        cache.set_many(
+            {key: "cached_%s" % key for key in set_many.call_args[0][0]},
+            processing.FRAME_CACHE_TIMEOUT,
+        )
+        functions = self.process(["0x2", "0x3"])
+        assert functions[0].startswith("cached_pf:")
+        assert functions[1] == "sym_0x3"
+
+
 @pytest.mark.parametrize(
     "event",
     [
@@ -7,7 +7,7 @@ from django.test import override_settings
 
 from sentry.testutils import TestCase
 from sentry.tsdb.base import ONE_DAY, ONE_HOUR, ONE_MINUTE, TSDBModel
-from sentry.tsdb.redis import CountMinScript, RedisTSDB, SuppressionWrapper
+from sentry.tsdb.redis import CountMinScript, RangeQuery, RedisTSDB, SuppressionWrapper
 from sentry.utils.dates import to_datetime, to_timestamp
 
 
@@ -188,6 +188,40 @@ class RedisTSDBTest(TestCase):
         results = self.db.get_sums(TSDBModel.project, [1, 2], dts[0], dts[-1], environment_id=1)
         assert results == {1: 0, 2: 0}
 
+    def test_get_range_multi(self):
+        now = datetime.utcnow().replace(tzinfo=pytz.UTC) - timedelta(hours=4)
+        dts = [now + timedelta(hours=i) for i in range(4)]
+
+        def timestamp(d):
+            t = int(to_timestamp(d))
+            return t - (t % 3600)
+
+        self.db.incr(TSDBModel.project, 1, dts[0])
+        self.db.incr(TSDBModel.project, 1, dts[1], count=2, environment_id=1)
+        self.db.incr(TSDBModel.project, 1, dts[1], environment_id=2)
+        self.db.incr(TSDBModel.group, 3, dts[3], count=5)
+
+        results = self.db.get_range_multi(
+            [
+                RangeQuery(TSDBModel.project, [1, 2], dts[0], dts[-1]),
+                RangeQuery(TSDBModel.project, [1], dts[0], dts[-1], environment_ids=[1, 2]),
+                RangeQuery(TSDBModel.group, [3], dts[0], dts[-1], rollup=ONE_HOUR),
+            ]
+        )
+        assert len(results) == 3
+        assert [results[0].timestamps] * 3 == [r.timestamps for r in results]
+        assert results[0].timestamps == [timestamp(d) for d in dts]
+        assert results[0].rollup == ONE_HOUR
+
+        assert results[0].points() == {
+            1: [(timestamp(dts[0]), 1), (timestamp(dts[1]), 3)]
+            + [(timestamp(d), 0) for d in dts[2:]],
+            2: [(timestamp(d), 0) for d in dts],
+        }
+        assert results[0].sums() == {1: 4, 2: 0}
+        assert list(results[1].values[1]) == [0, 3, 0, 0]
+        assert results[2].sums() == {3: 5}
+
     def test_count_distinct(self):
         now = datetime.utcnow().replace(tzinfo=pytz.UTC) - timedelta(hours=4)
         dts = [now + timedelta(hours=i) for i in range(4)]
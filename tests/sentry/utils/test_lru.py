@@ -0,0 +1,65 @@
+from unittest import mock
+
+from sentry.utils.lru import LRUCache
+
+
+def test_get_set():
+    cache = LRUCache("test", max_items=10)
+    assert cache.get("a") is None
+    assert cache.get("a", default=1) == 1
+    cache.set("a", 2)
+    assert cache.get("a") == 2
+    assert "a" in cache
+    assert len(cache) == 1
+
+    cache.delete("a")
+    assert "a" not in cache
+
+
+def test_evicts_least_recently_used():
+    cache = LRUCache("test", max_items=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get_many(["a", "b", "c"]) == {"a": 1, "c": 3}
+
+
+def test_evicts_by_weight():
+    cache = LRUCache("test", max_items=10, max_weight=5, weigher=len)
+    cache.set("a", b"12")
+    cache.set("b", b"34")
+    assert cache.weight == 4
+    cache.set("c", b"56")
+    assert cache.get_many(["a", "b", "c"]) == {"b": b"34", "c": b"56"}
+    assert cache.weight == 4
+
+    # Values larger than the budget are never cached
+    cache.set("d", b"123456")
+    assert "d" not in cache
+    assert cache.weight == 4
+
+
+@mock.patch("sentry.utils.lru.monotonic")
+def test_ttl(monotonic):
+    monotonic.return_value = 100
+    cache = LRUCache("test", ttl=10)
+    cache.set("a", 1)
+    cache.set("b", 2, ttl=20)
+
+    monotonic.return_value = 115
+    assert cache.get_many(["a", "b"]) == {"b": 2}
+    assert len(cache) == 1
+
+
+@mock.patch("sentry.utils.lru.metrics")
+def test_metrics(metrics):
+    cache = LRUCache("test", max_items=1)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get_many(["a", "b"])
+    assert metrics.incr.mock_calls == [
+        mock.call("lru_cache.eviction", amount=1, tags={"cache": "test"}),
+        mock.call("lru_cache.hit", amount=1, tags={"cache": "test"}),
+        mock.call("lru_cache.miss", amount=1, tags={"cache": "test"}),
+    ]
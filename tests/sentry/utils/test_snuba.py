@@ -8,10 +8,14 @@ from django.utils import timezone
 
 from sentry.models import GroupRelease, Project, Release
 from sentry.testutils import TestCase
+from sentry.utils import json
 from sentry.utils.snuba import (
     Dataset,
     SnubaQueryParams,
+    StreamingResult,
+    UnexpectedResponseError,
     UnqualifiedQueryError,
+    _apply_cache_and_build_results,
     _prepare_query_params,
     get_json_type,
     get_query_params_to_update_for_projects,
@@ -374,3 +378,85 @@ class QuantizeTimeTest(unittest.TestCase):
                 break
 
         assert i != j
+
+
+class StreamingResultTest(unittest.TestCase):
+    body = {
+        "meta": [{"name": "project_id", "type": "UInt64"}],
+        "data": [{"project_id": 1}, {"project_id": 2}],
+        "totals": {"project_id": 3},
+        "timing": {"duration_ms": 1},
+    }
+
+    def test_rows_are_translated_lazily(self):
+        reverse = mock.Mock(side_effect=lambda row: {"project": row["project_id"]})
+        result = StreamingResult(json.dumps(self.body).encode("utf-8"), reverse)
+        assert result["meta"] == self.body["meta"]
+        assert not reverse.called
+
+        rows = iter(result)
+        assert next(rows) == {"project": 1}
+        assert reverse.call_count == 1
+        assert list(rows) == [{"project": 2}]
+
+    def test_members_after_data(self):
+        result = StreamingResult(json.dumps(self.body).encode("utf-8"))
+        assert result["totals"] == {"project_id": 3}
+        assert "timing" in result
+        assert result.get("sql") is None
+        assert result.materialize() == self.body
+
+    def test_empty_data(self):
+        result = StreamingResult(b'{"meta": [], "data": [ ]}')
+        assert list(result) == []
+        assert result.materialize() == {"meta": [], "data": []}
+
+    def test_invalid_body(self):
+        with pytest.raises(ValueError):
+            StreamingResult(b"[]")
+
+    def test_decoded_in_chunks(self):
+        body = {
+            "meta": self.body["meta"],
+            "data": [{"project_id": 10**12 + i, "name": "\u00e9\u2713" * i} for i in range(20)],
+            "totals": self.body["totals"],
+        }
+        raw = json.dumps(body).encode("utf-8")
+        # Chunks end in the middle of numbers and multi-byte characters
+        with mock.patch("sentry.utils.snuba._JsonReader.chunk_size", 3):
+            result = StreamingResult(raw)
+            assert list(result) == body["data"]
+            assert result.materialize() == body
+
+
+class StreamingQueryTest(TestCase):
+    def test_stream_caches_raw_body(self):
+        raw = json.dumps({"meta": [], "data": [{"a": 1}, {"a": 2}]}).encode("utf-8")
+        response = mock.Mock(status=200, data=raw)
+
+        def reverse(row):
+            return {"b": row["a"]}
+
+        query = ({"dataset": "events", "selected_columns": ["a"]}, lambda x: x, reverse)
+
+        with mock.patch(
+            "sentry.utils.snuba._legacy_snql_query", return_value=(response, None, reverse)
+        ) as query_fn:
+            (result,) = _apply_cache_and_build_results([query], use_cache=True, stream=True)
+            assert isinstance(result, StreamingResult)
+            assert list(result) == [{"b": 1}, {"b": 2}]
+
+            (cached,) = _apply_cache_and_build_results([query], use_cache=True, stream=True)
+            assert query_fn.call_count == 1
+            assert cached.raw == raw
+            assert list(cached) == [{"b": 1}, {"b": 2}]
+
+    def test_stream_invalid_response(self):
+        response = mock.Mock(status=200, data=b"<html>")
+        query = ({"dataset": "events"}, lambda x: x, lambda x: x)
+
+        with mock.patch(
+            "sentry.utils.snuba._legacy_snql_query", return_value=(response, None, lambda x: x)
+        ):
+            with pytest.raises(UnexpectedResponseError):
+                list(_apply_cache_and_build_results([query], stream=True))
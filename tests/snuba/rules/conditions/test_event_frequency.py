@@ -9,6 +9,7 @@ from freezegun import freeze_time
 
 from sentry.models import Rule
 from sentry.rules.conditions.event_frequency import (
+    EventFrequencyBatch,
     EventFrequencyCondition,
     EventFrequencyPercentCondition,
     EventUniqueUserFrequencyCondition,
@@ -137,6 +138,42 @@ class StandardIntervalMixin:
         rule = self.get_rule(data=data, rule=Rule(environment_id=None))
         self.assertDoesNotPass(rule, event)
 
+    def test_batched(self):
+        event = self.store_event(
+            data={
+                "fingerprint": ["something_random"],
+                "timestamp": iso_format(before_now(minutes=1)),
+                "user": {"id": uuid4().hex},
+            },
+            project_id=self.project.id,
+        )
+        self.increment(event, 3, timestamp=now() - timedelta(minutes=1))
+        self.increment(event, 1, timestamp=now() - timedelta(days=1, minutes=20))
+        data = {
+            "interval": "1h",
+            "value": 10,
+            "comparisonType": "percent",
+            "comparisonInterval": "1d",
+        }
+        rule = self.get_rule(data=data, rule=Rule(environment_id=None))
+        expected = rule.get_rate(event, "1h", None)
+        assert expected > 0
+
+        batch = EventFrequencyBatch()
+        queries = rule.get_frequency_queries(event, batch.end)
+        assert len(queries) == 2
+        batch.resolve(queries)
+        assert all(batch.get(query) is not None for query in queries)
+
+        rule = self.get_rule(data=data, rule=Rule(environment_id=None))
+        rule.batch = batch
+        with patch("sentry.tsdb.get_sums") as get_sums, patch(
+            "sentry.tsdb.get_distinct_counts_totals"
+        ) as get_distinct_counts_totals:
+            assert rule.get_rate(event, "1h", None) == expected
+        assert get_sums.call_count == 0
+        assert get_distinct_counts_totals.call_count == 0
+
     def test_comparison_empty_comparison_period(self):
         # Test data is 1 event in the current period and 0 events in the comparison period. This
         # should always result in 0 and never fire.
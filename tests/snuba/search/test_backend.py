@@ -1307,6 +1307,51 @@ class EventsSnubaSearchTest(TestCase, SnubaTestCase):
         finally:
             options.set("snuba.search.max-pre-snuba-candidates", prev_max_pre)
 
+    def test_post_filtering_chunks(self):
+        groups = []
+        for i in range(6):
+            event = self.store_event(
+                data={
+                    "fingerprint": [f"put-me-in-chunk-group{i}"],
+                    "timestamp": iso_format(before_now(minutes=i + 1)),
+                    "message": "chunked",
+                },
+                project_id=self.project.id,
+            )
+            groups.append(event.group)
+        for group in groups[1::2]:
+            group.update(status=GroupStatus.RESOLVED)
+
+        for prefetch in (True, False):
+            # Chunks hold a single page, and only every other group passes
+            # post-filtering, so every page takes several chunks.
+            with self.options(
+                {
+                    "snuba.search.max-pre-snuba-candidates": 1,
+                    "snuba.search.max-chunk-size": 1,
+                    "snuba.search.prefetch-chunks": prefetch,
+                }
+            ):
+                results = self.backend.query(
+                    [self.project],
+                    search_filters=self.build_search_filter("is:unresolved chunked"),
+                    limit=2,
+                    sort_by="date",
+                )
+                assert list(results) == [groups[0], groups[2]]
+                assert results.next.has_results
+
+                results = self.backend.query(
+                    [self.project],
+                    search_filters=self.build_search_filter("is:unresolved chunked"),
+                    cursor=results.next,
+                    limit=2,
+                    sort_by="date",
+                )
+                assert list(results) == [groups[4]]
+                assert results.prev.has_results
+                assert not results.next.has_results
+
     def test_optimizer_enabled(self):
         prev_optimizer_enabled = options.get("snuba.search.pre-snuba-candidates-optimizer")
         options.set("snuba.search.pre-snuba-candidates-optimizer", True)